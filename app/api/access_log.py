@@ -0,0 +1,78 @@
+import logging
+import time
+import uuid
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.logging import get_logger, current_log_context, new_log_context
+from app.metrics.requests import RequestStats, current_request_stats, route_name
+
+
+access_logger = get_logger(__name__)
+
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Longest request id accepted from a client (or a proxy in front)
+MAX_REQUEST_ID_LENGTH = 64
+
+
+def request_id_for(scope: Scope) -> str:
+    request_id = Headers(scope=scope).get(REQUEST_ID_HEADER, "")
+    if 0 < len(request_id) <= MAX_REQUEST_ID_LENGTH and request_id.isprintable():
+        return request_id
+    return uuid.uuid4().hex
+
+
+class AccessLogMiddleware:
+    """
+    Gives every HTTP request an id, attached to the records logged while
+    handling it and sent back in the X-Request-ID header, and logs a line
+    per request with its route, status, latency and query count.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        context = new_log_context(request_id_for(scope), scope)
+        context_token = current_log_context.set(context)
+        # Counted by the MetricsMiddleware already, unless the metrics are off
+        stats = current_request_stats.get()
+        stats_token = None
+        if stats is None:
+            stats = RequestStats()
+            stats_token = current_request_stats.set(stats)
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers[REQUEST_ID_HEADER] = context.request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            access_logger.log(
+                logging.WARNING if status_code >= 500 else logging.INFO,
+                f"{scope['method']} {scope['path']} {status_code}",
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "route": route_name(scope),
+                    "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+                    "queries": stats.queries,
+                }
+            )
+            if stats_token is not None:
+                current_request_stats.reset(stats_token)
+            current_log_context.reset(context_token)
@@ -0,0 +1,170 @@
+import zlib
+from typing import Optional
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import (
+    COMPRESSION_MINIMUM_SIZE,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_BROTLI_QUALITY,
+)
+
+
+# Supported content codings, in order of preference
+ENCODINGS = ("br", "gzip")
+
+
+class _Compressor:
+    """
+    Incremental compressor for one of the supported content codings.
+    """
+
+    def __init__(self, encoding: str) -> None:
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+            self.process = compressor.process
+            self.finish = compressor.finish
+        else:
+            # wbits=31 writes a gzip header and trailer around the deflate stream
+            compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+            self.process = compressor.compress
+            self.finish = compressor.flush
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    compressor = _Compressor(encoding)
+    return compressor.process(body) + compressor.finish()
+
+
+def parse_accept_encoding(accept_encoding: str) -> dict[str, float]:
+    """
+    Quality value of every coding listed in an Accept-Encoding header (1 if
+    not given). Codings with a malformed quality value are left out.
+    """
+    qualities = {}
+    for coding in accept_encoding.lower().split(","):
+        name, *params = coding.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = None
+        if name.strip() and quality is not None:
+            qualities[name.strip()] = quality
+    return qualities
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Supported coding with the highest quality value in an Accept-Encoding
+    header, ENCODINGS order breaking ties. A coding listed explicitly (e.g.
+    with q=0, refusing it) takes precedence over "*".
+    """
+    if not accept_encoding:
+        return None
+
+    qualities = parse_accept_encoding(accept_encoding)
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses of at least `minimum_size` bytes with brotli or
+    gzip, whichever the client prefers. Images, and responses that already
+    set a Content-Encoding (e.g. precompressed cache entries), are sent
+    untouched.
+    """
+
+    def __init__(
+        self, app: ASGIApp, minimum_size: int = COMPRESSION_MINIMUM_SIZE
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            encoding = choose_encoding(Headers(scope=scope).get("Accept-Encoding"))
+            if encoding is not None:
+                responder = _CompressionResponder(
+                    self.app, encoding, self.minimum_size
+                )
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int) -> None:
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.initial_message: Message = {}
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether to compress
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                # Already compressed, e.g. the files of the local storage
+                or headers.get("content-type", "").startswith("image/")
+            )
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            if self.initial_message:
+                await self.send(self.initial_message)
+                self.initial_message = {}
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if len(body) < self.minimum_size and not more_body:
+                self.passthrough = True
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+
+            self.compressor = _Compressor(self.encoding)
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.compressor.process(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self.send(self.initial_message)
+                await self.send({**message, "body": body})
+                return
+            await self.send(self.initial_message)
+
+        body = self.compressor.process(body)
+        if not more_body:
+            body += self.compressor.finish()
+        await self.send({**message, "body": body})
@@ -6,6 +6,7 @@ from app.services.authentication import AuthenticationException
 from app.db.repositories.users import UsersRepository
 from app.db.repositories.store_profiles import StoreProfilesRepository
 from app.api.dependencies.database import get_repository
+from app.api.dependencies.cache import get_cache
 from app.models.users import UserInDB
 from app.models.store_profiles import StoreProfileInDB
 
@@ -48,6 +49,7 @@ async def get_current_store_id(
 
 async def get_current_store_profile(
     token: Annotated[str, Depends(oauth2_scheme_stores)],
+    cache: Annotated["Redis", Depends(get_cache)],
     store_profile_repo: Annotated[
         StoreProfilesRepository,
         Depends(get_repository(StoreProfilesRepository))
@@ -56,7 +58,7 @@ async def get_current_store_profile(
     try:
         store_id = auth_service.verify_access_token_store(token=token)
         db_store_profile = await store_profile_repo.get_store_profile_by_store_id(
-            store_id=store_id
+            cache=cache, store_id=store_id
         )
         return db_store_profile
     except AuthenticationException as exc:
@@ -0,0 +1,6 @@
+from fastapi.requests import Request
+from app.storage.base import Storage
+
+
+def get_storage(request: Request) -> Storage:
+    return request.app.state._storage
@@ -16,3 +16,8 @@ class SortByOption(str, Enum):
 class SortOrderOption(str, Enum):
     ASC = 'ASC'
     DESC = 'DESC'
+
+
+class ImportRowStatus(str, Enum):
+    CREATED = 'created'
+    FAILED = 'failed'
@@ -0,0 +1,2 @@
+class PermanentJobFailure(Exception):
+    pass
@@ -8,3 +8,7 @@ class DuplicateProductNameForTheSameStore(Exception):
 
 class ProductBelongsToAnotherStore(Exception):
     pass
+
+
+class InvalidMenuFile(Exception):
+    pass
@@ -0,0 +1,10 @@
+class InvalidForm(Exception):
+    pass
+
+
+class UnsupportedImageType(Exception):
+    pass
+
+
+class ImageTooLarge(Exception):
+    pass
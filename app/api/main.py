@@ -1,13 +1,37 @@
-import sentry_sdk
+from urllib.parse import urlparse
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.config import PROJECT_NAME, VERSION, DSN
+from app.core.config import (
+    PROJECT_NAME,
+    VERSION,
+    METRICS_ENABLED,
+    METRICS_PATH,
+    TRACES_KEEP_SLOW_AND_FAILED,
+    PROFILING_ENABLED,
+    PROFILING_PATH,
+    STORAGE_BACKEND,
+    LOCAL_STORAGE_ROOT,
+    LOCAL_STORAGE_URL,
+)
 from app.core.events import create_start_app_handler, create_stop_app_handler
+from app.core.tracing import TracingMiddleware, init_sentry
 from app.api.routes import router as api_router
+from app.api.compression import CompressionMiddleware
+from app.api.access_log import AccessLogMiddleware
+from app.metrics.requests import MetricsMiddleware
+from app.metrics.endpoint import metrics
+from app.profiling.requests import ProfilingMiddleware
+from app.profiling.endpoint import list_profiles, get_profile
+from app.storage.local import LocalStorageFiles
 
 
 def get_application():
-    app = FastAPI(title=PROJECT_NAME, version=VERSION)
+    app = FastAPI(
+        title=PROJECT_NAME,
+        version=VERSION,
+        default_response_class=ORJSONResponse
+    )
 
     app.add_middleware(
         CORSMiddleware,
@@ -16,18 +40,38 @@ def get_application():
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(CompressionMiddleware)
+    if PROFILING_ENABLED:
+        app.add_middleware(ProfilingMiddleware)
+    if TRACES_KEEP_SLOW_AND_FAILED:
+        app.add_middleware(TracingMiddleware)
+    app.add_middleware(AccessLogMiddleware)
+    if METRICS_ENABLED:
+        # Outermost, so the latency includes every other middleware
+        app.add_middleware(MetricsMiddleware)
 
     app.add_event_handler("startup", create_start_app_handler(app))
     app.add_event_handler("shutdown", create_stop_app_handler(app))
 
     app.include_router(api_router, prefix="/api")
 
-    return app
+    if METRICS_ENABLED:
+        app.add_route(METRICS_PATH, metrics, include_in_schema=False)
 
+    if PROFILING_ENABLED:
+        app.add_route(PROFILING_PATH, list_profiles, include_in_schema=False)
+        app.add_route(PROFILING_PATH + "/{id}", get_profile, include_in_schema=False)
+
+    if STORAGE_BACKEND == "local":
+        app.mount(
+            urlparse(LOCAL_STORAGE_URL).path,
+            LocalStorageFiles(directory=LOCAL_STORAGE_ROOT, check_dir=False),
+            name="media"
+        )
+
+    return app
 
-sentry_sdk.init(
-    dsn=DSN,
-    traces_sample_rate=1.0
-)
 
 app = get_application()
+
+init_sentry(app)
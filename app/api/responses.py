@@ -0,0 +1,120 @@
+from typing import Optional
+from fastapi import status
+from fastapi.responses import Response
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from app.api.compression import ENCODINGS, compress
+from app.core.config import COMPRESSION_MINIMUM_SIZE, RESPONSE_CACHE_TTL
+
+
+IDENTITY = "identity"
+
+
+def render_json(content: BaseModel) -> bytes:
+    return content.__pydantic_serializer__.to_json(content, by_alias=True)
+
+
+class PydanticJSONResponse(Response):
+    """
+    Serializes an already validated model straight to JSON bytes with
+    pydantic-core. Returning it from a route skips the response_model
+    validation pass, so the model must match the route's response_model.
+    """
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        return render_json(content)
+
+
+def make_etag(*parts: object) -> str:
+    """
+    Strong ETag built from the content version counters a response depends
+    on, e.g. make_etag("store", store_id, store_version).
+    """
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against the current ETag.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in {
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    }
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
+
+def _response_cache_key(etag: str) -> str:
+    return "responses:" + etag.strip('"')
+
+
+def _json_response(
+    body: bytes, encoding: Optional[str], headers: dict[str, str]
+) -> Response:
+    headers = {**headers, "Vary": "Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _compress_all(body: bytes) -> dict[str, bytes]:
+    return {encoding: compress(body, encoding) for encoding in ENCODINGS}
+
+
+async def get_precompressed_response(
+    *,
+    cache: "Redis",
+    etag: str,
+    encoding: Optional[str],
+    headers: dict[str, str]
+) -> Optional[Response]:
+    """
+    The cached body of the response identified by `etag`, in the requested
+    content coding when the body was large enough to be compressed.
+    """
+    compressed, body = await cache.hmget(
+        _response_cache_key(etag), encoding or IDENTITY, IDENTITY
+    )
+    if encoding is not None and compressed is not None:
+        return _json_response(compressed, encoding, headers)
+    if body is not None:
+        return _json_response(body, None, headers)
+    return None
+
+
+async def precompress_response(
+    *,
+    cache: "Redis",
+    etag: str,
+    encoding: Optional[str],
+    content: BaseModel,
+    headers: dict[str, str]
+) -> Response:
+    """
+    Serializes `content` and caches it under `etag` in every supported
+    content coding, so that compression is paid once per cache fill rather
+    than once per request. A new ETag makes the old entry unreachable.
+    """
+    bodies = {IDENTITY: render_json(content)}
+    if len(bodies[IDENTITY]) >= COMPRESSION_MINIMUM_SIZE:
+        bodies.update(await run_in_threadpool(_compress_all, bodies[IDENTITY]))
+
+    key = _response_cache_key(etag)
+    async with cache.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping=bodies)
+        pipe.expire(key, RESPONSE_CACHE_TTL)
+        await pipe.execute()
+
+    if encoding in bodies:
+        return _json_response(bodies[encoding], encoding, headers)
+    return _json_response(bodies[IDENTITY], None, headers)
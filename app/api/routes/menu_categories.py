@@ -1,9 +1,14 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from app.core.logging import get_logger
 from app.models.menu_categories import MenuCategoryOut, MenuCategoriesOut
 from app.db.repositories.menu_categories import MenuCategoriesRepository
 from app.api.dependencies.database import get_repository
+from app.api.dependencies.cache import get_cache
+from app.api.responses import make_etag, etag_matches, not_modified
+from app.metrics.requests import query_budget
+from app.cache.versions import CATALOG_VERSION_KEY, get_versions
+from app.core.config import CATALOG_CACHE_CONTROL
 
 
 router = APIRouter()
@@ -16,17 +21,34 @@ menu_categories_logger = get_logger(__name__)
     response_model=MenuCategoriesOut,
     name="get-all-menu-categories"
 )
+@query_budget(1)
 async def get_all_menu_categories(
+    response: Response,
+    cache: Annotated["Redis", Depends(get_cache)],
     menu_category_repo: Annotated[
         MenuCategoriesRepository,
         Depends(get_repository(MenuCategoriesRepository))
-    ]
+    ],
+    if_none_match: Annotated[Optional[str], Header()] = None
 ) -> MenuCategoriesOut:
     try:
-        db_menu_categories = await menu_category_repo.get_all_menu_categories()
+        # Read first, rebuilding the list once expired bumps the catalog
+        # version if the menu categories changed
+        db_menu_categories = await menu_category_repo.get_all_menu_categories(
+            cache=cache
+        )
+
+        [catalog_version] = await get_versions(cache, CATALOG_VERSION_KEY)
+        etag = make_etag("menu_categories", catalog_version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, CATALOG_CACHE_CONTROL)
+
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CATALOG_CACHE_CONTROL
+
         return MenuCategoriesOut(
             menu_categories=[
-                MenuCategoryOut(**menu_category.model_dump())
+                MenuCategoryOut.from_model(menu_category)
                 for menu_category in db_menu_categories
             ]
         )
@@ -0,0 +1,50 @@
+from typing import Annotated
+from fastapi import Depends, status, HTTPException, Query
+from app.models.products import ProductBulkDeleteOut
+from app.db.repositories.products import ProductsRepository
+from app.api.dependencies.database import get_repository
+from app.api.dependencies.auth import get_current_store_id
+from app.api.dependencies.cache import get_cache
+from app.cache.versions import store_version_key, bump_version
+from app.metrics.requests import query_budget
+from app.jobs.storage_cleanup import enqueue_product_image_deletion
+from app.core.config import BULK_DELETE_MAX_PRODUCTS, PRODUCT_SOFT_DELETE
+from . import router, products_logger
+
+
+@router.delete(
+    "",
+    response_model=ProductBulkDeleteOut,
+    name="bulk-delete-products"
+)
+@query_budget(1)
+async def bulk_delete_products(
+    ids: Annotated[
+        list[int],
+        Query(min_length=1, max_length=BULK_DELETE_MAX_PRODUCTS)
+    ],
+    store_id: Annotated[int, Depends(get_current_store_id)],
+    cache: Annotated["Redis", Depends(get_cache)],
+    product_repo: Annotated[
+        ProductsRepository, Depends(get_repository(ProductsRepository))
+    ]
+) -> ProductBulkDeleteOut:
+    try:
+        deleted_products = await product_repo.delete_products_by_ids(
+            ids=list(set(ids)), store_id=store_id, soft=PRODUCT_SOFT_DELETE
+        )
+        if deleted_products:
+            await bump_version(cache, store_version_key(store_id))
+            if not PRODUCT_SOFT_DELETE:
+                # Otherwise deleted once the products are purged
+                await enqueue_product_image_deletion(cache, deleted_products)
+
+        return ProductBulkDeleteOut(
+            deleted_ids=sorted(product.id for product in deleted_products)
+        )
+    except Exception as exc:
+        products_logger.exception(exc)
+        raise HTTPException(
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            "Failed to delete products."
+        )
@@ -0,0 +1,373 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import zipfile
+from typing import Annotated, Optional
+from pydantic import ValidationError
+from databases import Database
+from fastapi import Depends, status, HTTPException, File, UploadFile
+from starlette.concurrency import run_in_threadpool
+from app.models.products import (
+    ProductCreate, ProductImportRow, ProductImportResult, ProductImportOut
+)
+from app.models.product_details import ProductDetailsCreate
+from app.models.product_tags import ProductTagCreate
+from app.models.product_menu_categories import ProductMenuCategoryCreate
+from app.db.repositories.products import ProductsRepository
+from app.db.repositories.product_details import ProductDetailsRepository
+from app.db.repositories.product_tags import ProductTagsRepository
+from app.db.repositories.product_menu_categories import ProductMenuCategoriesRepository
+from app.db.repositories.tags import TagsRepository
+from app.db.repositories.menu_categories import MenuCategoriesRepository
+from app.api.dependencies.database import get_database, get_repository
+from app.api.dependencies.auth import get_current_store_id
+from app.api.dependencies.cache import get_cache
+from app.api.enums.products import ImportRowStatus
+from app.api.exceptions.products import InvalidMenuFile
+from app.cache.versions import store_version_key, bump_version
+from app.metrics.requests import query_budget
+from app.storage.sniffing import SNIFF_SIZE, sniff_image_type
+from app.jobs.queue import BlobWriter, new_job_id, enqueue
+from app.jobs.images import PROCESS_PRODUCT_IMAGE
+from app.core.config import (
+    BULK_IMPORT_MAX_ROWS,
+    BULK_IMPORT_MAX_IMAGE_SIZE,
+    BULK_IMPORT_UPLOAD_CONCURRENCY,
+    UPLOAD_CHUNK_SIZE,
+)
+from . import router, products_logger
+
+
+def parse_menu_file(menu: UploadFile) -> list[dict]:
+    """
+    Reads the rows of a CSV (with a header row) or JSON Lines menu file.
+    Empty CSV cells are read as missing values.
+    """
+    text = io.TextIOWrapper(menu.file, encoding="utf-8-sig")
+    extension = os.path.splitext(menu.filename or "")[1].lower()
+    try:
+        if extension == ".csv":
+            rows = [
+                {
+                    key: value for key, value in row.items()
+                    if key is not None and value != ""
+                }
+                for row in csv.DictReader(text)
+            ]
+        elif extension == ".jsonl":
+            rows = [json.loads(line) for line in text if line.strip()]
+        else:
+            raise InvalidMenuFile("The menu file should be a .csv or a .jsonl file.")
+    except (UnicodeDecodeError, csv.Error, json.JSONDecodeError) as exc:
+        raise InvalidMenuFile(f"The menu file could not be parsed: {exc}")
+
+    if not all(isinstance(row, dict) for row in rows):
+        raise InvalidMenuFile("Every line of a .jsonl menu should be an object.")
+    return rows
+
+
+def format_validation_errors(exc: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    ]
+
+
+def validate_rows(
+    raw_rows: list[dict],
+    existing_names: set[str],
+    tag_ids: set[int],
+    menu_category_ids: set[int],
+    image_types: dict[str, Optional[str]],
+) -> tuple[dict[int, ProductImportRow], dict[int, list[str]]]:
+    """
+    Validates every row up front. Returns the valid rows and the errors of
+    the invalid ones, both keyed by their 1-based row number.
+    """
+    rows, errors = {}, {}
+    seen_names = set()
+    for row_number, raw_row in enumerate(raw_rows, start=1):
+        try:
+            row = ProductImportRow.model_validate(raw_row)
+        except ValidationError as exc:
+            errors[row_number] = format_validation_errors(exc)
+            continue
+
+        row_errors = []
+        if row.name in existing_names:
+            row_errors.append(f"There is already a product with the name {row.name} for your store.")
+        if row.name in seen_names:
+            row_errors.append(f"The name {row.name} is used by an earlier row.")
+        if unknown := set(row.tag_ids) - tag_ids:
+            row_errors.append(f"Unknown tag ids: {sorted(unknown)}")
+        if unknown := set(row.menu_category_ids) - menu_category_ids:
+            row_errors.append(f"Unknown menu category ids: {sorted(unknown)}")
+        if row.image is not None and row.image not in image_types:
+            row_errors.append(f"The image {row.image} is not in the images archive.")
+        elif row.image is not None and image_types[row.image] is None:
+            row_errors.append(f"The image {row.image} is not a PNG, JPEG, GIF or WebP image.")
+        seen_names.add(row.name)
+
+        if row_errors:
+            errors[row_number] = row_errors
+        else:
+            rows[row_number] = row
+    return rows, errors
+
+
+async def queue_images(
+    cache: "Redis",
+    archive: zipfile.ZipFile,
+    rows: dict[int, ProductImportRow],
+    created_ids: dict[int, int],
+    store_id: int,
+) -> dict[int, str]:
+    """
+    Queues the images of the created rows for the PROCESS_PRODUCT_IMAGE job,
+    which resizes and uploads them and then sets the image URLs of their
+    products. Reads at most BULK_IMPORT_UPLOAD_CONCURRENCY images from the
+    archive at a time. Returns the errors of the rows whose image could not
+    be queued.
+    """
+    semaphore = asyncio.Semaphore(BULK_IMPORT_UPLOAD_CONCURRENCY)
+    errors = {}
+
+    async def queue_row_image(row_number: int, row: ProductImportRow) -> None:
+        job_id = new_job_id()
+        product_image = BlobWriter(cache, job_id)
+        async with semaphore:
+            try:
+                entry = await run_in_threadpool(archive.open, row.image)
+                with entry:
+                    while chunk := await run_in_threadpool(entry.read, UPLOAD_CHUNK_SIZE):
+                        await product_image.write(chunk)
+                await enqueue(
+                    cache,
+                    PROCESS_PRODUCT_IMAGE,
+                    {
+                        "product_id": created_ids[row_number],
+                        "store_id": store_id,
+                        "name": row.name,
+                    },
+                    job_id=job_id
+                )
+            except Exception as exc:
+                # A partly written image expires after JOB_BLOB_TTL seconds
+                products_logger.exception(exc)
+                errors[row_number] = (
+                    f"The product was created, but its image {row.image} could not be processed."
+                )
+
+    await asyncio.gather(*[
+        queue_row_image(row_number, row)
+        for row_number, row in rows.items()
+        if row.image is not None and row_number in created_ids
+    ])
+    return errors
+
+
+def open_images_archive(images: Optional[UploadFile]) -> Optional[zipfile.ZipFile]:
+    if images is None:
+        return None
+    try:
+        archive = zipfile.ZipFile(images.file)
+    except zipfile.BadZipFile:
+        raise InvalidMenuFile("The images should be uploaded as a zip archive.")
+
+    for info in archive.infolist():
+        if info.file_size > BULK_IMPORT_MAX_IMAGE_SIZE:
+            raise InvalidMenuFile(
+                f"The image {info.filename} is larger than {BULK_IMPORT_MAX_IMAGE_SIZE} bytes."
+            )
+    return archive
+
+
+def sniff_archive_images(
+    archive: Optional[zipfile.ZipFile], names: set[str]
+) -> dict[str, Optional[str]]:
+    """
+    Content types of the given archive entries, sniffed from their first
+    bytes (None for unsupported ones). Names not in the archive are left out.
+    """
+    if archive is None:
+        return {}
+    image_types = {}
+    for name in names & set(archive.namelist()):
+        with archive.open(name) as entry:
+            image_types[name] = sniff_image_type(entry.read(SNIFF_SIZE))
+    return image_types
+
+
+@router.post(
+    "/bulk",
+    response_model=ProductImportOut,
+    name="bulk-import-products",
+)
+@query_budget(7)
+async def bulk_import_products(
+    store_id: Annotated[int, Depends(get_current_store_id)],
+    db: Annotated[Database, Depends(get_database)],
+    cache: Annotated["Redis", Depends(get_cache)],
+    product_repo: Annotated[
+        ProductsRepository, Depends(get_repository(ProductsRepository))
+    ],
+    product_details_repo: Annotated[
+        ProductDetailsRepository,
+        Depends(get_repository(ProductDetailsRepository))
+    ],
+    product_tag_repo: Annotated[
+        ProductTagsRepository, Depends(get_repository(ProductTagsRepository))
+    ],
+    product_menu_category_repo: Annotated[
+        ProductMenuCategoriesRepository,
+        Depends(get_repository(ProductMenuCategoriesRepository))
+    ],
+    tag_repo: Annotated[
+        TagsRepository, Depends(get_repository(TagsRepository))
+    ],
+    menu_category_repo: Annotated[
+        MenuCategoriesRepository,
+        Depends(get_repository(MenuCategoriesRepository))
+    ],
+    menu: UploadFile = File(...),
+    images: UploadFile = File(None),
+) -> ProductImportOut:
+    try:
+        raw_rows = parse_menu_file(menu)
+        if not raw_rows:
+            raise InvalidMenuFile("The menu file has no rows.")
+        if len(raw_rows) > BULK_IMPORT_MAX_ROWS:
+            raise InvalidMenuFile(
+                f"A menu can have at most {BULK_IMPORT_MAX_ROWS} rows."
+            )
+        archive = open_images_archive(images)
+
+        existing_names = await product_repo.get_existing_product_names(
+            store_id=store_id,
+            names=[
+                str(raw_row["name"]) for raw_row in raw_rows
+                if raw_row.get("name") is not None
+            ]
+        )
+        tags = await tag_repo.get_all_tags(cache=cache)
+        menu_categories = await menu_category_repo.get_all_menu_categories(
+            cache=cache
+        )
+
+        rows, errors = validate_rows(
+            raw_rows,
+            existing_names=existing_names,
+            tag_ids={tag.id for tag in tags},
+            menu_category_ids={mc.id for mc in menu_categories},
+            image_types=await run_in_threadpool(
+                sniff_archive_images,
+                archive,
+                {
+                    str(raw_row["image"]) for raw_row in raw_rows
+                    if raw_row.get("image") is not None
+                }
+            ),
+        )
+
+        created_ids = {}
+        if rows:
+            async with db.transaction():
+                created_products = await product_repo.create_products(
+                    store_id=store_id,
+                    new_products=[
+                        ProductCreate.from_model(
+                            row,
+                            has_details=bool(
+                                row.calories and row.protein and row.carbs and row.fat
+                            ),
+                            store_id=store_id,
+                        )
+                        for row in rows.values()
+                    ]
+                )
+                product_ids = {
+                    product.name: product.id for product in created_products
+                }
+
+                for row_number, row in list(rows.items()):
+                    if row.name in product_ids:
+                        created_ids[row_number] = product_ids[row.name]
+                    else:
+                        # Taken by a concurrent request since the duplicate check
+                        errors[row_number] = [f"There is already a product with the name {row.name} for your store."]
+                        del rows[row_number]
+
+                await product_details_repo.create_many_product_details(
+                    new_product_details=[
+                        ProductDetailsCreate.from_model(
+                            row, product_id=created_ids[row_number]
+                        )
+                        for row_number, row in rows.items()
+                    ]
+                )
+                await product_tag_repo.create_product_tags(
+                    new_product_tags=[
+                        ProductTagCreate(
+                            product_id=created_ids[row_number], tag_id=tag_id
+                        )
+                        for row_number, row in rows.items()
+                        for tag_id in set(row.tag_ids)
+                    ]
+                )
+                await product_menu_category_repo.create_product_menu_categories(
+                    new_product_menu_categories=[
+                        ProductMenuCategoryCreate(
+                            product_id=created_ids[row_number],
+                            menu_category_id=menu_category_id
+                        )
+                        for row_number, row in rows.items()
+                        for menu_category_id in set(row.menu_category_ids)
+                    ]
+                )
+
+            await bump_version(cache, store_version_key(store_id))
+
+        # Only once committed, so that rows losing a race for their name
+        # never replace the images of the products that won it
+        if archive is not None:
+            image_errors = await queue_images(
+                cache, archive, rows, created_ids, store_id
+            )
+            for row_number, error in image_errors.items():
+                errors[row_number] = [error]
+
+        results = []
+        for row_number, raw_row in enumerate(raw_rows, start=1):
+            name = raw_row.get("name")
+            name = name if isinstance(name, str) else None
+            if row_number in created_ids:
+                results.append(ProductImportResult(
+                    row=row_number,
+                    name=name,
+                    status=ImportRowStatus.CREATED,
+                    id=created_ids[row_number],
+                    errors=errors.get(row_number, [])
+                ))
+            else:
+                results.append(ProductImportResult(
+                    row=row_number,
+                    name=name,
+                    status=ImportRowStatus.FAILED,
+                    errors=errors.get(row_number, [])
+                ))
+
+        return ProductImportOut(
+            created=len(created_ids),
+            failed=len(raw_rows) - len(created_ids),
+            results=results
+        )
+    except InvalidMenuFile as exc:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, str(exc))
+    except Exception as exc:
+        products_logger.exception(exc)
+        raise HTTPException(
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            "Failed to import products."
+        )
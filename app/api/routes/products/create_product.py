@@ -1,10 +1,9 @@
 from typing import Annotated
 from pydantic import ValidationError
 from databases import Database
-from mypy_boto3_s3.client import S3Client
-from fastapi import Depends, status, HTTPException, File, UploadFile, Form
+from fastapi import Depends, Request, status, HTTPException
 from fastapi.encoders import jsonable_encoder
-from app.models.products import ProductCreate, ProductOutCreate
+from app.models.products import ProductCreate, ProductCreateForm, ProductOutCreate
 from app.models.product_details import ProductDetailsCreate, ProductDetailsOut
 from app.models.product_tags import ProductTagCreate
 from app.models.product_menu_categories import ProductMenuCategoryCreate
@@ -16,11 +15,15 @@ from app.db.repositories.product_tags import ProductTagsRepository
 from app.db.repositories.product_menu_categories import ProductMenuCategoriesRepository
 from app.db.repositories.tags import TagsRepository
 from app.db.repositories.menu_categories import MenuCategoriesRepository
-from app.api.dependencies.space_bucket import get_sb_client
 from app.api.dependencies.database import get_database, get_repository
 from app.api.dependencies.auth import get_current_store_id
+from app.api.dependencies.cache import get_cache
 from app.api.exceptions.products import DuplicateProductNameForTheSameStore
-from app.core.config import DO_SPACE_BUCKET_URL
+from app.api.exceptions.uploads import InvalidForm, UnsupportedImageType, ImageTooLarge
+from app.api.uploads import read_form_with_image, validate_form, multipart_request_body
+from app.cache.versions import store_version_key, bump_version
+from app.jobs.queue import BlobWriter, new_job_id, enqueue
+from app.jobs.images import PROCESS_PRODUCT_IMAGE
 from . import router, products_logger
 
 
@@ -42,7 +45,7 @@ async def create_product_tags(
         )
 
         tag = await tag_repo.get_tag_by_id(id=tag_id)
-        tags.append(TagOut(**tag.model_dump()))
+        tags.append(TagOut.from_model(tag))
     return tags
 
 
@@ -64,7 +67,7 @@ async def create_product_menu_categories(
         )
 
         menu_category = await menu_category_repo.get_menu_category_by_id(id=menu_category_id)
-        menu_categories.append(MenuCategoryOut(**menu_category.model_dump()))
+        menu_categories.append(MenuCategoryOut.from_model(menu_category))
     return menu_categories
 
 
@@ -72,12 +75,14 @@ async def create_product_menu_categories(
     "/",
     response_model=ProductOutCreate,
     name="create-product",
-    status_code=status.HTTP_201_CREATED
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=multipart_request_body(ProductCreateForm, "product_image"),
 )
 async def create_product(
+    request: Request,
     store_id: Annotated[int, Depends(get_current_store_id)],
-    sb_client: Annotated[S3Client, Depends(get_sb_client)],
     db: Annotated[Database, Depends(get_database)],
+    cache: Annotated["Redis", Depends(get_cache)],
     product_repo: Annotated[
         ProductsRepository, Depends(get_repository(ProductsRepository))
     ],
@@ -99,22 +104,18 @@ async def create_product(
         MenuCategoriesRepository, 
         Depends(get_repository(MenuCategoriesRepository))
     ],
-    name: str = Form(...),
-    description: str = Form(None),
-    product_image: UploadFile = File(None),
-    price: float = Form(...),
-    is_public: bool = Form(...),
-    calories: int = Form(None),
-    protein: float = Form(None),
-    carbs: float = Form(None),
-    fiber: float = Form(None),
-    sugars: float = Form(None),
-    fat: float = Form(None),
-    saturated_fat: float = Form(None),
-    tag_ids: list[int] = Form(...),
-    menu_category_ids: list[int] = Form(...),
 ) -> ProductOutCreate:
+    # The product image is streamed straight into the input of its job
+    job_id = new_job_id()
+    product_image = BlobWriter(cache, job_id)
+    image_queued = False
     try:
+        form, image_type = await read_form_with_image(
+            request, image_field="product_image", write_image=product_image.write
+        )
+        product_form = validate_form(ProductCreateForm, form)
+        name = product_form.name
+
         db_product = await product_repo.get_product_by_name_and_store_id(
             name=name, store_id=store_id
         )
@@ -122,43 +123,22 @@ async def create_product(
             raise DuplicateProductNameForTheSameStore(f"There is already a product with the name {name} for your store.")
 
         has_details = False
-        if calories and protein and carbs and fat:
+        if product_form.calories and product_form.protein and product_form.carbs and product_form.fat:
             has_details = True
 
-        image_url = None
-        if product_image is not None:
-            space_bucket_folder = 'products'
-            sb_client.upload_fileobj(
-                product_image.file,
-                space_bucket_folder,
-                name,
-                ExtraArgs={"ACL": "public-read"}
-            )
-            image_url = f"{DO_SPACE_BUCKET_URL}/{space_bucket_folder}/{name}"
-
         async with db.transaction():
-            new_product = ProductCreate(
-                name=name,
-                description=description,
-                image_url=image_url,
-                price=price,
+            new_product = ProductCreate.from_model(
+                product_form,
+                image_url=None,
                 has_details=has_details,
-                is_public=is_public,
                 store_id=store_id,
             )
             created_product = await product_repo.create_product(
                 new_product=new_product
             )
 
-            new_product_details = ProductDetailsCreate(
-                calories=calories,
-                protein=protein,
-                carbs=carbs,
-                fiber=fiber,
-                sugars=sugars,
-                fat=fat,
-                saturated_fat=saturated_fat,
-                product_id=created_product.id,
+            new_product_details = ProductDetailsCreate.from_model(
+                product_form, product_id=created_product.id
             )
             created_product_details = await product_details_repo.create_product_details(
                 new_product_details=new_product_details
@@ -166,18 +146,30 @@ async def create_product(
 
             tags = await create_product_tags(
                 product_id=created_product.id,
-                tag_ids=tag_ids,
+                tag_ids=product_form.tag_ids,
                 product_tag_repo=product_tag_repo,
                 tag_repo=tag_repo,
             )
 
             menu_categories = await create_product_menu_categories(
                 product_id=created_product.id,
-                menu_category_ids=menu_category_ids,
+                menu_category_ids=product_form.menu_category_ids,
                 product_menu_category_repo=product_menu_category_repo,
                 menu_category_repo=menu_category_repo,
             )
 
+        await bump_version(cache, store_version_key(store_id))
+
+        if image_type is not None:
+            # Resized and uploaded by a worker, which then sets the image_url
+            await enqueue(
+                cache,
+                PROCESS_PRODUCT_IMAGE,
+                {"product_id": created_product.id, "store_id": store_id, "name": name},
+                job_id=job_id
+            )
+            image_queued = True
+
         return ProductOutCreate(
             id=created_product.id,
             name=created_product.name,
@@ -186,7 +178,7 @@ async def create_product(
             price=created_product.price,
             is_public=created_product.is_public,
             store_id=created_product.store_id,
-            details=ProductDetailsOut(**created_product_details.model_dump()),
+            details=ProductDetailsOut.from_model(created_product_details),
             tags=tags,
             menu_categories=menu_categories,
         )
@@ -195,6 +187,12 @@ async def create_product(
             status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=jsonable_encoder(exc.errors()),
         )
+    except InvalidForm as exc:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, str(exc))
+    except UnsupportedImageType as exc:
+        raise HTTPException(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, str(exc))
+    except ImageTooLarge as exc:
+        raise HTTPException(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, str(exc))
     except DuplicateProductNameForTheSameStore as exc:
         raise HTTPException(status.HTTP_409_CONFLICT, str(exc))
     except Exception as exc:
@@ -203,3 +201,6 @@ async def create_product(
             status.HTTP_500_INTERNAL_SERVER_ERROR,
             "Failed to create product."
         )
+    finally:
+        if not image_queued:
+            await product_image.discard()
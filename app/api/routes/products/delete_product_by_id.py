@@ -14,7 +14,12 @@ from app.db.repositories.menu_categories import MenuCategoriesRepository
 from app.db.repositories.store_profiles import StoreProfilesRepository
 from app.api.dependencies.database import get_database, get_repository
 from app.api.dependencies.auth import get_current_store_id
+from app.api.dependencies.cache import get_cache
 from app.api.exceptions.products import ProductNotFound, ProductBelongsToAnotherStore
+from app.cache.versions import store_version_key, bump_version
+from app.metrics.requests import query_budget
+from app.jobs.storage_cleanup import enqueue_product_image_deletion
+from app.core.config import PRODUCT_SOFT_DELETE
 from . import router, products_logger
 
 
@@ -23,9 +28,11 @@ from . import router, products_logger
     status_code=status.HTTP_204_NO_CONTENT,
     name="delete-product-by-id"
 )
+@query_budget(2)
 async def delete_product_by_id(
     id: Annotated[int, Path(ge=1)],
     store_id: Annotated[int, Depends(get_current_store_id)],
+    cache: Annotated["Redis", Depends(get_cache)],
     product_repo: Annotated[
         ProductsRepository, Depends(get_repository(ProductsRepository))
     ]
@@ -40,7 +47,11 @@ async def delete_product_by_id(
                 f"The product with the id of {id} belongs to another store. You can only delete products that belong to your store."
             )
         
-        await product_repo.delete_product_by_id(id=id)
+        await product_repo.delete_product_by_id(id=id, soft=PRODUCT_SOFT_DELETE)
+        await bump_version(cache, store_version_key(store_id))
+        if not PRODUCT_SOFT_DELETE:
+            # Otherwise deleted once the product is purged
+            await enqueue_product_image_deletion(cache, [db_product])
     except ProductNotFound as exc:
         raise HTTPException(status.HTTP_404_NOT_FOUND, str(exc))
     except ProductBelongsToAnotherStore as exc:
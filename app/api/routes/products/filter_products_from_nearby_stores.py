@@ -1,8 +1,10 @@
-import copy
 import itertools
 from typing import Annotated
 from fastapi import APIRouter, Depends, status, HTTPException, Query
 from app.models.products import Filters, FilterOut
+from app.models.tags import TagOut
+from app.models.menu_categories import MenuCategoryOut
+from app.api.responses import PydanticJSONResponse
 from app.db.repositories.store_profiles import StoreProfilesRepository
 from app.db.repositories.products import ProductsRepository
 from app.db.repositories.tags import TagsRepository
@@ -21,9 +23,12 @@ def create_separate_product_for_each_matching_menu_category(
 ) -> None:
     for menu_category in menu_categories:
         if menu_category.id in menu_category_ids:
-            product_cp = copy.deepcopy(product)
-            product_cp["menu_category"] = menu_category.model_dump()
-            completed_products.append(product_cp)
+            # A shallow copy is enough, only the menu_category key differs
+            # between the copies and the nested values are never mutated.
+            completed_products.append({
+                **product,
+                "menu_category": MenuCategoryOut.from_model(menu_category)
+            })
 
 
 async def attach_related_info_to_products(
@@ -44,7 +49,7 @@ async def attach_related_info_to_products(
 ) -> list[dict]:
     completed_products = []
     for product in products:
-        product = product.model_dump()
+        product = dict(product.__dict__)
 
         product["store"] = await store_profile_repo.get_store_profile_filter_view_by_store_id(
             store_id=product["store_id"],
@@ -52,9 +57,10 @@ async def attach_related_info_to_products(
             lng=lng
         )
 
-        product["tags"] = await tag_repo.get_tags_for_product_by_product_id(
+        tags = await tag_repo.get_tags_for_product_by_product_id(
             product_id=product["id"]
         )
+        product["tags"] = [TagOut.from_model(tag) for tag in tags]
 
         menu_categories = await menu_category_repo.get_menu_categories_for_product_by_product_id(
             product_id=product["id"]
@@ -71,7 +77,7 @@ async def attach_related_info_to_products(
 
 def group_products_by_menu_category(products: list[dict]) -> list[dict]:
     products_by_menu_categories = []
-    products.sort(key=lambda product: product["menu_category"]["id"])
+    products.sort(key=lambda product: product["menu_category"].id)
     for key, group in itertools.groupby(
         products, lambda product: product["menu_category"]
     ):
@@ -167,7 +173,9 @@ async def filter_products_from_nearby_stores(
             products_by_menu_categories, sort_by, sort_order
         )
 
-        return {"products_by_menu_categories": products_by_menu_categories}
+        return PydanticJSONResponse(
+            FilterOut(products_by_menu_categories=products_by_menu_categories)
+        )
     except Exception as exc:
         products_logger.exception(exc)
         raise HTTPException(
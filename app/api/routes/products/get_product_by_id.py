@@ -1,5 +1,5 @@
-from typing import Annotated
-from fastapi import Depends, status, HTTPException, Path
+from typing import Annotated, Optional
+from fastapi import Depends, Header, status, HTTPException, Path
 from app.models.products import ProductDetailed, ProductDetailedOut
 from app.models.product_details import ProductDetailsOut
 from app.models.tags import TagOut
@@ -13,13 +13,22 @@ from app.db.repositories.tags import TagsRepository
 from app.db.repositories.menu_categories import MenuCategoriesRepository
 from app.db.repositories.store_profiles import StoreProfilesRepository
 from app.api.dependencies.database import get_database, get_repository
+from app.api.dependencies.cache import get_cache
 from app.api.exceptions.products import ProductNotFound
+from app.api.responses import (
+    make_etag, etag_matches, not_modified,
+    get_precompressed_response, precompress_response
+)
+from app.api.compression import choose_encoding
+from app.cache.versions import CATALOG_VERSION_KEY, store_version_key, get_versions
+from app.core.config import PRODUCT_CACHE_CONTROL
 from . import router, products_logger
 
 
 @router.get("/{id}", response_model=ProductDetailedOut, name="get-product-by-id")
 async def get_product_by_id(
     id: Annotated[int, Path(ge=1)],
+    cache: Annotated["Redis", Depends(get_cache)],
     product_repo: Annotated[
         ProductsRepository, Depends(get_repository(ProductsRepository))
     ],
@@ -36,7 +45,9 @@ async def get_product_by_id(
     menu_category_repo: Annotated[
         MenuCategoriesRepository,
         Depends(get_repository(MenuCategoriesRepository))
-    ]
+    ],
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    accept_encoding: Annotated[Optional[str], Header()] = None
 ) -> ProductDetailedOut:
     try:
         db_product = await product_repo.get_product_by_id(id=id)
@@ -45,12 +56,31 @@ async def get_product_by_id(
         
         await product_repo.increment_product_view_count_by_id(id=id)
 
+        # Rebuilding the catalog lists once expired bumps the catalog
+        # version if they changed
+        await tag_repo.get_all_tags(cache=cache)
+        await menu_category_repo.get_all_menu_categories(cache=cache)
+        store_version, catalog_version = await get_versions(
+            cache, store_version_key(db_product.store_id), CATALOG_VERSION_KEY
+        )
+        etag = make_etag("product", id, store_version, catalog_version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, PRODUCT_CACHE_CONTROL)
+
+        headers = {"ETag": etag, "Cache-Control": PRODUCT_CACHE_CONTROL}
+        encoding = choose_encoding(accept_encoding)
+        cached_response = await get_precompressed_response(
+            cache=cache, etag=etag, encoding=encoding, headers=headers
+        )
+        if cached_response is not None:
+            return cached_response
+
         db_product_details = await product_details_repo.get_product_details_by_product_id(
             product_id=db_product.id
         )
 
         db_store_profile = await store_profile_repo.get_store_profile_simple_view_by_store_id(
-            store_id=db_product.store_id
+            cache=cache, store_id=db_product.store_id
         )
 
         db_tags = await tag_repo.get_tags_for_product_by_product_id(
@@ -61,24 +91,24 @@ async def get_product_by_id(
             product_id=db_product.id
         )
 
-        return {
-            "product": ProductDetailed(
-                **db_product.model_dump(),
-                store=StoreProfileOutProductDetailed(
-                    **db_store_profile.model_dump()
-                ),
-                details=ProductDetailsOut(
-                    **db_product_details.model_dump()
+        return await precompress_response(
+            cache=cache,
+            etag=etag,
+            encoding=encoding,
+            content=ProductDetailedOut(product=ProductDetailed.from_model(
+                db_product,
+                store=StoreProfileOutProductDetailed.from_model(
+                    db_store_profile
                 ),
-                tags=[
-                    TagOut(**tag.model_dump()) for tag in db_tags
-                ],
+                details=ProductDetailsOut.from_model(db_product_details),
+                tags=[TagOut.from_model(tag) for tag in db_tags],
                 menu_categories=[
-                    MenuCategoryOut(**menu_category.model_dump())
+                    MenuCategoryOut.from_model(menu_category)
                     for menu_category in db_menu_categories
                 ]
-            )
-        }
+            )),
+            headers=headers
+        )
     except ProductNotFound as exc:
         raise HTTPException(status.HTTP_404_NOT_FOUND, str(exc))
     except Exception as exc:
@@ -1,28 +1,38 @@
-import copy
 import itertools
-from typing import Annotated
+from typing import Annotated, Optional
 from pydantic import ValidationError
 from databases import Database
-from mypy_boto3_s3.client import S3Client
-from fastapi import APIRouter, Path, Body, Depends, status, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, Path, Body, Depends, Header, Request, status, HTTPException
 from fastapi.encoders import jsonable_encoder
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from app.services import auth_service
 from app.models.core import DetailResponse
+from app.models.tags import TagOut
+from app.models.menu_categories import MenuCategoryOut
 from app.models.token import AccessToken
-from app.models.stores import StoreCreate, StoreInDB
+from app.models.stores import StoreCreate, StoreInDB, StoreRegistrationForm
 from app.models.store_profiles import StoreProfileCreate, StoreProfileInDB, StoreProfileOut, StoreProfileOutWithProducts
 from app.db.repositories.stores import StoresRepository
 from app.db.repositories.store_profiles import StoreProfilesRepository
 from app.db.repositories.products import ProductsRepository
 from app.db.repositories.tags import TagsRepository
 from app.db.repositories.menu_categories import MenuCategoriesRepository
-from app.api.dependencies.space_bucket import get_sb_client
 from app.api.dependencies.auth import get_current_store_profile
 from app.api.dependencies.database import get_database, get_repository
+from app.api.dependencies.cache import get_cache
+from app.api.responses import (
+    make_etag, etag_matches, not_modified,
+    get_precompressed_response, precompress_response
+)
+from app.api.compression import choose_encoding
+from app.cache.versions import CATALOG_VERSION_KEY, store_version_key, get_versions
 from app.api.exceptions.auth import EmailAlreadyExists, InvalidCredentials
 from app.api.exceptions.stores import StoreNameAlreadyExists, StoreNotVerified, StoreNotFound
-from app.core.config import DO_SPACE_BUCKET_URL
+from app.api.exceptions.uploads import InvalidForm, UnsupportedImageType, ImageTooLarge
+from app.api.uploads import read_form_with_image, validate_form, multipart_request_body
+from app.jobs.queue import BlobWriter, new_job_id, enqueue
+from app.jobs.images import PROCESS_STORE_LOGO
+from app.core.config import STORE_MENU_CACHE_CONTROL
 from app.core.logging import get_logger
 
 
@@ -31,24 +41,31 @@ router = APIRouter()
 stores_logger = get_logger(__name__)
 
 
-@router.post("/register", response_model=DetailResponse, name="register-new-store", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/register",
+    response_model=DetailResponse,
+    name="register-new-store",
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=multipart_request_body(StoreRegistrationForm, "logo_image"),
+)
 async def register_new_store(
-    sb_client: Annotated[S3Client, Depends(get_sb_client)],
+    request: Request,
     db: Annotated[Database, Depends(get_database)],
+    cache: Annotated["Redis", Depends(get_cache)],
     store_repo: Annotated[StoresRepository, Depends(get_repository(StoresRepository))],
     store_profile_repo: Annotated[StoreProfilesRepository, Depends(get_repository(StoreProfilesRepository))],
-    email: str = Form(...),
-    password: str = Form(...),
-    conf_password: str = Form(...),
-    name: str = Form(...),
-    desc: str = Form(None),
-    logo_image: UploadFile = File(None),
-    phone_number: int = Form(None),
-    address: str = Form(...),
-    lat: float = Form(...),
-    lng: float = Form(...)
 ) -> DetailResponse:
+    # The logo is streamed straight into the input of its job
+    job_id = new_job_id()
+    logo_image = BlobWriter(cache, job_id)
+    logo_queued = False
     try:
+        form, logo_type = await read_form_with_image(
+            request, image_field="logo_image", write_image=logo_image.write
+        )
+        registration = validate_form(StoreRegistrationForm, form)
+        email, name = registration.email, registration.name
+
         db_store = await store_repo.get_store_by_email(email=email)
         if db_store:
             raise EmailAlreadyExists(f"There is already an account registered with the email {email}")
@@ -57,43 +74,50 @@ async def register_new_store(
         if db_store_profile:
             raise StoreNameAlreadyExists(f"There is already an account registered with the name {name}")
 
-        logo_url = None
-        if logo_image is not None:
-            space_bucket_folder = 'store_profiles'
-            sb_client.upload_fileobj(
-                logo_image.file,
-                space_bucket_folder,
-                name,
-                ExtraArgs={"ACL": "public-read"}
-            )
-            logo_url = f"{DO_SPACE_BUCKET_URL}/{space_bucket_folder}/{name}"
-        
         async with db.transaction():
             new_store = StoreCreate(
-                email=email, password=password, conf_password=conf_password
+                email=email,
+                password=registration.password,
+                conf_password=registration.conf_password
             )
             created_store = await store_repo.register_new_store(new_store=new_store)
 
             new_store_profile = StoreProfileCreate(
                 name=name,
-                desc=desc,
-                logo_url=logo_url,
-                phone_number=phone_number,
-                address=address,
-                lat=lat,
-                lng=lng,
+                desc=registration.desc,
+                logo_url=None,
+                phone_number=registration.phone_number,
+                address=registration.address,
+                lat=registration.lat,
+                lng=registration.lng,
                 store_id=created_store.id,
             )
             created_store_profile = await store_profile_repo.create_new_store_profile(
                 new_store_profile=new_store_profile
             )
 
+        if logo_type is not None:
+            # Resized and uploaded by a worker, which then sets the logo_url
+            await enqueue(
+                cache,
+                PROCESS_STORE_LOGO,
+                {"store_id": created_store.id, "name": name},
+                job_id=job_id
+            )
+            logo_queued = True
+
         return DetailResponse(detail="Successfully submitted for review.")
     except ValidationError as exc:
         raise HTTPException(
             status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=jsonable_encoder(exc.errors()),
         )
+    except InvalidForm as exc:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, str(exc))
+    except UnsupportedImageType as exc:
+        raise HTTPException(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, str(exc))
+    except ImageTooLarge as exc:
+        raise HTTPException(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, str(exc))
     except EmailAlreadyExists as exc:
         raise HTTPException(status.HTTP_409_CONFLICT, str(exc))
     except StoreNameAlreadyExists as exc:
@@ -104,6 +128,9 @@ async def register_new_store(
             status.HTTP_500_INTERNAL_SERVER_ERROR, 
             "Failed to register store."
         )
+    finally:
+        if not logo_queued:
+            await logo_image.discard()
 
 
 @router.post('/login', response_model=AccessToken, name="store-login")
@@ -161,9 +188,12 @@ def create_separate_product_for_each_menu_category(
     completed_products: list[dict]
 ) -> None:
     for menu_category in menu_categories:
-        product_cp = copy.deepcopy(product)
-        product_cp["menu_category"] = menu_category.model_dump()
-        completed_products.append(product_cp)
+        # A shallow copy is enough, only the menu_category key differs
+        # between the copies and the nested values are never mutated.
+        completed_products.append({
+            **product,
+            "menu_category": MenuCategoryOut.from_model(menu_category)
+        })
 
 
 async def attach_related_info_to_products(
@@ -178,11 +208,12 @@ async def attach_related_info_to_products(
 ) -> list[dict]:
     completed_products = []
     for product in products:
-        product = product.model_dump()
+        product = dict(product.__dict__)
 
-        product["tags"] = await tag_repo.get_tags_for_product_by_product_id(
+        tags = await tag_repo.get_tags_for_product_by_product_id(
             product_id=product["id"]
         )
+        product["tags"] = [TagOut.from_model(tag) for tag in tags]
 
         menu_categories = await menu_category_repo.get_menu_categories_for_product_by_product_id(
             product_id=product["id"]
@@ -198,7 +229,7 @@ async def attach_related_info_to_products(
 
 def group_products_by_menu_category(products: list[dict]) -> list[dict]:
     products_by_menu_categories = []
-    products.sort(key=lambda product: product["menu_category"]["id"])
+    products.sort(key=lambda product: product["menu_category"].id)
     for key, group in itertools.groupby(
         products, lambda product: product["menu_category"]
     ):
@@ -219,6 +250,7 @@ def group_products_by_menu_category(products: list[dict]) -> list[dict]:
 )
 async def get_store_by_id(
     id: Annotated[int, Path(ge=1)],
+    cache: Annotated["Redis", Depends(get_cache)],
     product_repo: Annotated[
         ProductsRepository, Depends(get_repository(ProductsRepository))
     ],
@@ -231,15 +263,36 @@ async def get_store_by_id(
     menu_category_repo: Annotated[
         MenuCategoriesRepository,
         Depends(get_repository(MenuCategoriesRepository))
-    ]
+    ],
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    accept_encoding: Annotated[Optional[str], Header()] = None
 ) -> StoreProfileOutWithProducts:
     try:
         db_store_profile = await store_profile_repo.get_store_profile_by_store_id(
-            store_id=id
+            cache=cache, store_id=id
         )
         if not db_store_profile:
             raise StoreNotFound(f"There is no store with the id of {id}")
 
+        # Rebuilding the catalog lists once expired bumps the catalog
+        # version if they changed
+        await tag_repo.get_all_tags(cache=cache)
+        await menu_category_repo.get_all_menu_categories(cache=cache)
+        store_version, catalog_version = await get_versions(
+            cache, store_version_key(id), CATALOG_VERSION_KEY
+        )
+        etag = make_etag("store", id, store_version, catalog_version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, STORE_MENU_CACHE_CONTROL)
+
+        headers = {"ETag": etag, "Cache-Control": STORE_MENU_CACHE_CONTROL}
+        encoding = choose_encoding(accept_encoding)
+        cached_response = await get_precompressed_response(
+            cache=cache, etag=etag, encoding=encoding, headers=headers
+        )
+        if cached_response is not None:
+            return cached_response
+
         db_products = await product_repo.get_products_from_store_by_id(
             store_id=id
         )
@@ -254,10 +307,16 @@ async def get_store_by_id(
             completed_products
         )
 
-        return {
-            **db_store_profile.model_dump(),
-            "products_by_menu_categories": products_by_menu_categories
-        }
+        return await precompress_response(
+            cache=cache,
+            etag=etag,
+            encoding=encoding,
+            content=StoreProfileOutWithProducts(
+                **db_store_profile.__dict__,
+                products_by_menu_categories=products_by_menu_categories
+            ),
+            headers=headers
+        )
     except StoreNotFound as exc:
         raise HTTPException(status.HTTP_404_NOT_FOUND, str(exc))
     except Exception as exc:
@@ -1,9 +1,14 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from app.core.logging import get_logger
 from app.models.tags import TagOut, TagsOut
 from app.db.repositories.tags import TagsRepository
 from app.api.dependencies.database import get_repository
+from app.api.dependencies.cache import get_cache
+from app.api.responses import make_etag, etag_matches, not_modified
+from app.metrics.requests import query_budget
+from app.cache.versions import CATALOG_VERSION_KEY, get_versions
+from app.core.config import CATALOG_CACHE_CONTROL
 
 
 router = APIRouter()
@@ -16,14 +21,29 @@ tags_logger = get_logger(__name__)
     response_model=TagsOut,
     name="get-all-tags"
 )
+@query_budget(1)
 async def get_all_tags(
+    response: Response,
+    cache: Annotated["Redis", Depends(get_cache)],
     tag_repo: Annotated[
         TagsRepository, Depends(get_repository(TagsRepository))
-    ]
+    ],
+    if_none_match: Annotated[Optional[str], Header()] = None
 ) -> TagsOut:
     try:
-        db_tags = await tag_repo.get_all_tags()
-        return TagsOut(tags=[TagOut(**tag.model_dump()) for tag in db_tags])
+        # Read first, rebuilding the list once expired bumps the catalog
+        # version if the tags changed
+        db_tags = await tag_repo.get_all_tags(cache=cache)
+
+        [catalog_version] = await get_versions(cache, CATALOG_VERSION_KEY)
+        etag = make_etag("tags", catalog_version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, CATALOG_CACHE_CONTROL)
+
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CATALOG_CACHE_CONTROL
+
+        return TagsOut(tags=[TagOut.from_model(tag) for tag in db_tags])
     except Exception as exc:
         tags_logger.exception(exc)
         raise HTTPException(
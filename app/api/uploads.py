@@ -0,0 +1,194 @@
+from typing import Awaitable, Callable, Optional, get_origin
+import multipart
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import parse_options_header
+from starlette.datastructures import FormData
+from starlette.requests import Request
+from app.models.core import CoreModel
+from app.api.exceptions.uploads import InvalidForm, UnsupportedImageType, ImageTooLarge
+from app.storage.sniffing import SNIFF_SIZE, sniff_image_type
+from app.core.config import IMAGE_UPLOAD_MAX_SIZE, UPLOAD_CHUNK_SIZE, FORM_FIELDS_MAX_SIZE
+
+
+class _FormStreamParser:
+    """
+    python-multipart callbacks that keep the form fields, and hand the data
+    of the image file over as it arrives. Other files are skipped.
+    """
+
+    def __init__(self, image_field: str, max_image_size: int) -> None:
+        self.image_field = image_field
+        self.max_image_size = max_image_size
+        self.fields: list[tuple[str, str]] = []
+        self.fields_size = 0
+        self.image_chunks: list[bytes] = []
+        self.image_size = 0
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._part_name = ""
+        self._part_kind = "field"
+        self._part_data = bytearray()
+        self._has_image = False
+
+
+    @property
+    def callbacks(self) -> dict[str, Callable]:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+
+    def on_part_begin(self) -> None:
+        self._disposition = b""
+        self._part_data = bytearray()
+
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+
+    def on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        if b"name" not in options:
+            raise InvalidForm('Every form field should have a "name".')
+
+        self._part_name = options[b"name"].decode("utf-8", "replace")
+        if b"filename" not in options:
+            self._part_kind = "field"
+        elif self._part_name == self.image_field and not self._has_image:
+            self._part_kind = "image"
+            self._has_image = True
+        else:
+            self._part_kind = "skipped"
+
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._part_kind == "field":
+            self.fields_size += end - start
+            if self.fields_size > FORM_FIELDS_MAX_SIZE:
+                raise InvalidForm(
+                    f"The form fields should add up to at most {FORM_FIELDS_MAX_SIZE} bytes."
+                )
+            self._part_data += data[start:end]
+        elif self._part_kind == "image":
+            self.image_size += end - start
+            if self.image_size > self.max_image_size:
+                raise ImageTooLarge(
+                    f"The image should be at most {self.max_image_size} bytes."
+                )
+            self.image_chunks.append(data[start:end])
+
+
+    def on_part_end(self) -> None:
+        if self._part_kind == "field":
+            self.fields.append(
+                (self._part_name, self._part_data.decode("utf-8", "replace"))
+            )
+
+
+async def read_form_with_image(
+    request: Request,
+    *,
+    image_field: str,
+    write_image: Callable[[bytes], Awaitable[None]],
+    max_image_size: int = IMAGE_UPLOAD_MAX_SIZE,
+) -> tuple[FormData, Optional[str]]:
+    """
+    Parses a multipart form while it is being received. The `image_field`
+    file is passed to `write_image` in chunks of UPLOAD_CHUNK_SIZE bytes
+    instead of being spooled to a temporary file, and the request is
+    rejected as soon as its first bytes are not a supported image or it
+    grows past `max_image_size`. Returns the other fields and the content
+    type of the image, None when no image was sent. Url-encoded forms are
+    accepted too, without an image.
+    """
+    content_type, params = parse_options_header(
+        request.headers.get("Content-Type", "")
+    )
+    if content_type == b"application/x-www-form-urlencoded":
+        # Cannot carry a file
+        return await request.form(), None
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise InvalidForm("The request should be sent as a form.")
+
+    form = _FormStreamParser(image_field, max_image_size)
+    parser = multipart.MultipartParser(params[b"boundary"], form.callbacks)
+    image_type = None
+    buffer = bytearray()
+
+    async def write_buffered_image(final: bool) -> None:
+        nonlocal image_type
+        buffer.extend(b"".join(form.image_chunks))
+        form.image_chunks.clear()
+
+        if image_type is None and (len(buffer) >= SNIFF_SIZE or (final and buffer)):
+            image_type = sniff_image_type(bytes(buffer[:SNIFF_SIZE]))
+            if image_type is None:
+                raise UnsupportedImageType(
+                    "The image should be a PNG, JPEG, GIF or WebP file."
+                )
+        if image_type is None:
+            return
+        while len(buffer) >= UPLOAD_CHUNK_SIZE:
+            await write_image(bytes(buffer[:UPLOAD_CHUNK_SIZE]))
+            del buffer[:UPLOAD_CHUNK_SIZE]
+        if final and buffer:
+            await write_image(bytes(buffer))
+            buffer.clear()
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            await write_buffered_image(final=False)
+        parser.finalize()
+    except MultipartParseError as exc:
+        raise InvalidForm(f"The form could not be parsed: {exc}")
+    await write_buffered_image(final=True)
+
+    return FormData(form.fields), image_type
+
+
+def validate_form(model: type[CoreModel], form: FormData) -> CoreModel:
+    """
+    Validates the fields of a form against `model`. List fields take every
+    value sent under their name, and empty values count as missing.
+    """
+    values = {}
+    for name, field in model.model_fields.items():
+        items = [item for item in form.getlist(name) if item != ""]
+        if items:
+            values[name] = items if get_origin(field.annotation) is list else items[-1]
+    return model.model_validate(values)
+
+
+def multipart_request_body(model: type[CoreModel], image_field: str) -> dict:
+    """
+    OpenAPI request body of a form read with read_form_with_image, for the
+    `openapi_extra` of its route.
+    """
+    schema = model.model_json_schema()
+    schema["properties"][image_field] = {"type": "string", "format": "binary"}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"multipart/form-data": {"schema": schema}},
+        }
+    }
@@ -0,0 +1,38 @@
+import sys
+from array import array
+from typing import Iterable
+
+
+# Packed ids are always a multiple of the 4 byte item size, so a single
+# byte can never be mistaken for a list of ids.
+EMPTY_ID_LIST = b"\x00"
+
+_ID_TYPECODE = "I"
+
+
+def encode_ids(ids: Iterable[int]) -> bytes:
+    """
+    Packs non-negative ids (< 2**32) into little-endian unsigned 32-bit
+    integers, e.g. for storing a list of ids with a single SET.
+    """
+    packed = array(_ID_TYPECODE, ids)
+    if not packed:
+        return EMPTY_ID_LIST
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def decode_ids(data: bytes) -> list[int]:
+    """
+    Reverses encode_ids. The buffer is reinterpreted in place through a
+    memoryview rather than parsed id by id.
+    """
+    if data == EMPTY_ID_LIST:
+        return []
+    if sys.byteorder == "big":
+        packed = array(_ID_TYPECODE)
+        packed.frombytes(data)
+        packed.byteswap()
+        return packed.tolist()
+    return memoryview(data).cast(_ID_TYPECODE).tolist()
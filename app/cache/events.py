@@ -1,8 +1,10 @@
 import os
+import asyncio
 import redis.asyncio as redis
 from fastapi import FastAPI
-from app.core.config import REDIS_URL
+from app.core.config import REDIS_URL, REDIS_MAX_CONNECTIONS, REDIS_POOL_TIMEOUT
 from app.core.logging import get_logger
+from app.cache.two_tier import listen_for_invalidations
 
 
 cache_events_logger = get_logger(__name__)
@@ -12,16 +14,22 @@ async def establish_cache_connection_pool(app: FastAPI) -> None:
     CACHE_URL = f"{REDIS_URL}_test" if os.environ.get("TESTING") else REDIS_URL
 
     try:
-        cache = await redis.from_url(
-            CACHE_URL, encoding="utf-8", decode_responses=True
-        )
+        # Responses are left as bytes, values are decoded by whoever
+        # encoded them (see app.cache.codecs for the packed id lists).
+        cache = redis.Redis.from_pool(redis.BlockingConnectionPool.from_url(
+            CACHE_URL, max_connections=REDIS_MAX_CONNECTIONS, timeout=REDIS_POOL_TIMEOUT
+        ))
         app.state._cache_conn_pool = cache
+        app.state._cache_invalidation_listener = asyncio.create_task(
+            listen_for_invalidations(cache)
+        )
     except Exception as exc:
         cache_events_logger.exception(exc)
 
 
 async def release_cache_connection_pool(app: FastAPI) -> None:
     try:
+        app.state._cache_invalidation_listener.cancel()
         await app.state._cache_conn_pool.aclose()
     except Exception as exc:
         cache_events_logger.exception(exc)
@@ -0,0 +1,80 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+from redis.exceptions import LockError
+from app.core.config import (
+    CACHE_REBUILD_LOCK_TIMEOUT,
+    CACHE_REBUILD_WAIT_TIMEOUT,
+    CACHE_REBUILD_POLL_INTERVAL,
+)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing the same key into a single in-flight
+    call, so identical cache misses within a worker await one future.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Any, asyncio.Future] = {}
+
+
+    def _forget(self, key: Any, call: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Mark the outcome as retrieved even if every waiter was cancelled.
+        if not call.cancelled():
+            call.exception()
+
+
+    async def do(self, key: Any, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._forget(key, done))
+        # Shielded so that a cancelled caller does not cancel the shared call.
+        return await asyncio.shield(call)
+
+
+async def rebuild_with_lock(
+    *,
+    cache: "Redis",
+    key: Any,
+    read: Callable[[], Awaitable[Optional[Any]]],
+    rebuild: Callable[[], Awaitable[Any]],
+    lock_timeout: float = CACHE_REBUILD_LOCK_TIMEOUT,
+    wait_timeout: float = CACHE_REBUILD_WAIT_TIMEOUT,
+    poll_interval: float = CACHE_REBUILD_POLL_INTERVAL,
+) -> Any:
+    """
+    Lets a single worker rebuild a missing cache entry. The worker holding
+    the lock calls `rebuild`, which is expected to refill the cache. The
+    others poll `read` until the entry shows up and only rebuild themselves
+    once `wait_timeout` has passed, e.g. because the lock holder died.
+    """
+    lock = cache.lock(
+        f"{key}:lock", timeout=lock_timeout, thread_local=False
+    )
+    if await lock.acquire(blocking=False):
+        try:
+            return await rebuild()
+        finally:
+            try:
+                await lock.release()
+            except LockError:
+                # The lock expired while rebuilding and may now be held
+                # by another worker, leave it alone.
+                pass
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait_timeout
+    while loop.time() < deadline:
+        await asyncio.sleep(poll_interval)
+        value = await read()
+        if value is not None:
+            return value
+
+    return await rebuild()
+
+
+cache_single_flight = SingleFlight()
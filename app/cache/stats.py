@@ -0,0 +1,40 @@
+from collections import Counter
+from app.metrics.registry import registry
+
+
+CACHE_LOOKUPS = registry.counter(
+    "cache_lookups_total",
+    "Cache lookups, per cache name and outcome.",
+    ("cache", "outcome")
+)
+
+# Number of lookups per (cache name, outcome), e.g. ("nearby_stores", "stale").
+# Only ever touched from the event loop, so plain increments are safe.
+cache_lookups: Counter = CACHE_LOOKUPS.values
+
+
+def record_cache_lookup(cache_name: str, outcome: str) -> None:
+    cache_lookups[(cache_name, outcome)] += 1
+
+
+# Outcomes counted as hits and as misses for each cache tier. The Redis tier
+# of the nearby stores cache reports fresh/stale/miss instead of hit/miss.
+TIER_OUTCOMES = {
+    "local": (("local_hit",), ("local_miss",)),
+    "redis": (("redis_hit", "fresh", "stale"), ("redis_miss", "miss")),
+}
+
+
+def cache_hit_ratios() -> dict[tuple[str, str], float]:
+    """
+    Hit ratio per (cache name, tier) for every cache with recorded lookups.
+    """
+    cache_names = {cache_name for cache_name, _ in cache_lookups}
+    hit_ratios = {}
+    for cache_name in cache_names:
+        for tier, (hit_outcomes, miss_outcomes) in TIER_OUTCOMES.items():
+            hits = sum(cache_lookups[(cache_name, o)] for o in hit_outcomes)
+            misses = sum(cache_lookups[(cache_name, o)] for o in miss_outcomes)
+            if hits + misses > 0:
+                hit_ratios[(cache_name, tier)] = hits / (hits + misses)
+    return hit_ratios
@@ -0,0 +1,99 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+from redis.exceptions import LockError
+from app.core.config import CACHE_REBUILD_LOCK_TIMEOUT
+from app.cache.single_flight import cache_single_flight, rebuild_with_lock
+from app.cache.stats import record_cache_lookup
+from app.core.logging import get_logger
+
+
+swr_logger = get_logger(__name__)
+
+# Strong references to the running refresh tasks, so they are not
+# garbage collected before they finish.
+_background_refreshes: set[asyncio.Task] = set()
+
+
+def fresh_key(key: Any) -> str:
+    """
+    Key of the marker that exists for as long as an entry is fresh. The
+    entry itself lives until its hard TTL, the marker until its soft TTL.
+    """
+    return f"{key}:fresh"
+
+
+async def _refresh_if_unlocked(
+    *, cache: "Redis", key: Any, rebuild: Callable[[], Awaitable[Any]]
+) -> None:
+    lock = cache.lock(
+        f"{key}:lock", timeout=CACHE_REBUILD_LOCK_TIMEOUT, thread_local=False
+    )
+    # Another worker is already refreshing this entry.
+    if not await lock.acquire(blocking=False):
+        return
+    try:
+        await rebuild()
+    finally:
+        try:
+            await lock.release()
+        except LockError:
+            pass
+
+
+def _refresh_in_background(
+    *, cache: "Redis", key: Any, rebuild: Callable[[], Awaitable[Any]]
+) -> None:
+    async def refresh() -> None:
+        try:
+            await cache_single_flight.do(
+                (key, "refresh"),
+                lambda: _refresh_if_unlocked(
+                    cache=cache, key=key, rebuild=rebuild
+                )
+            )
+        except Exception as exc:
+            swr_logger.exception(exc)
+
+    task = asyncio.create_task(refresh())
+    _background_refreshes.add(task)
+    task.add_done_callback(_background_refreshes.discard)
+
+
+async def read_with_swr(
+    *,
+    cache: "Redis",
+    key: Any,
+    cache_name: str,
+    read: Callable[[], Awaitable[tuple[Optional[Any], bool]]],
+    rebuild: Callable[[], Awaitable[Any]],
+) -> Any:
+    """
+    Stale-while-revalidate read of a cache entry. `read` returns the cached
+    value (None when missing) and whether it is still fresh, `rebuild`
+    recomputes the value and writes it back to the cache.
+
+    Fresh values are returned as is, stale values are returned right away
+    while a background task refreshes them, and missing values are rebuilt
+    inline by a single request.
+    """
+    value, is_fresh = await read()
+    if value is not None:
+        if is_fresh:
+            record_cache_lookup(cache_name, "fresh")
+        else:
+            record_cache_lookup(cache_name, "stale")
+            _refresh_in_background(cache=cache, key=key, rebuild=rebuild)
+        return value
+
+    record_cache_lookup(cache_name, "miss")
+
+    async def read_value() -> Optional[Any]:
+        value, _ = await read()
+        return value
+
+    return await cache_single_flight.do(
+        key,
+        lambda: rebuild_with_lock(
+            cache=cache, key=key, read=read_value, rebuild=rebuild
+        )
+    )
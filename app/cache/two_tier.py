@@ -0,0 +1,164 @@
+import json
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+from app.cache.single_flight import cache_single_flight
+from app.cache.stats import record_cache_lookup
+from app.core.config import LOCAL_CACHE_MAX_SIZE, LOCAL_CACHE_TTL
+from app.core.logging import get_logger
+
+
+two_tier_logger = get_logger(__name__)
+
+CACHE_INVALIDATION_CHANNEL = "cache:invalidate"
+
+_MISSING = object()
+
+
+class LocalCache:
+    """
+    Bounded, per-worker LRU whose entries expire `ttl` seconds after they
+    were stored. Values are shared between requests and must not be mutated.
+    """
+
+    def __init__(self, *, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return _MISSING
+
+        self._entries.move_to_end(key)
+        return value
+
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class TwoTierCache:
+    """
+    Keeps hot values in a per-worker LocalCache in front of Redis. Only the
+    local tier is handled here, the loader passed to `get` is responsible for
+    the Redis tier. None is never cached locally.
+    """
+
+    registry: dict[str, "TwoTierCache"] = {}
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_size: int = LOCAL_CACHE_MAX_SIZE,
+        ttl: float = LOCAL_CACHE_TTL
+    ) -> None:
+        self.name = name
+        self.local = LocalCache(max_size=max_size, ttl=ttl)
+        TwoTierCache.registry[name] = self
+
+
+    async def get(
+        self, key: Hashable, load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        value = self.local.get(key)
+        if value is not _MISSING:
+            record_cache_lookup(self.name, "local_hit")
+            return value
+
+        record_cache_lookup(self.name, "local_miss")
+        value = await cache_single_flight.do((self.name, key, "local"), load)
+        if value is not None:
+            self.local.set(key, value)
+        return value
+
+
+    async def invalidate(self, cache: "Redis", key: Hashable) -> None:
+        """
+        Drops the key from the local tier of every worker. The Redis tier
+        is left to the caller.
+        """
+        self.local.invalidate(key)
+        await cache.publish(
+            CACHE_INVALIDATION_CHANNEL,
+            json.dumps({"cache": self.name, "key": key})
+        )
+
+
+async def read_through_redis(
+    *,
+    cache: "Redis",
+    key: str,
+    cache_name: str,
+    ttl: int,
+    load: Callable[[], Awaitable[Optional[Any]]],
+    encode: Callable[[Any], str] = json.dumps,
+    decode: Callable[[str], Any] = json.loads,
+) -> Optional[Any]:
+    """
+    Redis tier of a TwoTierCache: returns the decoded cached value, or loads,
+    encodes and caches it for `ttl` seconds. None is never cached.
+    """
+    cached = await cache.get(key)
+    if cached is not None:
+        record_cache_lookup(cache_name, "redis_hit")
+        return decode(cached)
+
+    record_cache_lookup(cache_name, "redis_miss")
+    value = await load()
+    if value is not None:
+        await cache.set(key, encode(value), ex=ttl)
+    return value
+
+
+async def listen_for_invalidations(cache: "Redis") -> None:
+    """
+    Drops the keys broadcast by TwoTierCache.invalidate from the local
+    tier of this worker. Runs until cancelled, resubscribing when the
+    connection drops.
+    """
+    while True:
+        pubsub = cache.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                invalidation = json.loads(message["data"])
+                two_tier_cache = TwoTierCache.registry.get(invalidation["cache"])
+                if two_tier_cache is not None:
+                    two_tier_cache.local.invalidate(invalidation["key"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            two_tier_logger.exception(exc)
+            # Invalidations may have been missed while disconnected.
+            for two_tier_cache in TwoTierCache.registry.values():
+                two_tier_cache.local.clear()
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
+
+
+nearby_stores_cache = TwoTierCache("nearby_stores")
+tags_cache = TwoTierCache("tags")
+menu_categories_cache = TwoTierCache("menu_categories")
+store_profiles_cache = TwoTierCache("store_profiles")
@@ -0,0 +1,49 @@
+import hashlib
+import time
+
+
+# Bumped whenever a rebuilt tag or menu category list differs from the one it
+# was last built from (see update_catalog_version), e.g. after a migration or
+# seed changed them. The lists are rebuilt once their Redis entries expire,
+# so a change shows within CATALOG_CACHE_TTL seconds.
+CATALOG_VERSION_KEY = "versions:catalog"
+
+
+def store_version_key(store_id: int) -> str:
+    """
+    Bumped whenever one of the store's products is created or deleted.
+    """
+    return f"versions:stores:{store_id}"
+
+
+async def get_versions(cache: "Redis", *keys: str) -> list[int]:
+    """
+    Current value of each version counter. Counters missing from Redis (e.g.
+    after a flush) are seeded from the clock rather than from zero, so they
+    never repeat a version an ETag was already built from.
+    """
+    versions = await cache.mget(keys)
+    for i, version in enumerate(versions):
+        if version is None:
+            await cache.set(keys[i], time.time_ns(), nx=True)
+            versions[i] = await cache.get(keys[i])
+    return [int(version) for version in versions]
+
+
+async def bump_version(cache: "Redis", key: str) -> None:
+    if not await cache.set(key, time.time_ns(), nx=True):
+        await cache.incr(key)
+
+
+async def update_catalog_version(cache: "Redis", list_name: str, encoded: str) -> bool:
+    """
+    Called with a catalog list (tags or menu categories) freshly loaded from
+    the database. Keeps a digest of each list and bumps the catalog version
+    when it changes. True if it did.
+    """
+    digest = hashlib.sha1(encoded.encode()).hexdigest()
+    previous = await cache.set(f"{CATALOG_VERSION_KEY}:{list_name}", digest, get=True)
+    if previous is not None and previous.decode() == digest:
+        return False
+    await bump_version(cache, CATALOG_VERSION_KEY)
+    return True
@@ -1,3 +1,5 @@
+import os
+import socket
 from databases import DatabaseURL
 from starlette.config import Config
 from starlette.datastructures import Secret
@@ -8,8 +10,99 @@ config = Config()
 PROJECT_NAME = "Nutrifolio-API"
 VERSION = "0.1.0"
 
+# Worker processes serving the API (set by gunicorn.conf.py, 1 under plain
+# uvicorn). The database, Redis and S3 connections of all the workers
+# together stay within the budgets below, split evenly between them, unless
+# MAX_CONNECTION_COUNT, REDIS_MAX_CONNECTIONS or S3_MAX_CONNECTIONS set the
+# size per worker. The database budget leaves some of Postgres' default 100
+# connections to the job workers (see JOB_WORKER_MAX_CONNECTIONS) and
+# migrations.
+WEB_CONCURRENCY = config("WEB_CONCURRENCY", cast=int, default=1)
+DATABASE_CONNECTION_BUDGET = config("DATABASE_CONNECTION_BUDGET", cast=int, default=80)
+REDIS_CONNECTION_BUDGET = config("REDIS_CONNECTION_BUDGET", cast=int, default=200)
+S3_CONNECTION_BUDGET = config("S3_CONNECTION_BUDGET", cast=int, default=40)
+
 DSN = config("DSN", cast=str)
 
+# Sentry performance tracing. Requests are traced at the rate of their route
+# in TRACES_SAMPLE_RATES ("route-name=rate,...") or else TRACES_SAMPLE_RATE.
+# With TRACES_KEEP_SLOW_AND_FAILED, every request is recorded and the ones
+# slower than TRACES_SLOW_REQUEST_SECONDS or failing with a 5xx are always
+# sent, the rest at their route's rate. Without it, the decision is made up
+# front and requests left out record no spans at all (lower overhead, but
+# slow and failed requests are sampled like any other; errors are still
+# reported as events).
+TRACES_SAMPLE_RATE = config("TRACES_SAMPLE_RATE", cast=float, default=0.1)
+TRACES_SAMPLE_RATES = config(
+    "TRACES_SAMPLE_RATES",
+    cast=str,
+    default=(
+        "filter-products-from-nearby-stores=0.01,"
+        "get-product-by-id=0.02,"
+        "get-store-by-id=0.02,"
+        "get-all-tags=0.01,"
+        "get-all-menu-categories=0.01,"
+        "metrics=0"
+    )
+)
+TRACES_KEEP_SLOW_AND_FAILED = config("TRACES_KEEP_SLOW_AND_FAILED", cast=bool, default=True)
+TRACES_SLOW_REQUEST_SECONDS = config("TRACES_SLOW_REQUEST_SECONDS", cast=float, default=1.0)
+
+# Request, query, cache and pool metrics, served in the Prometheus text
+# format under METRICS_PATH to scrapers sending METRICS_TOKEN as a bearer
+# token (Prometheus' `authorization` scrape setting). Without a token, every
+# scrape is refused.
+METRICS_ENABLED = config("METRICS_ENABLED", cast=bool, default=True)
+METRICS_PATH = config("METRICS_PATH", cast=str, default="/metrics")
+METRICS_TOKEN = config("METRICS_TOKEN", cast=Secret, default="")
+
+# Directory shared by the worker processes of gunicorn (set by
+# gunicorn.conf.py), for the metrics and profiles served by any worker to
+# cover all of them. Every worker writes its metrics there every
+# METRICS_SYNC_INTERVAL seconds, and the worker answering a scrape adds up
+# the counters and histograms of all of them (exited ones included) and
+# labels the gauges with the pid of their worker. Unset, as under plain
+# uvicorn, the metrics and profiles of the serving process alone are served.
+MULTIPROCESS_DIR = config("MULTIPROCESS_DIR", cast=str, default="")
+METRICS_SYNC_INTERVAL = config("METRICS_SYNC_INTERVAL", cast=float, default=5.0)
+
+# The event loop runs a heartbeat every LOOP_MONITOR_INTERVAL seconds, and
+# how late it runs is recorded as the event loop lag. When it is
+# LOOP_BLOCKED_THRESHOLD seconds late, the stack of the code blocking the
+# loop is logged.
+LOOP_MONITOR_ENABLED = config("LOOP_MONITOR_ENABLED", cast=bool, default=True)
+LOOP_MONITOR_INTERVAL = config("LOOP_MONITOR_INTERVAL", cast=float, default=0.1)
+LOOP_BLOCKED_THRESHOLD = config("LOOP_BLOCKED_THRESHOLD", cast=float, default=0.25)
+
+# Requests running more queries than their route's budget (QUERY_BUDGET
+# unless the route declares one), or the same query REPEATED_QUERY_THRESHOLD
+# times or more (a likely N+1), are logged and counted in the metrics
+QUERY_BUDGET = config("QUERY_BUDGET", cast=int, default=20)
+REPEATED_QUERY_THRESHOLD = config("REPEATED_QUERY_THRESHOLD", cast=int, default=5)
+
+# Logs of the app are written to stderr as JSON lines, from a background
+# thread. Records below LOG_LEVEL are dropped, and info and debug records
+# are kept at LOG_INFO_SAMPLE_RATE (all of a request's records, or none).
+# Records are dropped when LOG_QUEUE_SIZE of them are already waiting.
+LOG_LEVEL = config("LOG_LEVEL", cast=str, default="INFO")
+LOG_INFO_SAMPLE_RATE = config("LOG_INFO_SAMPLE_RATE", cast=float, default=1.0)
+LOG_QUEUE_SIZE = config("LOG_QUEUE_SIZE", cast=int, default=10000)
+
+# Opt-in sampling profiler, left out of the app entirely unless
+# PROFILING_ENABLED. Requests sent with PROFILING_TOKEN in their
+# X-Profile-Token header, and PROFILING_SAMPLE_RATE of the others, are
+# profiled (one at a time per worker process) by sampling the stack of the
+# event loop every PROFILING_INTERVAL seconds. The last PROFILING_BUFFER_SIZE
+# profiles of every worker process (kept in MULTIPROCESS_DIR, when set) are
+# served under PROFILING_PATH, with the same token, as collapsed stacks for
+# flame graphs.
+PROFILING_ENABLED = config("PROFILING_ENABLED", cast=bool, default=False)
+PROFILING_TOKEN = config("PROFILING_TOKEN", cast=Secret, default="")
+PROFILING_SAMPLE_RATE = config("PROFILING_SAMPLE_RATE", cast=float, default=0.0)
+PROFILING_INTERVAL = config("PROFILING_INTERVAL", cast=float, default=0.005)
+PROFILING_BUFFER_SIZE = config("PROFILING_BUFFER_SIZE", cast=int, default=50)
+PROFILING_PATH = config("PROFILING_PATH", cast=str, default="/admin/profiles")
+
 SECRET_KEY = config("SECRET_KEY", cast=Secret)
 JWT_ALGORITHM = config("JWT_ALGORITHM", cast=str, default="HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = config(
@@ -21,6 +114,25 @@ ACCESS_TOKEN_EXPIRE_MINUTES = config(
 DO_ACCESS_KEY = config("DO_ACCESS_KEY", cast=str)
 DO_SECRET_KEY = config("DO_SECRET_KEY", cast=Secret)
 DO_SPACE_BUCKET_URL = config("DO_SPACE_BUCKET_URL", cast=str)
+S3_MAX_CONNECTIONS = config(
+    "S3_MAX_CONNECTIONS",
+    cast=int,
+    default=max(S3_CONNECTION_BUDGET // WEB_CONCURRENCY, 1)
+)
+
+# Where uploaded images are stored: "s3" for the space above, or "local" for
+# files under LOCAL_STORAGE_ROOT, served by the app under LOCAL_STORAGE_URL
+STORAGE_BACKEND = config("STORAGE_BACKEND", cast=str, default="s3")
+LOCAL_STORAGE_ROOT = config("LOCAL_STORAGE_ROOT", cast=str, default="media")
+LOCAL_STORAGE_URL = config("LOCAL_STORAGE_URL", cast=str, default="http://localhost:8000/media")
+
+# Every STORAGE_CLEANUP_INTERVAL seconds the worker deletes the stored images
+# no product or store uses anymore, listing them STORAGE_LIST_PAGE_SIZE at a
+# time. Images written less than STORAGE_ORPHAN_MIN_AGE seconds ago are kept,
+# as their product may not be saved yet.
+STORAGE_CLEANUP_INTERVAL = config("STORAGE_CLEANUP_INTERVAL", cast=int, default=24 * 60 * 60)
+STORAGE_LIST_PAGE_SIZE = config("STORAGE_LIST_PAGE_SIZE", cast=int, default=1000)
+STORAGE_ORPHAN_MIN_AGE = config("STORAGE_ORPHAN_MIN_AGE", cast=int, default=24 * 60 * 60)
 
 REDIS_HOST = config("REDIS_HOST", cast=str, default="redis-cache")
 REDIS_PORT = config("REDIS_PORT", cast=str, default="6379")
@@ -31,6 +143,103 @@ REDIS_URL = config(
     cast=str,
     default=f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
 )
+# Requests wait up to REDIS_POOL_TIMEOUT seconds for a free connection once
+# a worker has REDIS_MAX_CONNECTIONS of them open
+REDIS_MAX_CONNECTIONS = config(
+    "REDIS_MAX_CONNECTIONS",
+    cast=int,
+    default=max(REDIS_CONNECTION_BUDGET // WEB_CONCURRENCY, 2)
+)
+REDIS_POOL_TIMEOUT = config("REDIS_POOL_TIMEOUT", cast=float, default=5.0)
+
+# Seconds a worker may hold the lock used to rebuild an expired cache entry,
+# and how long (and how often) the other workers poll for the rebuilt entry
+CACHE_REBUILD_LOCK_TIMEOUT = config("CACHE_REBUILD_LOCK_TIMEOUT", cast=float, default=5.0)
+CACHE_REBUILD_WAIT_TIMEOUT = config("CACHE_REBUILD_WAIT_TIMEOUT", cast=float, default=1.0)
+CACHE_REBUILD_POLL_INTERVAL = config("CACHE_REBUILD_POLL_INTERVAL", cast=float, default=0.05)
+
+# Seconds a cached list of nearby store ids is served as fresh (soft TTL), and
+# after which it is evicted (hard TTL). In between, the stale list is served
+# while it gets refreshed in the background.
+NEARBY_STORES_CACHE_SOFT_TTL = config("NEARBY_STORES_CACHE_SOFT_TTL", cast=int, default=300)
+NEARBY_STORES_CACHE_HARD_TTL = config("NEARBY_STORES_CACHE_HARD_TTL", cast=int, default=1800)
+
+# Seconds the tag and menu category lists, and store profiles, stay in Redis
+CATALOG_CACHE_TTL = config("CATALOG_CACHE_TTL", cast=int, default=3600)
+STORE_PROFILES_CACHE_TTL = config("STORE_PROFILES_CACHE_TTL", cast=int, default=300)
+
+# Size and TTL (in seconds) of the per-worker cache kept in front of Redis
+LOCAL_CACHE_MAX_SIZE = config("LOCAL_CACHE_MAX_SIZE", cast=int, default=1024)
+LOCAL_CACHE_TTL = config("LOCAL_CACHE_TTL", cast=float, default=5.0)
+
+# Cache-Control sent with the tag and menu category lists, store menus and
+# product pages, which also carry an ETag to revalidate with. Product pages
+# are always revalidated so that every view still reaches the view counter.
+CATALOG_CACHE_CONTROL = config("CATALOG_CACHE_CONTROL", cast=str, default="public, max-age=300")
+STORE_MENU_CACHE_CONTROL = config("STORE_MENU_CACHE_CONTROL", cast=str, default="public, max-age=60")
+PRODUCT_CACHE_CONTROL = config("PRODUCT_CACHE_CONTROL", cast=str, default="public, no-cache")
+
+# Responses smaller than COMPRESSION_MINIMUM_SIZE bytes are sent uncompressed.
+# The levels apply both to compression on the fly and to the precompressed
+# bodies cached for RESPONSE_CACHE_TTL seconds.
+COMPRESSION_MINIMUM_SIZE = config("COMPRESSION_MINIMUM_SIZE", cast=int, default=1000)
+COMPRESSION_GZIP_LEVEL = config("COMPRESSION_GZIP_LEVEL", cast=int, default=6)
+COMPRESSION_BROTLI_QUALITY = config("COMPRESSION_BROTLI_QUALITY", cast=int, default=5)
+RESPONSE_CACHE_TTL = config("RESPONSE_CACHE_TTL", cast=int, default=600)
+
+# Limits of a bulk product import: rows per menu file, bytes per image in the
+# images archive, and how many images are read into the job queue at the
+# same time
+BULK_IMPORT_MAX_ROWS = config("BULK_IMPORT_MAX_ROWS", cast=int, default=1000)
+BULK_IMPORT_MAX_IMAGE_SIZE = config("BULK_IMPORT_MAX_IMAGE_SIZE", cast=int, default=5 * 1024 * 1024)
+BULK_IMPORT_UPLOAD_CONCURRENCY = config("BULK_IMPORT_UPLOAD_CONCURRENCY", cast=int, default=8)
+
+# Most products deleted with a single bulk delete request
+BULK_DELETE_MAX_PRODUCTS = config("BULK_DELETE_MAX_PRODUCTS", cast=int, default=1000)
+
+# With PRODUCT_SOFT_DELETE, deleting a product only marks it as deleted, so
+# that busy hours skip the cascade to its details, tags and menu categories.
+# Every PRODUCT_PURGE_INTERVAL seconds the worker removes the products marked
+# more than PRODUCT_PURGE_DELAY seconds ago, PRODUCT_PURGE_BATCH_SIZE at a time.
+PRODUCT_SOFT_DELETE = config("PRODUCT_SOFT_DELETE", cast=bool, default=False)
+PRODUCT_PURGE_INTERVAL = config("PRODUCT_PURGE_INTERVAL", cast=int, default=60 * 60)
+PRODUCT_PURGE_DELAY = config("PRODUCT_PURGE_DELAY", cast=int, default=24 * 60 * 60)
+PRODUCT_PURGE_BATCH_SIZE = config("PRODUCT_PURGE_BATCH_SIZE", cast=int, default=500)
+
+# Images uploaded with a product or store are streamed to the job queue in
+# chunks of UPLOAD_CHUNK_SIZE bytes, and rejected once they exceed
+# IMAGE_UPLOAD_MAX_SIZE bytes. The other form fields may add up to at most
+# FORM_FIELDS_MAX_SIZE bytes.
+IMAGE_UPLOAD_MAX_SIZE = config("IMAGE_UPLOAD_MAX_SIZE", cast=int, default=5 * 1024 * 1024)
+UPLOAD_CHUNK_SIZE = config("UPLOAD_CHUNK_SIZE", cast=int, default=256 * 1024)
+FORM_FIELDS_MAX_SIZE = config("FORM_FIELDS_MAX_SIZE", cast=int, default=64 * 1024)
+
+# Background jobs: attempts before a job is moved to the dead-letter list,
+# seconds before the first retry (doubled on every further retry), seconds
+# the input of a queued job (e.g. an uploaded image) is kept in Redis, and
+# seconds a worker blocks waiting for the next job
+JOB_MAX_ATTEMPTS = config("JOB_MAX_ATTEMPTS", cast=int, default=5)
+JOB_RETRY_BACKOFF = config("JOB_RETRY_BACKOFF", cast=float, default=5.0)
+JOB_BLOB_TTL = config("JOB_BLOB_TTL", cast=int, default=24 * 60 * 60)
+JOB_POLL_TIMEOUT = config("JOB_POLL_TIMEOUT", cast=float, default=1.0)
+
+# Id of a worker's list of jobs in progress, unique per worker process. A
+# worker refreshes its heartbeat every third of JOB_WORKER_HEARTBEAT_TTL
+# seconds; the jobs in progress of a worker whose heartbeat expired (killed,
+# or replaced by a container with another hostname) are requeued by the
+# other workers
+JOB_WORKER_ID = config(
+    "JOB_WORKER_ID", cast=str, default=f"{socket.gethostname()}-{os.getpid()}"
+)
+JOB_WORKER_HEARTBEAT_TTL = config("JOB_WORKER_HEARTBEAT_TTL", cast=int, default=30)
+
+# Uploaded images are scaled down to fit IMAGE_MAX_SIZE pixels on their
+# longest side and re-encoded to WebP, along with a preview and a thumbnail
+# (served by the listing endpoints) of the given sizes
+IMAGE_MAX_SIZE = config("IMAGE_MAX_SIZE", cast=int, default=1024)
+IMAGE_PREVIEW_SIZE = config("IMAGE_PREVIEW_SIZE", cast=int, default=512)
+IMAGE_THUMBNAIL_SIZE = config("IMAGE_THUMBNAIL_SIZE", cast=int, default=128)
+IMAGE_WEBP_QUALITY = config("IMAGE_WEBP_QUALITY", cast=int, default=80)
 
 DATABASE_HOST = config("DATABASE_HOST", cast=str, default="postgis-db")
 DATABASE_PORT = config("DATABASE_PORT", cast=str, default="5432")
@@ -38,7 +247,14 @@ DATABASE_NAME = config("DATABASE_NAME", cast=str)
 DATABASE_USER = config("DATABASE_USER", cast=str)
 DATABASE_PASSWORD = config("DATABASE_PASSWORD", cast=Secret)
 MIN_CONNECTION_COUNT = config("MIN_CONNECTION_COUNT", cast=int, default=0)
-MAX_CONNECTION_COUNT = config("MAX_CONNECTION_COUNT", cast=int, default=100)
+MAX_CONNECTION_COUNT = config(
+    "MAX_CONNECTION_COUNT",
+    cast=int,
+    default=max(DATABASE_CONNECTION_BUDGET // WEB_CONCURRENCY, 1)
+)
+# Database and Redis connections of a job worker, which runs one job at a
+# time besides its heartbeat and needs far fewer than an API worker
+JOB_WORKER_MAX_CONNECTIONS = config("JOB_WORKER_MAX_CONNECTIONS", cast=int, default=4)
 
 DATABASE_URL = config(
   "DATABASE_URL",
@@ -1,28 +1,31 @@
-import boto3
 from typing import Callable
 from fastapi import FastAPI
-from app.core.config import DO_ACCESS_KEY, DO_SECRET_KEY, DO_SPACE_BUCKET_URL
 from app.db.events import establish_db_connection_pool, release_db_connection_pool
 from app.cache.events import establish_cache_connection_pool, release_cache_connection_pool
+from app.storage.events import establish_storage, release_storage
+from app.metrics.events import (
+    establish_event_loop_monitor,
+    release_event_loop_monitor,
+    establish_metrics_sync,
+    release_metrics_sync,
+)
 
 
 def create_start_app_handler(app: FastAPI) -> Callable:
     async def start_app() -> None:
         await establish_db_connection_pool(app)
         await establish_cache_connection_pool(app)
-        app.state._sb_client = boto3.client(
-            's3',
-            region_name='fra1',
-            endpoint_url=DO_SPACE_BUCKET_URL,
-            aws_access_key_id=DO_ACCESS_KEY,
-            aws_secret_access_key=str(DO_SECRET_KEY)
-        )
+        await establish_storage(app)
+        await establish_event_loop_monitor(app)
+        await establish_metrics_sync(app)
     return start_app
 
 
 def create_stop_app_handler(app: FastAPI) -> Callable:
     async def stop_app() -> None:
+        await release_metrics_sync(app)
+        await release_event_loop_monitor(app)
         await release_db_connection_pool(app)
         await release_cache_connection_pool(app)
-        app.state._sb_client.close()
+        await release_storage(app)
     return stop_app
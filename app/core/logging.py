@@ -1,11 +1,171 @@
+import atexit
+import copy
 import logging
+import os
+import queue
+import random
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+import orjson
+from app.core.config import LOG_LEVEL, LOG_INFO_SAMPLE_RATE, LOG_QUEUE_SIZE
+from app.metrics.registry import registry
+
+
+# Logger every app module logs under (their names start with "app.")
+APP_LOGGER = "app"
+# Name of its handler, looked up to configure the logger only once
+QUEUE_HANDLER_NAME = "app-queue"
+
+LOG_RECORDS_DROPPED = registry.counter(
+    "log_records_dropped_total",
+    "Log records dropped because the log queue was full."
+)
+
+# Attributes every LogRecord has, anything else was passed in `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class LogContext:
+    """
+    Request a log record was emitted while handling.
+    """
+
+    def __init__(self, request_id: str, scope: dict, sampled: bool) -> None:
+        self.request_id = request_id
+        self.scope = scope
+        # Whether the info records of the request are kept
+        self.sampled = sampled
+
+
+    @property
+    def route(self) -> Optional[str]:
+        return getattr(self.scope.get("route"), "name", None)
+
+
+# Context of the request being handled, None outside of requests
+current_log_context: ContextVar[Optional[LogContext]] = ContextVar(
+    "current_log_context", default=None
+)
+
+
+def new_log_context(request_id: str, scope: dict) -> LogContext:
+    return LogContext(
+        request_id, scope, sampled=random.random() < LOG_INFO_SAMPLE_RATE
+    )
+
+
+class InfoSamplingFilter(logging.Filter):
+    """
+    Keeps every warning and error, and info and debug records at
+    LOG_INFO_SAMPLE_RATE: all of a request's records, or none of them.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or LOG_INFO_SAMPLE_RATE >= 1:
+            return True
+        context = current_log_context.get()
+        if context is not None:
+            return context.sampled
+        return random.random() < LOG_INFO_SAMPLE_RATE
+
+
+class ContextQueueHandler(QueueHandler):
+    """
+    Hands copies of the records over to the listener thread, with the
+    request context attached and the message and traceback rendered (the
+    originals still go to Sentry's logging integration afterwards).
+    Drops records rather than blocking when the queue is full.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        context = current_log_context.get()
+        if context is not None:
+            record.request_id = context.request_id
+            # Unless given in `extra`, e.g. by the access log
+            record.__dict__.setdefault("route", context.route)
+
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args = record.message, None
+        record.exc_info = None
+        return record
+
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line, with the request context and any `extra`
+    attributes of the record.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "location": f"{record.funcName}:{record.lineno}",
+            "message": record.getMessage(),
+        }
+        entry.update(
+            (key, value) for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES
+        )
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+def configure_logging() -> None:
+    """
+    Sends the records of the app loggers through a queue to a listener
+    thread writing them to stderr, so logging never blocks the event loop.
+    Does nothing if already done, e.g. when a module is imported again.
+    """
+    app_logger = logging.getLogger(APP_LOGGER)
+    if any(handler.get_name() == QUEUE_HANDLER_NAME for handler in app_logger.handlers):
+        return
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JSONFormatter())
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = ContextQueueHandler(log_queue)
+    queue_handler.set_name(QUEUE_HANDLER_NAME)
+    queue_handler.addFilter(InfoSamplingFilter())
+
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    # Writes out the records still queued
+    atexit.register(listener.stop)
+
+    def restart_listener() -> None:
+        # Threads do not survive a fork, e.g. of the gunicorn workers of the
+        # preloaded app, so every child gets its own queue and listener
+        nonlocal listener
+        atexit.unregister(listener.stop)
+        queue_handler.queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        listener = QueueListener(queue_handler.queue, handler)
+        listener.start()
+        atexit.register(listener.stop)
+
+    os.register_at_fork(after_in_child=restart_listener)
+
+    app_logger.addHandler(queue_handler)
+    app_logger.setLevel(LOG_LEVEL)
+    app_logger.propagate = False
 
 
 def get_logger(module_name: str) -> logging.Logger:
-    formatter = logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(name)s - %(funcName)s:%(lineno)d')
-    handler = logging.StreamHandler()
-    handler.setFormatter(formatter)
-    exception_logger = logging.getLogger(module_name)
-    exception_logger.addHandler(handler)
-    return exception_logger
+    configure_logging()
+    return logging.getLogger(module_name)
@@ -0,0 +1,164 @@
+import random
+from typing import Optional
+import sentry_sdk
+from sentry_sdk.scope import add_global_event_processor
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import (
+    DSN,
+    TRACES_SAMPLE_RATE,
+    TRACES_SAMPLE_RATES,
+    TRACES_KEEP_SLOW_AND_FAILED,
+    TRACES_SLOW_REQUEST_SECONDS,
+)
+from app.metrics.requests import route_name
+
+
+# Tag the route name is recorded under, by the TracingMiddleware
+ROUTE_TAG = "route"
+
+
+def parse_sample_rates(value: str) -> dict[str, float]:
+    """
+    Parses "route-name=rate,..." into the sample rate of each route name.
+    """
+    rates = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, rate = item.partition("=")
+        name, rate = name.strip(), float(rate)
+        if not 0 <= rate <= 1:
+            raise ValueError(f"The sample rate of {name} should be between 0 and 1.")
+        rates[name] = rate
+    return rates
+
+
+SAMPLE_RATES = parse_sample_rates(TRACES_SAMPLE_RATES)
+
+
+def sample_rate_for(route: Optional[str]) -> float:
+    return SAMPLE_RATES.get(route, TRACES_SAMPLE_RATE)
+
+
+def match_route(routes: list[BaseRoute], scope: Scope) -> Optional[str]:
+    """
+    Name of the route a request will be handled by, found the way the
+    router does (Sentry samples before the request reaches the router).
+    """
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "name", None)
+    return None
+
+
+class TracesSampler:
+    """
+    Sentry traces_sampler picking the sample rate of each request by the
+    name of its route. With keep_slow_and_failed, every request of a route
+    with a rate above zero is recorded, and keep_slow_and_failed_transactions
+    decides which ones are sent.
+    """
+
+    def __init__(
+        self,
+        routes: list[BaseRoute],
+        keep_slow_and_failed: bool = TRACES_KEEP_SLOW_AND_FAILED
+    ) -> None:
+        self.routes = routes
+        self.keep_slow_and_failed = keep_slow_and_failed
+
+
+    def __call__(self, sampling_context: dict) -> float:
+        # Follow the decision of the caller's trace, if there is one
+        if sampling_context.get("parent_sampled") is not None:
+            return float(sampling_context["parent_sampled"])
+
+        scope = sampling_context.get("asgi_scope")
+        if scope is None or scope["type"] != "http":
+            return TRACES_SAMPLE_RATE
+
+        rate = sample_rate_for(match_route(self.routes, scope))
+        if self.keep_slow_and_failed and rate > 0:
+            return 1.0
+        return rate
+
+
+def keep_slow_and_failed_transactions(event: dict, hint: dict) -> Optional[dict]:
+    """
+    Sentry event processor sending every slow or failed transaction, and
+    the others at the sample rate of their route.
+    """
+    if event.get("type") != "transaction":
+        return event
+
+    trace = event.get("contexts", {}).get("trace", {})
+    tags = event.get("tags", {})
+    if trace.get("parent_span_id") or ROUTE_TAG not in tags:
+        # Part of a trace sampled by the caller, or not an API request
+        return event
+
+    status_code = int(tags.get("http.status_code", 0))
+    if status_code >= 500 or trace.get("status") == "internal_error":
+        return event
+
+    duration = event["timestamp"] - event["start_timestamp"]
+    if duration.total_seconds() >= TRACES_SLOW_REQUEST_SECONDS:
+        return event
+
+    if random.random() < sample_rate_for(tags[ROUTE_TAG]):
+        return event
+    return None
+
+
+class TracingMiddleware:
+    """
+    Tags the Sentry transaction of each request with the name of its route
+    and its response status, for keep_slow_and_failed_transactions.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        transaction = sentry_sdk.Hub.current.scope.transaction
+        if scope["type"] != "http" or transaction is None or not transaction.sampled:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_status(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                transaction.set_http_status(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            transaction.set_tag(ROUTE_TAG, route_name(scope))
+
+
+_processor_added = False
+
+
+def init_sentry(
+    app: "FastAPI",
+    keep_slow_and_failed: bool = TRACES_KEEP_SLOW_AND_FAILED,
+    **options
+) -> None:
+    """
+    Initializes Sentry with the per route sampling of the app's requests.
+    The app should add the TracingMiddleware when keep_slow_and_failed.
+    """
+    global _processor_added
+    if keep_slow_and_failed and not _processor_added:
+        # sentry-sdk 1.x has no before_send hook for transactions
+        add_global_event_processor(keep_slow_and_failed_transactions)
+        _processor_added = True
+
+    sentry_sdk.init(
+        dsn=options.pop("dsn", DSN),
+        traces_sampler=TracesSampler(app.router.routes, keep_slow_and_failed),
+        **options
+    )
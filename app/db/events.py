@@ -3,6 +3,7 @@ from fastapi import FastAPI
 from databases import Database
 from app.core.config import DATABASE_URL, MIN_CONNECTION_COUNT, MAX_CONNECTION_COUNT
 from app.core.logging import get_logger
+from app.db.instrumentation import InstrumentedDatabase
 
 
 db_events_logger = get_logger(__name__)
@@ -18,7 +19,7 @@ async def establish_db_connection_pool(app: FastAPI) -> None:
 
     try:
         await database.connect()
-        app.state._conn_pool = database
+        app.state._conn_pool = InstrumentedDatabase(database)
     except Exception as exc:
         db_events_logger.exception(exc)
 
@@ -0,0 +1,100 @@
+import sys
+import time
+from typing import Any, Optional
+from databases import Database
+from app.metrics.registry import registry
+from app.metrics.requests import current_request_stats
+
+
+QUERY_LATENCY = registry.histogram(
+    "db_query_duration_seconds",
+    "Time to run a database query, per repository query constant.",
+    ("query",)
+)
+
+# Label of the queries that are not a repository constant
+OTHER_QUERY = "other"
+
+_query_names: Optional[dict[str, str]] = None
+
+
+def query_name(query: Any) -> str:
+    """
+    Name of the repository constant (e.g. GET_PRODUCT_BY_ID_QUERY) holding
+    `query`. The constants are looked up once, when the first query runs,
+    since every repository is imported by then.
+    """
+    global _query_names
+    if _query_names is None:
+        _query_names = {
+            value: name
+            for module_name, module in list(sys.modules.items())
+            if module_name.startswith("app.db.repositories.")
+            for name, value in vars(module).items()
+            if name.endswith("_QUERY") and isinstance(value, str)
+        }
+    return _query_names.get(query, OTHER_QUERY) if isinstance(query, str) else OTHER_QUERY
+
+
+class InstrumentedDatabase:
+    """
+    Wraps a Database to time every query, and count it towards the stats of
+    the current request. Everything else is passed through untouched.
+    """
+
+    def __init__(self, database: Database) -> None:
+        self.database = database
+
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.database, name)
+
+
+    def _record(self, query: Any, seconds: float) -> None:
+        name = query_name(query)
+        QUERY_LATENCY.observe(seconds, name)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.record_query(name, seconds)
+
+
+    async def fetch_all(self, query: Any, values: Optional[dict] = None) -> list:
+        start = time.perf_counter()
+        try:
+            return await self.database.fetch_all(query=query, values=values)
+        finally:
+            self._record(query, time.perf_counter() - start)
+
+
+    async def fetch_one(self, query: Any, values: Optional[dict] = None) -> Any:
+        start = time.perf_counter()
+        try:
+            return await self.database.fetch_one(query=query, values=values)
+        finally:
+            self._record(query, time.perf_counter() - start)
+
+
+    async def fetch_val(
+        self, query: Any, values: Optional[dict] = None, column: Any = 0
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            return await self.database.fetch_val(query=query, values=values, column=column)
+        finally:
+            self._record(query, time.perf_counter() - start)
+
+
+    async def execute(self, query: Any, values: Optional[dict] = None) -> Any:
+        start = time.perf_counter()
+        try:
+            return await self.database.execute(query=query, values=values)
+        finally:
+            self._record(query, time.perf_counter() - start)
+
+
+    async def execute_many(self, query: Any, values: list) -> None:
+        start = time.perf_counter()
+        try:
+            return await self.database.execute_many(query=query, values=values)
+        finally:
+            self._record(query, time.perf_counter() - start)
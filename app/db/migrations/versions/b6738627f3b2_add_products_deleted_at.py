@@ -0,0 +1,50 @@
+"""add_products_deleted_at
+
+Revision ID: b6738627f3b2
+Revises: c7e2d9a41f35
+Create Date: 2026-10-19 18:42:07.310514
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = 'b6738627f3b2'
+down_revision = 'c7e2d9a41f35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'products',
+        sa.Column('deleted_at', sa.TIMESTAMP(timezone=True), nullable=True)
+    )
+
+    # A deleted product no longer takes up its name
+    op.drop_constraint('unique_product_name_per_store', 'products', type_='unique')
+    op.create_index(
+        'unique_product_name_per_store',
+        'products',
+        ['store_id', 'name'],
+        unique=True,
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+    # Soft deleted products waiting to be purged
+    op.create_index(
+        'ix_products_deleted_at',
+        'products',
+        ['deleted_at'],
+        postgresql_where=sa.text('deleted_at IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.execute('DELETE FROM products WHERE deleted_at IS NOT NULL')
+    op.drop_index('ix_products_deleted_at', table_name='products')
+    op.drop_index('unique_product_name_per_store', table_name='products')
+    op.create_unique_constraint(
+        'unique_product_name_per_store', 'products', ['name', 'store_id']
+    )
+    op.drop_column('products', 'deleted_at')
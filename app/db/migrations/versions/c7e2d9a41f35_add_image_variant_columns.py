@@ -0,0 +1,34 @@
+"""add_image_variant_columns
+
+Revision ID: c7e2d9a41f35
+Revises: af8333c8566a
+Create Date: 2026-10-19 16:05:12.418223
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = 'c7e2d9a41f35'
+down_revision = 'af8333c8566a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('thumbnail_url', sa.String, nullable=True))
+    op.add_column('products', sa.Column('preview_url', sa.String, nullable=True))
+    op.add_column(
+        'store_profiles', sa.Column('logo_thumbnail_url', sa.String, nullable=True)
+    )
+    op.add_column(
+        'store_profiles', sa.Column('logo_preview_url', sa.String, nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('store_profiles', 'logo_preview_url')
+    op.drop_column('store_profiles', 'logo_thumbnail_url')
+    op.drop_column('products', 'preview_url')
+    op.drop_column('products', 'thumbnail_url')
@@ -1,11 +1,16 @@
+import json
 from typing import List
 from app.db.repositories.base import BaseRepository
+from app.cache.two_tier import menu_categories_cache, read_through_redis
+from app.cache.versions import update_catalog_version
+from app.core.config import CATALOG_CACHE_TTL
 from app.models.menu_categories import MenuCategoryInDB
 
 
 GET_MENU_CATEGORIES_QUERY = """
     SELECT id, label, description
-    FROM menu_categories;
+    FROM menu_categories
+    ORDER BY id;
 """
 
 GET_MENU_CATEGORY_BY_ID_QUERY = """
@@ -22,20 +27,51 @@ GET_MENU_CATEGORIES_FOR_PRODUCT_BY_PRODUCT_ID = """
 """
 
 
+def encode_menu_categories(menu_categories: List[MenuCategoryInDB]) -> str:
+    return json.dumps(
+        [menu_category.model_dump() for menu_category in menu_categories]
+    )
+
+
 class MenuCategoriesRepository(BaseRepository):
     """"
     All database actions associated with the MenuCategory resource
     """
 
-    async def get_all_menu_categories(self) -> List[MenuCategoryInDB]:
-        menu_category_records = await self.db.fetch_all(
-            query=GET_MENU_CATEGORIES_QUERY
-        )
+    async def get_all_menu_categories(
+        self, *, cache: "Redis"
+    ) -> List[MenuCategoryInDB]:
+        async def load() -> List[MenuCategoryInDB]:
+            menu_category_records = await self.db.fetch_all(
+                query=GET_MENU_CATEGORIES_QUERY
+            )
 
-        return [
-            MenuCategoryInDB(**menu_category_record) 
-            for menu_category_record in menu_category_records
-        ]
+            menu_categories = [
+                MenuCategoryInDB(**menu_category_record) 
+                for menu_category_record in menu_category_records
+            ]
+            if await update_catalog_version(
+                cache, "menu_categories", encode_menu_categories(menu_categories)
+            ):
+                # The other workers may still hold the previous list
+                await menu_categories_cache.invalidate(cache, "all")
+            return menu_categories
+
+        return await menu_categories_cache.get(
+            "all",
+            lambda: read_through_redis(
+                cache=cache,
+                key="menu_categories:all",
+                cache_name="menu_categories",
+                ttl=CATALOG_CACHE_TTL,
+                load=load,
+                encode=encode_menu_categories,
+                decode=lambda cached: [
+                    MenuCategoryInDB(**menu_category)
+                    for menu_category in json.loads(cached)
+                ],
+            )
+        )
 
 
     async def get_menu_category_by_id(self, *, id: int) -> MenuCategoryInDB:
@@ -19,6 +19,23 @@ CREATE_PRODUCT_DETAILS_QUERY = """
         id, calories, protein, carbs, fiber, sugars, fat, saturated_fat, product_id;
 """
 
+CREATE_MANY_PRODUCT_DETAILS_QUERY = """
+    INSERT INTO product_details (
+        calories, protein, carbs, fiber, sugars, fat, saturated_fat, product_id
+    )
+    SELECT *
+    FROM unnest(
+        CAST(:calories AS integer[]),
+        CAST(:protein AS float8[]),
+        CAST(:carbs AS float8[]),
+        CAST(:fiber AS float8[]),
+        CAST(:sugars AS float8[]),
+        CAST(:fat AS float8[]),
+        CAST(:saturated_fat AS float8[]),
+        CAST(:product_ids AS integer[])
+    );
+"""
+
 
 class ProductDetailsRepository(BaseRepository):
     """"
@@ -48,3 +65,21 @@ class ProductDetailsRepository(BaseRepository):
         )
 
         return ProductDetailsInDB(**product_details_record)
+
+
+    async def create_many_product_details(
+        self, *, new_product_details: list[ProductDetailsCreate]
+    ) -> None:
+        await self.db.execute(
+            query=CREATE_MANY_PRODUCT_DETAILS_QUERY,
+            values={
+                "calories": [d.calories for d in new_product_details],
+                "protein": [d.protein for d in new_product_details],
+                "carbs": [d.carbs for d in new_product_details],
+                "fiber": [d.fiber for d in new_product_details],
+                "sugars": [d.sugars for d in new_product_details],
+                "fat": [d.fat for d in new_product_details],
+                "saturated_fat": [d.saturated_fat for d in new_product_details],
+                "product_ids": [d.product_id for d in new_product_details],
+            }
+        )
@@ -14,6 +14,14 @@ CREATE_PRODUCT_MENU_CATEGORY_QUERY = """
     RETURNING product_id, menu_category_id;
 """
 
+CREATE_PRODUCT_MENU_CATEGORIES_QUERY = """
+    INSERT INTO product_menu_categories (product_id, menu_category_id)
+    SELECT *
+    FROM unnest(
+        CAST(:product_ids AS integer[]), CAST(:menu_category_ids AS integer[])
+    );
+"""
+
 
 class ProductMenuCategoriesRepository(BaseRepository):
     """"
@@ -44,3 +52,19 @@ class ProductMenuCategoriesRepository(BaseRepository):
         )
 
         return ProductMenuCategoryInDB(**product_menu_category_record)
+
+
+    async def create_product_menu_categories(
+        self, *, new_product_menu_categories: list[ProductMenuCategoryCreate]
+    ) -> None:
+        await self.db.execute(
+            query=CREATE_PRODUCT_MENU_CATEGORIES_QUERY,
+            values={
+                "product_ids": [
+                    pmc.product_id for pmc in new_product_menu_categories
+                ],
+                "menu_category_ids": [
+                    pmc.menu_category_id for pmc in new_product_menu_categories
+                ],
+            }
+        )
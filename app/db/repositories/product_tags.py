@@ -15,6 +15,12 @@ CREATE_PRODUCT_TAG_QUERY = """
     RETURNING product_id, tag_id;
 """
 
+CREATE_PRODUCT_TAGS_QUERY = """
+    INSERT INTO product_tags (product_id, tag_id)
+    SELECT *
+    FROM unnest(CAST(:product_ids AS integer[]), CAST(:tag_ids AS integer[]));
+"""
+
 
 class ProductTagsRepository(BaseRepository):
     """"
@@ -44,3 +50,15 @@ class ProductTagsRepository(BaseRepository):
         )
 
         return ProductTagInDB(**product_tag_record)
+
+
+    async def create_product_tags(
+        self, *, new_product_tags: list[ProductTagCreate]
+    ) -> None:
+        await self.db.execute(
+            query=CREATE_PRODUCT_TAGS_QUERY,
+            values={
+                "product_ids": [tag.product_id for tag in new_product_tags],
+                "tag_ids": [tag.tag_id for tag in new_product_tags],
+            }
+        )
@@ -7,8 +7,9 @@ from app.api.enums.products import SortByOption, SortOrderOption
 
 FILTER_PRODUCTS_FROM_NEARBY_STORES_QUERY = """
     SELECT
-        p.id, p.name, p.description, p.image_url, p.price, p.view_count,
-        p.has_details, p.is_public, p.store_id
+        p.id, p.name, p.description, p.image_url, p.thumbnail_url,
+        p.preview_url, p.price, p.view_count, p.has_details, p.is_public,
+        p.store_id
     FROM products AS p
         INNER JOIN product_tags AS pt ON pt.product_id = p.id
         INNER JOIN product_menu_categories AS pmc ON pmc.product_id = p.id
@@ -17,32 +18,34 @@ FILTER_PRODUCTS_FROM_NEARBY_STORES_QUERY = """
         AND pmc.menu_category_id = ANY (:menu_category_ids)
         AND p.price BETWEEN :min_price AND :max_price
         AND p.is_public = TRUE
+        AND p.deleted_at IS NULL
     GROUP BY p.id
     HAVING COUNT(DISTINCT pt.tag_id) = :tag_count;
 """
 
 GET_PRODUCTS_FROM_STORE_BY_ID_QUERY = """
     SELECT
-        p.id, p.name, p.description, p.image_url, p.price, p.view_count,
-        p.has_details, p.is_public, p.store_id
+        p.id, p.name, p.description, p.image_url, p.thumbnail_url,
+        p.preview_url, p.price, p.view_count, p.has_details, p.is_public,
+        p.store_id
     FROM products AS p
-    WHERE store_id = :store_id AND p.is_public = TRUE;
+    WHERE store_id = :store_id AND p.is_public = TRUE AND p.deleted_at IS NULL;
 """
 
 GET_PRODUCT_BY_ID_QUERY = """
     SELECT
-        id, name, description, image_url, price,
-        view_count, has_details, is_public, store_id
+        id, name, description, image_url, thumbnail_url, preview_url,
+        price, view_count, has_details, is_public, store_id
     FROM products
-    WHERE id = :id;
+    WHERE id = :id AND deleted_at IS NULL;
 """
 
 GET_PRODUCT_BY_NAME_AND_STORE_ID_QUERY = """
     SELECT
-        id, name, description, image_url, price,
-        view_count, has_details, is_public, store_id
+        id, name, description, image_url, thumbnail_url, preview_url,
+        price, view_count, has_details, is_public, store_id
     FROM products
-    WHERE name = :name AND store_id = :store_id;
+    WHERE name = :name AND store_id = :store_id AND deleted_at IS NULL;
 """
 
 CREATE_PRODUCT_QUERY = """
@@ -53,21 +56,103 @@ CREATE_PRODUCT_QUERY = """
         :name, :description, :image_url, :price, :has_details, :is_public, :store_id
     )
     RETURNING
-        id, name, description, image_url, price,
-        view_count, has_details, is_public, store_id;
+        id, name, description, image_url, thumbnail_url, preview_url,
+        price, view_count, has_details, is_public, store_id;
+"""
+
+GET_EXISTING_PRODUCT_NAMES_FOR_STORE_QUERY = """
+    SELECT name
+    FROM products
+    WHERE store_id = :store_id AND name = ANY (:names) AND deleted_at IS NULL;
+"""
+
+CREATE_PRODUCTS_QUERY = """
+    INSERT INTO products (
+        name, description, image_url, price, has_details, is_public, store_id
+    )
+    SELECT name, description, image_url, price, has_details, is_public, :store_id
+    FROM unnest(
+        CAST(:names AS text[]),
+        CAST(:descriptions AS text[]),
+        CAST(:image_urls AS text[]),
+        CAST(:prices AS numeric[]),
+        CAST(:has_details AS boolean[]),
+        CAST(:is_public AS boolean[])
+    ) AS p(name, description, image_url, price, has_details, is_public)
+    ON CONFLICT (store_id, name) WHERE deleted_at IS NULL DO NOTHING
+    RETURNING
+        id, name, description, image_url, thumbnail_url, preview_url,
+        price, view_count, has_details, is_public, store_id;
 """
 
 INCREMENT_PRODUCT_VIEW_COUNT_BY_ID_QUERY = """
     UPDATE products
     SET view_count = view_count + 1
+    WHERE id = :id AND deleted_at IS NULL;
+"""
+
+UPDATE_PRODUCT_IMAGE_URLS_BY_ID_QUERY = """
+    UPDATE products
+    SET
+        image_url = :image_url,
+        thumbnail_url = :thumbnail_url,
+        preview_url = :preview_url
     WHERE id = :id;
 """
 
+GET_IMAGE_URLS_QUERY = """
+    SELECT url
+    FROM products, unnest(ARRAY[image_url, thumbnail_url, preview_url]) AS url
+    WHERE url IS NOT NULL;
+"""
+
+GET_REFERENCED_IMAGE_URLS_QUERY = """
+    SELECT url
+    FROM products, unnest(ARRAY[image_url, thumbnail_url, preview_url]) AS url
+    WHERE url = ANY(:urls);
+"""
+
 DELETE_PRODUCT_BY_ID_QUERY = """
     DELETE FROM products
     WHERE id = :id;
 """
 
+SOFT_DELETE_PRODUCT_BY_ID_QUERY = """
+    UPDATE products
+    SET deleted_at = now()
+    WHERE id = :id AND deleted_at IS NULL;
+"""
+
+DELETE_PRODUCTS_BY_IDS_QUERY = """
+    DELETE FROM products
+    WHERE id = ANY(:ids) AND store_id = :store_id
+    RETURNING
+        id, name, description, image_url, thumbnail_url, preview_url,
+        price, view_count, has_details, is_public, store_id;
+"""
+
+SOFT_DELETE_PRODUCTS_BY_IDS_QUERY = """
+    UPDATE products
+    SET deleted_at = now()
+    WHERE id = ANY(:ids) AND store_id = :store_id AND deleted_at IS NULL
+    RETURNING
+        id, name, description, image_url, thumbnail_url, preview_url,
+        price, view_count, has_details, is_public, store_id;
+"""
+
+PURGE_DELETED_PRODUCTS_QUERY = """
+    DELETE FROM products
+    WHERE id IN (
+        SELECT id
+        FROM products
+        WHERE deleted_at < now() - make_interval(secs => :deleted_for)
+        LIMIT :limit
+    )
+    RETURNING
+        id, name, description, image_url, thumbnail_url, preview_url,
+        price, view_count, has_details, is_public, store_id;
+"""
+
 
 class ProductsRepository(BaseRepository):
     """"
@@ -132,6 +217,39 @@ class ProductsRepository(BaseRepository):
         return ProductInDB(**product_record)
 
 
+    async def get_existing_product_names(
+        self, *, store_id: int, names: list[str]
+    ) -> set[str]:
+        name_records = await self.db.fetch_all(
+            query=GET_EXISTING_PRODUCT_NAMES_FOR_STORE_QUERY,
+            values={"store_id": store_id, "names": names}
+        )
+        return {name_record["name"] for name_record in name_records}
+
+
+    async def create_products(
+        self, *, store_id: int, new_products: list[ProductCreate]
+    ) -> List[ProductInDB]:
+        """
+        Inserts all products of a store with a single statement. Products
+        whose name is already taken by the store are skipped, so they are
+        missing from the returned list.
+        """
+        product_records = await self.db.fetch_all(
+            query=CREATE_PRODUCTS_QUERY,
+            values={
+                "store_id": store_id,
+                "names": [p.name for p in new_products],
+                "descriptions": [p.description for p in new_products],
+                "image_urls": [p.image_url for p in new_products],
+                "prices": [p.price for p in new_products],
+                "has_details": [p.has_details for p in new_products],
+                "is_public": [p.is_public for p in new_products],
+            }
+        )
+        return [ProductInDB(**product) for product in product_records]
+
+
     async def create_product(self, *, new_product: ProductCreate) -> ProductInDB:
         product_record = await self.db.fetch_one(
             query=CREATE_PRODUCT_QUERY, values=new_product.model_dump()
@@ -152,8 +270,76 @@ class ProductsRepository(BaseRepository):
         return ProductInDB(**product_record)
 
 
-    async def delete_product_by_id(self, *, id: int) -> None:
+    async def update_product_image_urls_by_id(
+        self, *, id: int, image_url: str, thumbnail_url: str, preview_url: str
+    ) -> None:
+        await self.db.execute(
+            query=UPDATE_PRODUCT_IMAGE_URLS_BY_ID_QUERY,
+            values={
+                "id": id,
+                "image_url": image_url,
+                "thumbnail_url": thumbnail_url,
+                "preview_url": preview_url,
+            }
+        )
+
+
+    async def get_image_urls(self) -> set[str]:
+        """
+        URLs of every image (in every size) used by a product.
+        """
+        url_records = await self.db.fetch_all(query=GET_IMAGE_URLS_QUERY)
+        return {url_record["url"] for url_record in url_records}
+
+
+    async def get_referenced_image_urls(self, *, urls: list[str]) -> set[str]:
+        """
+        The given URLs that are still used by a product, e.g. by a product
+        of another store with the same name.
+        """
+        url_records = await self.db.fetch_all(
+            query=GET_REFERENCED_IMAGE_URLS_QUERY,
+            values={"urls": urls}
+        )
+        return {url_record["url"] for url_record in url_records}
+
+
+    async def delete_product_by_id(self, *, id: int, soft: bool = False) -> None:
+        """
+        With `soft`, the product is only marked as deleted, and its details,
+        tags and menu categories are left for purge_deleted_products.
+        """
         await self.db.execute(
-            query=DELETE_PRODUCT_BY_ID_QUERY,
+            query=SOFT_DELETE_PRODUCT_BY_ID_QUERY if soft else DELETE_PRODUCT_BY_ID_QUERY,
             values={"id": id}
         )
+
+
+    async def delete_products_by_ids(
+        self, *, ids: list[int], store_id: int, soft: bool = False
+    ) -> List[ProductInDB]:
+        """
+        Deletes the given products of a store with a single statement. Ids
+        that do not exist or belong to another store are skipped, so they
+        are missing from the returned list.
+        """
+        product_records = await self.db.fetch_all(
+            query=SOFT_DELETE_PRODUCTS_BY_IDS_QUERY if soft else DELETE_PRODUCTS_BY_IDS_QUERY,
+            values={"ids": ids, "store_id": store_id}
+        )
+        return [ProductInDB(**product_record) for product_record in product_records]
+
+
+    async def purge_deleted_products(
+        self, *, deleted_for: float, limit: int
+    ) -> List[ProductInDB]:
+        """
+        Removes up to `limit` of the products soft deleted more than
+        `deleted_for` seconds ago, along with their details, tags and menu
+        categories.
+        """
+        product_records = await self.db.fetch_all(
+            query=PURGE_DELETED_PRODUCTS_QUERY,
+            values={"deleted_for": deleted_for, "limit": limit}
+        )
+        return [ProductInDB(**product_record) for product_record in product_records]
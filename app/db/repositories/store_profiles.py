@@ -1,9 +1,17 @@
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 from pydantic import EmailStr
 from fastapi import HTTPException, status
 from app.db.repositories.base import BaseRepository
 from app.models.store_profiles import StoreProfileInDB, StoreProfileCreate, StoreProfileOutFilter
 from app.api.enums.products import MaxDistanceOption
+from app.cache.swr import read_with_swr, fresh_key
+from app.cache.codecs import encode_ids, decode_ids
+from app.cache.two_tier import nearby_stores_cache, store_profiles_cache, read_through_redis
+from app.core.config import (
+    NEARBY_STORES_CACHE_SOFT_TTL,
+    NEARBY_STORES_CACHE_HARD_TTL,
+    STORE_PROFILES_CACHE_TTL,
+)
 from app.services import auth_service
 from databases import Database
 
@@ -20,7 +28,7 @@ GET_NEARBY_STORE_IDS_QUERY = """
 
 GET_STORE_PROFILE_FILTER_VIEW_BY_STORE_ID_QUERY = """
     SELECT
-        store_id AS id, name, logo_url,
+        store_id AS id, name, logo_url, logo_thumbnail_url,
         ST_Distance(
             location,
             ST_MakePoint(:lng, :lat)::geography
@@ -31,24 +39,24 @@ GET_STORE_PROFILE_FILTER_VIEW_BY_STORE_ID_QUERY = """
 
 GET_STORE_PROFILE_SIMPLE_VIEW_BY_STORE_ID_QUERY = """
     SELECT
-        id, name, description, logo_url, phone_number, address, 
-        lat, lng, store_id
+        id, name, description, logo_url, logo_thumbnail_url,
+        logo_preview_url, phone_number, address, lat, lng, store_id
     FROM store_profiles
     WHERE store_id = :store_id;
 """
 
 GET_STORE_PROFILE_BY_STORE_ID_QUERY = """
     SELECT 
-        id, name, description, logo_url, phone_number, address, 
-        lat, lng, store_id
+        id, name, description, logo_url, logo_thumbnail_url,
+        logo_preview_url, phone_number, address, lat, lng, store_id
     FROM store_profiles
     WHERE store_id = :store_id;
 """
 
 GET_STORE_PROFILE_BY_NAME_QUERY = """
     SELECT 
-        id, name, description, logo_url, phone_number, address, 
-        lat, lng, store_id
+        id, name, description, logo_url, logo_thumbnail_url,
+        logo_preview_url, phone_number, address, lat, lng, store_id
     FROM store_profiles
     WHERE name = :name;
 """
@@ -63,8 +71,23 @@ CREATE_NEW_STORE_PROFILE_QUERY = """
         :lat, :lng, ST_MakePoint(:lng, :lat)::geography, :store_id
     )
     RETURNING
-        id, name, description, logo_url, phone_number, address, 
-        lat, lng, store_id;
+        id, name, description, logo_url, logo_thumbnail_url,
+        logo_preview_url, phone_number, address, lat, lng, store_id;
+"""
+
+UPDATE_STORE_PROFILE_LOGO_URLS_BY_STORE_ID_QUERY = """
+    UPDATE store_profiles
+    SET
+        logo_url = :logo_url,
+        logo_thumbnail_url = :logo_thumbnail_url,
+        logo_preview_url = :logo_preview_url
+    WHERE store_id = :store_id;
+"""
+
+GET_LOGO_URLS_QUERY = """
+    SELECT url
+    FROM store_profiles, unnest(ARRAY[logo_url, logo_thumbnail_url, logo_preview_url]) AS url
+    WHERE url IS NOT NULL;
 """
 
 
@@ -79,30 +102,42 @@ class StoreProfilesRepository(BaseRepository):
         cache: "Redis",
         lat: float,
         lng: float,
-        max_dist: MaxDistanceOption,
-        EMPTY_LIST_INDICATOR: int = -1
+        max_dist: MaxDistanceOption
     ) -> list[int]:
-        key = hash((lat, lng, max_dist))
-        if await cache.exists(key):
-            store_ids = await cache.lrange(key, 0, -1)
-            if EMPTY_LIST_INDICATOR in store_ids:
-                return []
-            return [int(store_id) for store_id in store_ids]
-
-        store_profile_records = await self.db.fetch_all(
-            query=GET_NEARBY_STORE_IDS_QUERY,
-            values={"lat": lat, "lng": lng, "max_dist": max_dist}
+        key = f"nearby_stores:{hash((lat, lng, max_dist))}"
+
+        async def read_cached_store_ids() -> tuple[Optional[list[int]], bool]:
+            store_ids, is_fresh = await cache.mget(key, fresh_key(key))
+            if store_ids is None:
+                return None, False
+            return decode_ids(store_ids), is_fresh is not None
+
+        async def rebuild_cached_store_ids() -> list[int]:
+            store_profile_records = await self.db.fetch_all(
+                query=GET_NEARBY_STORE_IDS_QUERY,
+                values={"lat": lat, "lng": lng, "max_dist": max_dist}
+            )
+            store_ids = [
+                record["store_id"] for record in store_profile_records
+            ]
+            async with cache.pipeline(transaction=True) as pipe:
+                pipe.set(
+                    key, encode_ids(store_ids), ex=NEARBY_STORES_CACHE_HARD_TTL
+                )
+                pipe.set(fresh_key(key), 1, ex=NEARBY_STORES_CACHE_SOFT_TTL)
+                await pipe.execute()
+            return store_ids
+
+        return await nearby_stores_cache.get(
+            key,
+            lambda: read_with_swr(
+                cache=cache,
+                key=key,
+                cache_name="nearby_stores",
+                read=read_cached_store_ids,
+                rebuild=rebuild_cached_store_ids,
+            )
         )
-        store_ids = [
-            record["store_id"] for record in store_profile_records
-        ]
-        if len(store_ids) > 0:
-            await cache.rpush(key, *store_ids)
-            await cache.expire(key, 300)
-        else:
-            await cache.rpush(key, EMPTY_LIST_INDICATOR)
-            await cache.expire(key, 300)
-        return [int(store_id) for store_id in store_ids]
 
 
     async def get_store_profile_filter_view_by_store_id(
@@ -124,29 +159,62 @@ class StoreProfilesRepository(BaseRepository):
 
 
     async def get_store_profile_simple_view_by_store_id(
-        self, *, store_id: int
+        self, *, cache: "Redis", store_id: int
     ) -> StoreProfileInDB:
-        store_profile_record = await self.db.fetch_one(
-            query=GET_STORE_PROFILE_SIMPLE_VIEW_BY_STORE_ID_QUERY,
-            values={"store_id": store_id}
+        async def load() -> Optional[StoreProfileInDB]:
+            store_profile_record = await self.db.fetch_one(
+                query=GET_STORE_PROFILE_SIMPLE_VIEW_BY_STORE_ID_QUERY,
+                values={"store_id": store_id}
+            )
+
+            if not store_profile_record:
+                return None
+
+            return StoreProfileInDB(**store_profile_record)
+
+        return await self._get_cached_store_profile(
+            cache=cache, store_id=store_id, load=load
         )
 
-        if not store_profile_record:
-            return None
 
-        return StoreProfileInDB(**store_profile_record)
+    async def get_store_profile_by_store_id(
+        self, *, cache: "Redis", store_id: int
+    ) -> StoreProfileInDB:
+        async def load() -> Optional[StoreProfileInDB]:
+            store_profile_record = await self.db.fetch_one(
+                query=GET_STORE_PROFILE_BY_STORE_ID_QUERY,
+                values={"store_id": store_id}
+            )
 
+            if not store_profile_record:
+                return None
 
-    async def get_store_profile_by_store_id(self, *, store_id: int) -> StoreProfileInDB:
-        store_profile_record = await self.db.fetch_one(
-            query=GET_STORE_PROFILE_BY_STORE_ID_QUERY,
-            values={"store_id": store_id}
+            return StoreProfileInDB(**store_profile_record)
+
+        return await self._get_cached_store_profile(
+            cache=cache, store_id=store_id, load=load
         )
 
-        if not store_profile_record:
-            return None
 
-        return StoreProfileInDB(**store_profile_record)
+    async def _get_cached_store_profile(
+        self,
+        *,
+        cache: "Redis",
+        store_id: int,
+        load: Callable[[], Awaitable[Optional[StoreProfileInDB]]]
+    ) -> StoreProfileInDB:
+        return await store_profiles_cache.get(
+            store_id,
+            lambda: read_through_redis(
+                cache=cache,
+                key=f"store_profiles:{store_id}",
+                cache_name="store_profiles",
+                ttl=STORE_PROFILES_CACHE_TTL,
+                load=load,
+                encode=lambda store_profile: store_profile.model_dump_json(),
+                decode=lambda cached: StoreProfileInDB.model_validate_json(cached),
+            )
+        )
 
 
     async def get_store_profile_by_name(self, *, name: str) -> StoreProfileInDB:
@@ -170,3 +238,34 @@ class StoreProfilesRepository(BaseRepository):
         )
 
         return StoreProfileInDB(**created_store_profile_record)
+
+
+    async def update_store_profile_logo_urls_by_store_id(
+        self,
+        *,
+        cache: "Redis",
+        store_id: int,
+        logo_url: str,
+        logo_thumbnail_url: str,
+        logo_preview_url: str
+    ) -> None:
+        await self.db.execute(
+            query=UPDATE_STORE_PROFILE_LOGO_URLS_BY_STORE_ID_QUERY,
+            values={
+                "store_id": store_id,
+                "logo_url": logo_url,
+                "logo_thumbnail_url": logo_thumbnail_url,
+                "logo_preview_url": logo_preview_url,
+            }
+        )
+
+        await cache.delete(f"store_profiles:{store_id}")
+        await store_profiles_cache.invalidate(cache, store_id)
+
+
+    async def get_logo_urls(self) -> set[str]:
+        """
+        URLs of every logo (in every size) used by a store profile.
+        """
+        url_records = await self.db.fetch_all(query=GET_LOGO_URLS_QUERY)
+        return {url_record["url"] for url_record in url_records}
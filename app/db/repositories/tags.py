@@ -1,11 +1,16 @@
+import json
 from typing import List
 from app.db.repositories.base import BaseRepository
+from app.cache.two_tier import tags_cache, read_through_redis
+from app.cache.versions import update_catalog_version
+from app.core.config import CATALOG_CACHE_TTL
 from app.models.tags import TagInDB
 
 
 GET_TAGS_QUERY = """
     SELECT id, label, description
-    FROM tags;
+    FROM tags
+    ORDER BY id;
 """
 
 GET_TAG_BY_ID_QUERY = """
@@ -22,18 +27,42 @@ GET_TAGS_FOR_PRODUCT_BY_PRODUCT_ID_QUERY = """
 """
 
 
+def encode_tags(tags: List[TagInDB]) -> str:
+    return json.dumps([tag.model_dump() for tag in tags])
+
+
 class TagsRepository(BaseRepository):
     """"
     All database actions associated with the Tag resource
     """
 
-    async def get_all_tags(self) -> List[TagInDB]:
-        tag_records = await self.db.fetch_all(query=GET_TAGS_QUERY)
+    async def get_all_tags(self, *, cache: "Redis") -> List[TagInDB]:
+        async def load() -> List[TagInDB]:
+            tag_records = await self.db.fetch_all(query=GET_TAGS_QUERY)
 
-        return [
-            TagInDB(**tag_record)
-            for tag_record in tag_records
-        ]
+            tags = [
+                TagInDB(**tag_record)
+                for tag_record in tag_records
+            ]
+            if await update_catalog_version(cache, "tags", encode_tags(tags)):
+                # The other workers may still hold the previous list
+                await tags_cache.invalidate(cache, "all")
+            return tags
+
+        return await tags_cache.get(
+            "all",
+            lambda: read_through_redis(
+                cache=cache,
+                key="tags:all",
+                cache_name="tags",
+                ttl=CATALOG_CACHE_TTL,
+                load=load,
+                encode=encode_tags,
+                decode=lambda cached: [
+                    TagInDB(**tag) for tag in json.loads(cached)
+                ],
+            )
+        )
 
 
     async def get_tag_by_id(self, *, id: int) -> TagInDB:
@@ -0,0 +1,107 @@
+import io
+import asyncio
+from typing import Sequence
+from PIL import Image, ImageOps, UnidentifiedImageError
+from starlette.concurrency import run_in_threadpool
+from app.db.repositories.store_profiles import StoreProfilesRepository
+from app.db.repositories.products import ProductsRepository
+from app.api.exceptions.jobs import PermanentJobFailure
+from app.cache.versions import store_version_key, bump_version
+from app.core.config import (
+    IMAGE_MAX_SIZE,
+    IMAGE_PREVIEW_SIZE,
+    IMAGE_THUMBNAIL_SIZE,
+    IMAGE_WEBP_QUALITY,
+)
+from .queue import JobContext, job_handler, blob_key
+
+
+PROCESS_PRODUCT_IMAGE = "process_product_image"
+PROCESS_STORE_LOGO = "process_store_logo"
+
+# Largest first, each variant is scaled down from the previous one
+IMAGE_SIZES = (IMAGE_MAX_SIZE, IMAGE_PREVIEW_SIZE, IMAGE_THUMBNAIL_SIZE)
+
+
+def variant_name(name: str, size: int) -> str:
+    return name if size == IMAGE_MAX_SIZE else f"{name}_{size}px"
+
+
+def resize_to_webp(image: bytes, sizes: Sequence[int]) -> list[bytes]:
+    """
+    Scales the image down (never up) to fit each of the `sizes` (in
+    descending order) on its longest side, after applying its EXIF
+    orientation. Returns the WebP encoding of every size.
+    """
+    try:
+        with Image.open(io.BytesIO(image)) as img:
+            img = ImageOps.exif_transpose(img)
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+
+            variants = []
+            for size in sizes:
+                img.thumbnail((size, size))
+                output = io.BytesIO()
+                img.save(output, format="WEBP", quality=IMAGE_WEBP_QUALITY)
+                variants.append(output.getvalue())
+            return variants
+    except (UnidentifiedImageError, Image.DecompressionBombError) as exc:
+        raise PermanentJobFailure(f"Not a supported image: {exc}")
+
+
+async def process_image(
+    context: JobContext, job: dict, folder: str
+) -> list[str]:
+    """
+    Resizes the image queued with the job to each of the IMAGE_SIZES and
+    stores them under `folder`. Returns their public URLs.
+    """
+    image = await context.cache.get(blob_key(job["id"]))
+    if image is None:
+        raise PermanentJobFailure(f"The image of job {job['id']} has expired.")
+
+    keys = [
+        f"{folder}/{variant_name(job['payload']['name'], size)}"
+        for size in IMAGE_SIZES
+    ]
+    variants = await run_in_threadpool(resize_to_webp, image, IMAGE_SIZES)
+    await asyncio.gather(*[
+        context.storage.put(key, variant, content_type="image/webp")
+        for key, variant in zip(keys, variants)
+    ])
+    return [context.storage.url_for(key) for key in keys]
+
+
+@job_handler(PROCESS_PRODUCT_IMAGE)
+async def process_product_image(context: JobContext, job: dict) -> None:
+    image_url, preview_url, thumbnail_url = await process_image(
+        context, job, 'products'
+    )
+
+    await ProductsRepository(context.db).update_product_image_urls_by_id(
+        id=job["payload"]["product_id"],
+        image_url=image_url,
+        thumbnail_url=thumbnail_url,
+        preview_url=preview_url,
+    )
+    await bump_version(
+        context.cache, store_version_key(job["payload"]["store_id"])
+    )
+
+
+@job_handler(PROCESS_STORE_LOGO)
+async def process_store_logo(context: JobContext, job: dict) -> None:
+    logo_url, logo_preview_url, logo_thumbnail_url = await process_image(
+        context, job, 'store_profiles'
+    )
+
+    store_id = job["payload"]["store_id"]
+    await StoreProfilesRepository(context.db).update_store_profile_logo_urls_by_store_id(
+        cache=context.cache,
+        store_id=store_id,
+        logo_url=logo_url,
+        logo_thumbnail_url=logo_thumbnail_url,
+        logo_preview_url=logo_preview_url,
+    )
+    await bump_version(context.cache, store_version_key(store_id))
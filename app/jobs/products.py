@@ -0,0 +1,24 @@
+from app.db.repositories.products import ProductsRepository
+from app.core.config import PRODUCT_PURGE_DELAY, PRODUCT_PURGE_BATCH_SIZE
+from .queue import JobContext, job_handler
+from .storage_cleanup import enqueue_product_image_deletion
+
+
+PURGE_DELETED_PRODUCTS = "purge_deleted_products"
+
+
+@job_handler(PURGE_DELETED_PRODUCTS)
+async def purge_deleted_products(context: JobContext, job: dict) -> None:
+    """
+    Removes the soft deleted products in batches of PRODUCT_PURGE_BATCH_SIZE,
+    so that each cascade only holds its locks briefly, and queues the
+    deletion of their images.
+    """
+    product_repo = ProductsRepository(context.db)
+    while True:
+        products = await product_repo.purge_deleted_products(
+            deleted_for=PRODUCT_PURGE_DELAY, limit=PRODUCT_PURGE_BATCH_SIZE
+        )
+        await enqueue_product_image_deletion(context.cache, products)
+        if len(products) < PRODUCT_PURGE_BATCH_SIZE:
+            return
@@ -0,0 +1,241 @@
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+from app.api.exceptions.jobs import PermanentJobFailure
+from app.core.config import (
+    JOB_BLOB_TTL,
+    JOB_MAX_ATTEMPTS,
+    JOB_RETRY_BACKOFF,
+    JOB_WORKER_HEARTBEAT_TTL,
+)
+from app.core.logging import get_logger
+
+
+jobs_logger = get_logger(__name__)
+
+# Jobs waiting to run, jobs waiting for a retry (scored by when they are due),
+# and jobs that failed JOB_MAX_ATTEMPTS times
+QUEUE_KEY = "jobs:queue"
+DELAYED_KEY = "jobs:delayed"
+DEAD_LETTER_KEY = "jobs:dead"
+
+# Ids of the workers that may have jobs in progress
+WORKERS_KEY = "jobs:workers"
+
+
+def processing_key(worker_id: str) -> str:
+    """
+    Jobs a worker has taken off the queue but not finished yet.
+    """
+    return f"jobs:processing:{worker_id}"
+
+
+def heartbeat_key(worker_id: str) -> str:
+    """
+    Set while a worker is alive, expires JOB_WORKER_HEARTBEAT_TTL seconds
+    after its last heartbeat.
+    """
+    return f"jobs:heartbeat:{worker_id}"
+
+
+def blob_key(job_id: str) -> str:
+    """
+    Binary input of a job (e.g. an uploaded image), kept out of the job itself.
+    """
+    return f"jobs:blobs:{job_id}"
+
+
+class JobContext:
+    """
+    Connections shared by the job handlers of a worker.
+    """
+
+    def __init__(self, *, db: "Database", cache: "Redis", storage: "Storage") -> None:
+        self.db = db
+        self.cache = cache
+        self.storage = storage
+
+
+JobHandler = Callable[[JobContext, dict], Awaitable[None]]
+
+job_handlers: dict[str, JobHandler] = {}
+
+
+def job_handler(name: str) -> Callable[[JobHandler], JobHandler]:
+    def register(handler: JobHandler) -> JobHandler:
+        job_handlers[name] = handler
+        return handler
+    return register
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex
+
+
+class BlobWriter:
+    """
+    Writes the input of a job to Redis chunk by chunk, before the job is
+    queued with its id.
+    """
+
+    def __init__(self, cache: "Redis", job_id: str) -> None:
+        self.cache = cache
+        self.key = blob_key(job_id)
+
+
+    async def write(self, data: bytes) -> None:
+        async with self.cache.pipeline(transaction=True) as pipe:
+            pipe.append(self.key, data)
+            pipe.expire(self.key, JOB_BLOB_TTL)
+            await pipe.execute()
+
+
+    async def discard(self) -> None:
+        await self.cache.delete(self.key)
+
+
+async def enqueue(
+    cache: "Redis",
+    name: str,
+    payload: dict[str, Any],
+    *,
+    blob: Optional[bytes] = None,
+    job_id: Optional[str] = None
+) -> str:
+    """
+    Queues a job. Its input can be passed as `blob`, or written beforehand
+    with a BlobWriter for the given `job_id`.
+    """
+    job = {
+        "id": job_id or new_job_id(),
+        "name": name,
+        "payload": payload,
+        "attempts": 0,
+    }
+    async with cache.pipeline(transaction=True) as pipe:
+        if blob is not None:
+            pipe.set(blob_key(job["id"]), blob, ex=JOB_BLOB_TTL)
+        pipe.lpush(QUEUE_KEY, json.dumps(job))
+        await pipe.execute()
+    return job["id"]
+
+
+def schedule_key(name: str) -> str:
+    """
+    Set while a periodic job is not due yet.
+    """
+    return f"jobs:schedule:{name}"
+
+
+async def enqueue_periodically(
+    cache: "Redis", name: str, payload: dict[str, Any], *, every: int
+) -> Optional[str]:
+    """
+    Queues a job unless it was already queued (by any worker) in the last
+    `every` seconds. Returns its id when it was queued.
+    """
+    if await cache.set(schedule_key(name), 1, nx=True, ex=every):
+        return await enqueue(cache, name, payload)
+    return None
+
+
+async def promote_due_jobs(cache: "Redis") -> None:
+    """
+    Moves the retries that are due back to the queue. Removing a job from
+    the delayed set is what claims it, so each job is moved only once even
+    with several workers.
+    """
+    for raw_job in await cache.zrangebyscore(DELAYED_KEY, 0, time.time()):
+        if await cache.zrem(DELAYED_KEY, raw_job):
+            await cache.lpush(QUEUE_KEY, raw_job)
+
+
+async def retry_or_bury(
+    cache: "Redis", job: dict, error: str, *, retry: bool = True
+) -> None:
+    """
+    Schedules a failed job for another attempt with exponential backoff,
+    or moves it to the dead-letter list after JOB_MAX_ATTEMPTS attempts
+    (or right away when retrying cannot help).
+    """
+    job = {**job, "attempts": job["attempts"] + 1, "error": error}
+    if job["attempts"] < JOB_MAX_ATTEMPTS and retry:
+        due = time.time() + JOB_RETRY_BACKOFF * 2 ** (job["attempts"] - 1)
+        await cache.zadd(DELAYED_KEY, {json.dumps(job): due})
+    else:
+        jobs_logger.error(f"Job {job['id']} ({job['name']}) moved to {DEAD_LETTER_KEY}: {error}")
+        await cache.lpush(DEAD_LETTER_KEY, json.dumps(job))
+
+
+async def process_next_job(
+    context: JobContext, *, worker_id: str, timeout: float
+) -> bool:
+    """
+    Runs the next queued job, waiting up to `timeout` seconds for one.
+    Returns whether a job was run.
+    """
+    cache = context.cache
+    await promote_due_jobs(cache)
+
+    raw_job = await cache.blmove(
+        QUEUE_KEY, processing_key(worker_id), timeout, "RIGHT", "LEFT"
+    )
+    if raw_job is None:
+        return False
+
+    job = json.loads(raw_job)
+    try:
+        await job_handlers[job["name"]](context, job)
+    except PermanentJobFailure as exc:
+        jobs_logger.exception(exc)
+        await retry_or_bury(cache, job, repr(exc), retry=False)
+    except Exception as exc:
+        jobs_logger.exception(exc)
+        await retry_or_bury(cache, job, repr(exc))
+    else:
+        await cache.delete(blob_key(job["id"]))
+    finally:
+        await cache.lrem(processing_key(worker_id), 1, raw_job)
+    return True
+
+
+async def requeue_unfinished_jobs(cache: "Redis", *, worker_id: str) -> None:
+    """
+    Puts back the jobs a previous run of this worker took but never
+    finished, e.g. because it was killed mid-job.
+    """
+    while await cache.lmove(processing_key(worker_id), QUEUE_KEY, "RIGHT", "RIGHT"):
+        pass
+
+
+async def send_heartbeat(cache: "Redis", *, worker_id: str) -> None:
+    async with cache.pipeline(transaction=True) as pipe:
+        pipe.sadd(WORKERS_KEY, worker_id)
+        pipe.set(heartbeat_key(worker_id), 1, ex=JOB_WORKER_HEARTBEAT_TTL)
+        await pipe.execute()
+
+
+async def retire_worker(cache: "Redis", *, worker_id: str) -> None:
+    """
+    Unregisters a worker that stopped with no job in progress.
+    """
+    async with cache.pipeline(transaction=True) as pipe:
+        pipe.srem(WORKERS_KEY, worker_id)
+        pipe.delete(heartbeat_key(worker_id))
+        await pipe.execute()
+
+
+async def requeue_jobs_of_dead_workers(cache: "Redis") -> None:
+    """
+    Puts back the jobs in progress of the workers whose heartbeat expired.
+    Each job is moved once even when several workers do this at the same
+    time, as moving it is what claims it.
+    """
+    for worker_id in await cache.smembers(WORKERS_KEY):
+        worker_id = worker_id.decode() if isinstance(worker_id, bytes) else worker_id
+        if await cache.exists(heartbeat_key(worker_id)):
+            continue
+        jobs_logger.warning(f"Requeuing the unfinished jobs of the dead worker {worker_id}.")
+        await requeue_unfinished_jobs(cache, worker_id=worker_id)
+        await cache.srem(WORKERS_KEY, worker_id)
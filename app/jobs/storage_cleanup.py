@@ -0,0 +1,73 @@
+import time
+from app.db.repositories.store_profiles import StoreProfilesRepository
+from app.db.repositories.products import ProductsRepository
+from app.models.products import ProductInDB
+from app.core.config import STORAGE_LIST_PAGE_SIZE, STORAGE_ORPHAN_MIN_AGE
+from app.core.logging import get_logger
+from .queue import JobContext, job_handler, enqueue
+
+
+cleanup_logger = get_logger(__name__)
+
+DELETE_PRODUCT_IMAGES = "delete_product_images"
+CLEANUP_STORAGE = "cleanup_storage"
+
+# Storage folders holding the images of products and the logos of stores
+IMAGE_FOLDERS = ("products", "store_profiles")
+
+
+async def enqueue_product_image_deletion(
+    cache: "Redis", products: list[ProductInDB]
+) -> None:
+    """
+    Queues the deletion of the images of products that were just deleted.
+    """
+    urls = [
+        url
+        for product in products
+        for url in (product.image_url, product.thumbnail_url, product.preview_url)
+        if url is not None
+    ]
+    if urls:
+        await enqueue(cache, DELETE_PRODUCT_IMAGES, {"urls": urls})
+
+
+@job_handler(DELETE_PRODUCT_IMAGES)
+async def delete_product_images(context: JobContext, job: dict) -> None:
+    """
+    Deletes the images of a deleted product, except the ones another
+    product still uses.
+    """
+    urls = set(job["payload"]["urls"])
+    referenced_urls = await ProductsRepository(context.db).get_referenced_image_urls(
+        urls=list(urls)
+    )
+    keys = [context.storage.key_for(url) for url in urls - referenced_urls]
+    await context.storage.delete_many([key for key in keys if key is not None])
+
+
+@job_handler(CLEANUP_STORAGE)
+async def cleanup_storage(context: JobContext, job: dict) -> None:
+    """
+    Deletes the stored images no product or store profile uses, one page
+    of the listing at a time. Images younger than STORAGE_ORPHAN_MIN_AGE
+    are kept, since their product may not be saved yet.
+    """
+    storage = context.storage
+    referenced_urls = (
+        await ProductsRepository(context.db).get_image_urls()
+        | await StoreProfilesRepository(context.db).get_logo_urls()
+    )
+    referenced_keys = {storage.key_for(url) for url in referenced_urls}
+    written_before = time.time() - STORAGE_ORPHAN_MIN_AGE
+
+    deleted = 0
+    for folder in IMAGE_FOLDERS:
+        async for page in storage.list_objects(folder, page_size=STORAGE_LIST_PAGE_SIZE):
+            old_keys = {obj.key for obj in page if obj.modified < written_before}
+            orphaned_keys = old_keys - referenced_keys
+            if orphaned_keys:
+                await storage.delete_many(sorted(orphaned_keys))
+                deleted += len(orphaned_keys)
+
+    cleanup_logger.info(f"Deleted {deleted} orphaned images from the storage.")
@@ -0,0 +1,130 @@
+"""
+Runs the background jobs queued by the API (see app.jobs.queue).
+
+Usage: python -m app.jobs.worker
+"""
+import asyncio
+import signal
+import redis.asyncio as redis
+from databases import Database
+from app.core.config import (
+    DATABASE_URL,
+    MIN_CONNECTION_COUNT,
+    REDIS_URL,
+    REDIS_POOL_TIMEOUT,
+    JOB_POLL_TIMEOUT,
+    JOB_WORKER_ID,
+    JOB_WORKER_HEARTBEAT_TTL,
+    JOB_WORKER_MAX_CONNECTIONS,
+    STORAGE_CLEANUP_INTERVAL,
+    PRODUCT_PURGE_INTERVAL,
+    LOOP_MONITOR_ENABLED,
+)
+from app.db.instrumentation import InstrumentedDatabase
+from app.storage.events import create_storage
+from app.metrics.event_loop import EventLoopMonitor
+from app.core.logging import get_logger
+from app.jobs import images  # registers the image job handlers
+from app.jobs.storage_cleanup import CLEANUP_STORAGE
+from app.jobs.products import PURGE_DELETED_PRODUCTS
+from app.jobs.queue import (
+    JobContext,
+    enqueue_periodically,
+    process_next_job,
+    requeue_unfinished_jobs,
+    requeue_jobs_of_dead_workers,
+    send_heartbeat,
+    retire_worker,
+)
+
+
+worker_logger = get_logger(__name__)
+
+# Jobs queued every so many seconds, by whichever worker gets to it first
+PERIODIC_JOBS = (
+    (CLEANUP_STORAGE, STORAGE_CLEANUP_INTERVAL),
+    (PURGE_DELETED_PRODUCTS, PRODUCT_PURGE_INTERVAL),
+)
+
+
+async def keep_alive(cache: "Redis", stopping: asyncio.Event) -> None:
+    """
+    Refreshes the heartbeat of this worker until `stopping` is set, and
+    requeues the jobs of the workers whose heartbeat expired.
+    """
+    while not stopping.is_set():
+        try:
+            await send_heartbeat(cache, worker_id=JOB_WORKER_ID)
+            await requeue_jobs_of_dead_workers(cache)
+        except Exception as exc:
+            worker_logger.exception(exc)
+        try:
+            await asyncio.wait_for(stopping.wait(), JOB_WORKER_HEARTBEAT_TTL / 3)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_worker(context: JobContext, stopping: asyncio.Event) -> None:
+    """
+    Runs jobs one at a time until `stopping` is set. The job in progress
+    is always finished first. The PERIODIC_JOBS are queued as they
+    become due.
+    """
+    await requeue_unfinished_jobs(context.cache, worker_id=JOB_WORKER_ID)
+    await send_heartbeat(context.cache, worker_id=JOB_WORKER_ID)
+    # Kept alive apart from the jobs, which may outlast the heartbeat
+    heartbeat = asyncio.create_task(keep_alive(context.cache, stopping))
+    while not stopping.is_set():
+        try:
+            for name, interval in PERIODIC_JOBS:
+                await enqueue_periodically(context.cache, name, {}, every=interval)
+            await process_next_job(
+                context, worker_id=JOB_WORKER_ID, timeout=JOB_POLL_TIMEOUT
+            )
+        except Exception as exc:
+            # Redis unavailable, the worker keeps trying
+            worker_logger.exception(exc)
+            await asyncio.sleep(JOB_POLL_TIMEOUT)
+
+    await heartbeat
+    await retire_worker(context.cache, worker_id=JOB_WORKER_ID)
+
+
+async def main() -> None:
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    database = Database(
+        DATABASE_URL,
+        min_size=min(MIN_CONNECTION_COUNT, JOB_WORKER_MAX_CONNECTIONS),
+        max_size=JOB_WORKER_MAX_CONNECTIONS
+    )
+    await database.connect()
+    cache = redis.Redis.from_pool(redis.BlockingConnectionPool.from_url(
+        REDIS_URL, max_connections=JOB_WORKER_MAX_CONNECTIONS, timeout=REDIS_POOL_TIMEOUT
+    ))
+    storage = create_storage()
+    # Image processing and uploads must not hold up the loop either
+    monitor = EventLoopMonitor() if LOOP_MONITOR_ENABLED else None
+    if monitor is not None:
+        monitor.start()
+
+    try:
+        await run_worker(
+            JobContext(
+                db=InstrumentedDatabase(database), cache=cache, storage=storage
+            ),
+            stopping
+        )
+    finally:
+        if monitor is not None:
+            await monitor.stop()
+        await storage.close()
+        await cache.aclose()
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
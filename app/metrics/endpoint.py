@@ -0,0 +1,71 @@
+import hmac
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from app.core.config import METRICS_TOKEN, MULTIPROCESS_DIR
+from .multiprocess import render_all_workers, snapshot
+from .registry import registry
+
+
+DB_POOL_CONNECTIONS = registry.gauge(
+    "db_pool_connections",
+    "Connections of the database pool, per state.",
+    ("state",)
+)
+DB_POOL_MAX_CONNECTIONS = registry.gauge(
+    "db_pool_max_connections",
+    "Most connections the database pool opens."
+)
+REDIS_POOL_CONNECTIONS = registry.gauge(
+    "redis_pool_connections",
+    "Connections of the Redis pool, per state.",
+    ("state",)
+)
+
+# Version of the Prometheus text format
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def update_pool_gauges(state: "State") -> None:
+    """
+    Reads the pool sizes at scrape time, so the pools are never polled
+    otherwise.
+    """
+    database = getattr(state, "_conn_pool", None)
+    pool = getattr(getattr(database, "_backend", None), "_pool", None)
+    if pool is not None:
+        size, idle = pool.get_size(), pool.get_idle_size()
+        DB_POOL_CONNECTIONS.set(idle, "idle")
+        DB_POOL_CONNECTIONS.set(size - idle, "in_use")
+        DB_POOL_MAX_CONNECTIONS.set(pool.get_max_size())
+
+    cache = getattr(state, "_cache_conn_pool", None)
+    connection_pool = getattr(cache, "connection_pool", None)
+    if connection_pool is not None:
+        REDIS_POOL_CONNECTIONS.set(len(connection_pool._available_connections), "idle")
+        REDIS_POOL_CONNECTIONS.set(len(connection_pool._in_use_connections), "in_use")
+
+
+def has_metrics_token(headers: Headers) -> bool:
+    token = str(METRICS_TOKEN)
+    return bool(token) and hmac.compare_digest(
+        headers.get("Authorization", "").encode(), f"Bearer {token}".encode()
+    )
+
+
+async def metrics(request: Request) -> PlainTextResponse:
+    """
+    The metrics of every worker process when they share a MULTIPROCESS_DIR,
+    else those of this one.
+    """
+    if not has_metrics_token(request.headers):
+        raise HTTPException(status_code=403, detail="Invalid or missing metrics token.")
+    update_pool_gauges(request.app.state)
+    if not MULTIPROCESS_DIR:
+        return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+    body = await run_in_threadpool(
+        render_all_workers, registry, MULTIPROCESS_DIR, snapshot(registry)
+    )
+    return PlainTextResponse(body, media_type=CONTENT_TYPE)
@@ -0,0 +1,94 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+from app.core.config import LOOP_MONITOR_INTERVAL, LOOP_BLOCKED_THRESHOLD
+from app.core.logging import get_logger
+from .registry import registry
+
+
+event_loop_logger = get_logger(__name__)
+
+
+EVENT_LOOP_LAG = registry.histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a callback scheduled every LOOP_MONITOR_INTERVAL seconds.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+EVENT_LOOP_BLOCKED = registry.counter(
+    "event_loop_blocked_total",
+    "Times the event loop was blocked for LOOP_BLOCKED_THRESHOLD seconds or more."
+)
+
+
+class EventLoopMonitor:
+    """
+    Measures the lag of the event loop with a heartbeat callback, and logs
+    the stack of the code blocking the loop (a synchronous call, CPU bound
+    work) whenever the heartbeat is LOOP_BLOCKED_THRESHOLD seconds late.
+
+    The stack is read by a watchdog thread while the loop is still blocked,
+    unlike the slow callback warning of asyncio's debug mode, which only
+    names the callback once it is done (and slows every callback down).
+    """
+
+    def __init__(
+        self,
+        interval: float = LOOP_MONITOR_INTERVAL,
+        blocked_threshold: float = LOOP_BLOCKED_THRESHOLD
+    ) -> None:
+        self.interval = interval
+        self.blocked_threshold = blocked_threshold
+        self.last_beat = time.perf_counter()
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = threading.Event()
+        self._watchdog = threading.Thread(
+            target=self._watch, name="event-loop-watchdog", daemon=True
+        )
+
+
+    def start(self) -> None:
+        self.thread_id = threading.get_ident()
+        self._task = asyncio.create_task(self._beat())
+        self._watchdog.start()
+
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._watchdog.join()
+
+
+    async def _beat(self) -> None:
+        while True:
+            self.last_beat = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - self.last_beat - self.interval
+            EVENT_LOOP_LAG.observe(max(lag, 0.0))
+
+
+    def _watch(self) -> None:
+        # Heartbeat the loop was last reported blocked after, to log a block once
+        reported_beat = None
+        while not self._stopped.wait(self.interval):
+            beat = self.last_beat
+            late = time.perf_counter() - beat - self.interval
+            if late < self.blocked_threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+
+            EVENT_LOOP_BLOCKED.inc()
+            frame = sys._current_frames().get(self.thread_id)
+            event_loop_logger.warning(
+                f"Event loop blocked for {late:.3f}s so far.",
+                extra={
+                    "blocked_seconds": round(late, 3),
+                    "stack": "".join(traceback.format_stack(frame)) if frame else None,
+                }
+            )
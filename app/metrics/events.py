@@ -0,0 +1,61 @@
+import asyncio
+import os
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+from app.core.config import (
+    LOOP_MONITOR_ENABLED,
+    METRICS_ENABLED,
+    METRICS_SYNC_INTERVAL,
+    MULTIPROCESS_DIR,
+)
+from app.core.logging import get_logger
+from .event_loop import EventLoopMonitor
+from .multiprocess import snapshot, write_snapshot
+from .registry import registry
+
+
+metrics_events_logger = get_logger(__name__)
+
+
+async def establish_event_loop_monitor(app: FastAPI) -> None:
+    if LOOP_MONITOR_ENABLED:
+        app.state._event_loop_monitor = EventLoopMonitor()
+        app.state._event_loop_monitor.start()
+
+
+async def release_event_loop_monitor(app: FastAPI) -> None:
+    monitor = getattr(app.state, "_event_loop_monitor", None)
+    if monitor is not None:
+        await monitor.stop()
+
+
+async def sync_metrics() -> None:
+    """
+    Writes the metrics of this worker to MULTIPROCESS_DIR every
+    METRICS_SYNC_INTERVAL seconds, for the other workers to serve.
+    """
+    while True:
+        await asyncio.sleep(METRICS_SYNC_INTERVAL)
+        try:
+            await run_in_threadpool(
+                write_snapshot, MULTIPROCESS_DIR, str(os.getpid()), snapshot(registry)
+            )
+        except Exception as exc:
+            metrics_events_logger.exception(exc)
+
+
+async def establish_metrics_sync(app: FastAPI) -> None:
+    if METRICS_ENABLED and MULTIPROCESS_DIR:
+        app.state._metrics_sync = asyncio.create_task(sync_metrics())
+
+
+async def release_metrics_sync(app: FastAPI) -> None:
+    task = getattr(app.state, "_metrics_sync", None)
+    if task is None:
+        return
+    task.cancel()
+    try:
+        # The last requests of this worker, before gunicorn retires it
+        write_snapshot(MULTIPROCESS_DIR, str(os.getpid()), snapshot(registry))
+    except Exception as exc:
+        metrics_events_logger.exception(exc)
@@ -0,0 +1,124 @@
+import json
+import os
+from typing import Iterable, Iterator
+from .registry import Gauge, Histogram, Registry
+
+
+# Snapshot the counters and histograms of exited workers are added to, so
+# that the totals keep counting what they did
+RETIRED_WORKERS = "retired"
+
+
+def snapshot_path(directory: str, worker: str) -> str:
+    return os.path.join(directory, "metrics", f"{worker}.json")
+
+
+def snapshot(registry: Registry) -> dict:
+    """
+    The values of every metric, per label values. Taken from the event loop,
+    the only place the values are updated from.
+    """
+    return {
+        name: [
+            [list(label_values), value]
+            for label_values, value in list(metric.values.items())
+        ]
+        for name, metric in registry.metrics.items()
+    }
+
+
+def write_snapshot(directory: str, worker: str, metrics: dict) -> None:
+    path = snapshot_path(directory, worker)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Replaced at once, so a scrape never reads a partly written file
+    with open(f"{path}.tmp", "w") as file:
+        json.dump(metrics, file)
+    os.replace(f"{path}.tmp", path)
+
+
+def read_snapshots(directory: str) -> Iterator[tuple[str, dict]]:
+    """
+    (worker, metrics) of every snapshot written to the directory.
+    """
+    try:
+        filenames = os.listdir(os.path.join(directory, "metrics"))
+    except FileNotFoundError:
+        return
+    for filename in filenames:
+        worker, extension = os.path.splitext(filename)
+        if extension != ".json":
+            continue
+        try:
+            with open(snapshot_path(directory, worker)) as file:
+                yield worker, json.load(file)
+        except FileNotFoundError:
+            # Retired since listed
+            continue
+
+
+def merge_snapshots(registry: Registry, snapshots: Iterable[tuple[str, dict]]) -> Registry:
+    """
+    A registry with the metrics of `registry`, holding the sum of the
+    counters and histograms of every snapshot, and the gauges of every
+    worker labelled with it.
+    """
+    merged = Registry()
+    for metric in registry.metrics.values():
+        if isinstance(metric, Gauge):
+            merged.gauge(metric.name, metric.help, metric.labels + ("worker",))
+        elif isinstance(metric, Histogram):
+            merged.histogram(metric.name, metric.help, metric.labels, buckets=metric.buckets)
+        else:
+            merged.counter(metric.name, metric.help, metric.labels)
+
+    for worker, metrics in snapshots:
+        for name, values in metrics.items():
+            metric = merged.metrics.get(name)
+            # Written by an older version of the app
+            if metric is None:
+                continue
+            for label_values, value in values:
+                label_values = tuple(label_values)
+                if isinstance(metric, Gauge):
+                    metric.set(value, *label_values, worker)
+                elif isinstance(metric, Histogram):
+                    counts, total = value
+                    entry = metric.values.setdefault(
+                        label_values, [[0] * (len(metric.buckets) + 1), 0.0]
+                    )
+                    if len(counts) == len(entry[0]):
+                        entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                        entry[1] += total
+                else:
+                    metric.inc(*label_values, amount=value)
+    return merged
+
+
+def render_all_workers(registry: Registry, directory: str, metrics: dict) -> str:
+    """
+    Writes the snapshot of this worker, then renders the metrics of every
+    worker.
+    """
+    write_snapshot(directory, str(os.getpid()), metrics)
+    return merge_snapshots(registry, read_snapshots(directory)).render()
+
+
+def retire_worker(registry: Registry, directory: str, pid: int) -> None:
+    """
+    Adds the counters and histograms of an exited worker to those of the
+    workers retired before it, and drops its gauges.
+    """
+    try:
+        with open(snapshot_path(directory, str(pid))) as file:
+            metrics = json.load(file)
+    except FileNotFoundError:
+        return
+    retired = dict(read_snapshots(directory)).get(RETIRED_WORKERS, {})
+    merged = merge_snapshots(
+        registry, [(RETIRED_WORKERS, retired), (str(pid), metrics)]
+    )
+    write_snapshot(directory, RETIRED_WORKERS, {
+        name: values for name, values in snapshot(merged).items()
+        if not isinstance(merged.metrics[name], Gauge)
+    })
+    os.remove(snapshot_path(directory, str(pid)))
@@ -0,0 +1,172 @@
+import bisect
+from abc import ABC, abstractmethod
+from collections import Counter as _Counter
+from typing import Iterator, Sequence
+
+
+# Default latency buckets, in seconds
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric(ABC):
+    """
+    A metric and its values per combination of label values. Values are
+    only ever updated from the event loop, so they are plain dict updates
+    without any locking.
+    """
+
+    type = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+
+
+    @abstractmethod
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        """
+        (name suffix, formatted labels, value) of every sample.
+        """
+
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self.values: _Counter = _Counter()
+
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self.values[label_values] += amount
+
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        for label_values, value in list(self.values.items()):
+            yield "", _format_labels(self.labels, label_values), value
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self.values: dict[tuple[str, ...], float] = {}
+
+
+    def set(self, value: float, *label_values: str) -> None:
+        self.values[label_values] = value
+
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        for label_values, value in list(self.values.items()):
+            yield "", _format_labels(self.labels, label_values), value
+
+
+class Histogram(Metric):
+    """
+    Counts observations per bucket. Only the bucket an observation falls in
+    is incremented, buckets are made cumulative when rendered.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: [count per bucket (the last one is +Inf), sum]
+        self.values: dict[tuple[str, ...], list] = {}
+
+
+    def observe(self, value: float, *label_values: str) -> None:
+        entry = self.values.get(label_values)
+        if entry is None:
+            entry = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        bucket_labels = self.labels + ("le",)
+        for label_values, (counts, total) in list(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                yield "_bucket", _format_labels(bucket_labels, label_values + (le,)), cumulative
+            labels = _format_labels(self.labels, label_values)
+            yield "_sum", labels, total
+            yield "_count", labels, cumulative
+
+
+class Registry:
+    """
+    The metrics of a worker, rendered in the Prometheus text format.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"There is already a metric named {metric.name}.")
+        self.metrics[metric.name] = metric
+        return metric
+
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets=buckets))
+
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+
+
+registry = Registry()
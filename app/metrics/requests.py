@@ -0,0 +1,169 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import QUERY_BUDGET, REPEATED_QUERY_THRESHOLD
+from app.core.logging import get_logger
+from .registry import registry
+
+
+requests_logger = get_logger(__name__)
+
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds",
+    "Time to send the full response, per route name.",
+    ("route",)
+)
+REQUESTS = registry.counter(
+    "http_requests_total",
+    "Responses sent, per route name and status code class.",
+    ("route", "status")
+)
+REQUEST_QUERIES = registry.histogram(
+    "http_request_queries",
+    "Database queries run per request, per route name.",
+    ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+REQUEST_DB_TIME = registry.histogram(
+    "http_request_db_duration_seconds",
+    "Time spent waiting for the database per request, per route name.",
+    ("route",)
+)
+
+QUERY_BUDGET_OVERRUNS = registry.counter(
+    "http_request_query_budget_overruns_total",
+    "Requests that ran more queries than the budget of their route.",
+    ("route",)
+)
+REPEATED_QUERIES = registry.counter(
+    "http_request_repeated_queries_total",
+    "Requests that ran the same query REPEATED_QUERY_THRESHOLD times or more "
+    "(likely N+1 queries), per route name and query.",
+    ("route", "query")
+)
+
+# Label of the requests that did not match any API route (e.g. 404s)
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestStats:
+    """
+    Database work done while handling a single request.
+    """
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.db_seconds = 0.0
+        # Times each query (by name) was run
+        self.statements: Counter = Counter()
+
+
+    def record_query(self, name: str, seconds: float) -> None:
+        self.queries += 1
+        self.db_seconds += seconds
+        self.statements[name] += 1
+
+
+    def repeated_statements(self) -> dict[str, int]:
+        return {
+            name: count for name, count in self.statements.items()
+            if count >= REPEATED_QUERY_THRESHOLD
+        }
+
+
+# Stats of the request being handled, None outside of requests (e.g. in jobs)
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_request_stats", default=None
+)
+
+
+def query_budget(max_queries: int) -> Callable:
+    """
+    Declares how many queries a route may run per request, instead of the
+    default QUERY_BUDGET. Goes below the route decorator.
+    """
+    def declare(endpoint: Callable) -> Callable:
+        endpoint.query_budget = max_queries
+        return endpoint
+    return declare
+
+
+# Called with (route name, stats, budget) for every request over the budget
+# its route declared, e.g. by the query budget plugin of the tests
+budget_listeners: list[Callable[[str, RequestStats, int], None]] = []
+
+
+def check_query_budget(scope: Scope, route: str, stats: RequestStats) -> None:
+    """
+    Flags, in the logs and the metrics, requests over their query budget
+    and queries run over and over by a single request.
+    """
+    endpoint = getattr(scope.get("route"), "endpoint", None)
+    declared_budget = getattr(endpoint, "query_budget", None)
+    budget = QUERY_BUDGET if declared_budget is None else declared_budget
+    if stats.queries > budget:
+        QUERY_BUDGET_OVERRUNS.inc(route)
+        requests_logger.warning(
+            f"{route} ran {stats.queries} queries, over its budget of {budget}."
+        )
+
+    for name, count in stats.repeated_statements().items():
+        REPEATED_QUERIES.inc(route, name)
+        requests_logger.warning(
+            f"{route} ran {name} {count} times, likely an N+1 query."
+        )
+
+    if declared_budget is not None and stats.queries > declared_budget:
+        for listener in budget_listeners:
+            listener(route, stats, declared_budget)
+
+
+def route_name(scope: Scope) -> str:
+    """
+    Name of the API route that handled the request, or of the endpoint of
+    a plain route (e.g. the metrics themselves).
+    """
+    if "route" in scope:
+        return scope["route"].name
+    return getattr(scope.get("endpoint"), "__name__", UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    """
+    Records the latency, status and database work of every HTTP request,
+    labelled by the name of the route that handled it.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_request_stats.reset(token)
+            route = route_name(scope)
+            REQUEST_LATENCY.observe(time.perf_counter() - start, route)
+            REQUESTS.inc(route, f"{status_code // 100}xx")
+            REQUEST_QUERIES.observe(stats.queries, route)
+            REQUEST_DB_TIME.observe(stats.db_seconds, route)
+            check_query_budget(scope, route, stats)
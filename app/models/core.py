@@ -1,4 +1,4 @@
-from typing import Annotated
+from typing import Annotated, Any
 from pydantic import BaseModel, Field
 
 
@@ -6,12 +6,20 @@ class CoreModel(BaseModel):
     """
     Any common logic to be shared by all models goes here.
     """
-    pass
+
+    @classmethod
+    def from_model(cls, model: BaseModel, **fields: Any) -> "CoreModel":
+        """
+        Builds the model from the fields of an already validated model, plus
+        any extra `fields`. Validating straight from the field values skips
+        the model_dump() serialization of the usual `Model(**m.model_dump())`.
+        """
+        return cls.model_validate({**model.__dict__, **fields})
 
 
 class DetailResponse(BaseModel):
     detail: str
 
 
-class IDModelMixin(BaseModel):
+class IDModelMixin(CoreModel):
     id: Annotated[int, Field(..., json_schema_extra={'example': 1})]
@@ -1,11 +1,11 @@
 from typing import Annotated, Optional
-from pydantic import Field
+from pydantic import Field, field_validator
 from app.models.core import CoreModel, IDModelMixin
-from app.models.product_details import ProductDetailsOut
+from app.models.product_details import ProductDetailsBase, ProductDetailsOut
 from app.models.tags import TagOut
 from app.models.menu_categories import MenuCategoryOut
 from app.models.store_profiles import StoreProfileOutProductDetailed, StoreProfileOutFilter
-from app.api.enums.products import MaxDistanceOption, SortByOption
+from app.api.enums.products import MaxDistanceOption, SortByOption, ImportRowStatus
 
 
 class ProductBase(CoreModel):
@@ -33,6 +33,26 @@ class ProductCreate(ProductBase):
     store_id: Annotated[int, Field(..., json_schema_extra={'example': 1})]
 
 
+class ProductCreateForm(ProductDetailsBase):
+    name: Annotated[
+        str, Field(..., json_schema_extra={'example': 'Chicken Sandwich'})
+    ]
+    description: Annotated[
+        Optional[str],
+        Field(default=None, json_schema_extra={
+            'example': 'Bread, cheese, lettuce, tomato, and chicken.'
+        })
+    ]
+    price: Annotated[float, Field(..., json_schema_extra={'example': 4.29})]
+    is_public: Annotated[bool, Field(..., json_schema_extra={'example': True})]
+    tag_ids: Annotated[
+        list[int], Field(..., json_schema_extra={'example': [1, 4]})
+    ]
+    menu_category_ids: Annotated[
+        list[int], Field(..., json_schema_extra={'example': [1]})
+    ]
+
+
 class ProductOutCreate(IDModelMixin, ProductBase):
     is_public: Annotated[bool, Field(..., json_schema_extra={'example': True})]
     store_id: Annotated[int, Field(..., json_schema_extra={'example': 1})]
@@ -42,6 +62,18 @@ class ProductOutCreate(IDModelMixin, ProductBase):
 
 
 class ProductInDB(IDModelMixin, ProductBase):
+    thumbnail_url: Annotated[
+        Optional[str],
+        Field(default=None, json_schema_extra={
+            'example': 'https://domain.com/path/image_128px'
+        })
+    ]
+    preview_url: Annotated[
+        Optional[str],
+        Field(default=None, json_schema_extra={
+            'example': 'https://domain.com/path/image_512px'
+        })
+    ]
     view_count: Annotated[int, Field(..., json_schema_extra={'example': 10})]
     has_details: Annotated[bool, Field(..., json_schema_extra={'example': True})]
     is_public: Annotated[bool, Field(..., json_schema_extra={'example': True})]
@@ -49,6 +81,12 @@ class ProductInDB(IDModelMixin, ProductBase):
 
 
 class ProductDetailed(IDModelMixin, ProductBase):
+    preview_url: Annotated[
+        Optional[str],
+        Field(default=None, json_schema_extra={
+            'example': 'https://domain.com/path/image_512px'
+        })
+    ]
     store: StoreProfileOutProductDetailed
     details: ProductDetailsOut
     tags: list[TagOut]
@@ -81,6 +119,12 @@ class Filters(CoreModel):
 
 
 class ProductOutFilter(IDModelMixin, ProductBase):
+    thumbnail_url: Annotated[
+        Optional[str],
+        Field(default=None, json_schema_extra={
+            'example': 'https://domain.com/path/image_128px'
+        })
+    ]
     store: StoreProfileOutFilter
     tags: list[TagOut]
 
@@ -95,9 +139,68 @@ class FilterOut(CoreModel):
 
 
 class ProductOutStore(IDModelMixin, ProductBase):
+    thumbnail_url: Annotated[
+        Optional[str],
+        Field(default=None, json_schema_extra={
+            'example': 'https://domain.com/path/image_128px'
+        })
+    ]
     tags: list[TagOut]
 
 
 class ProductsByMenuCategoryStore(CoreModel):
     menu_category: MenuCategoryOut
     products: list[ProductOutStore]
+
+
+class ProductImportRow(ProductBase, ProductDetailsBase):
+    is_public: Annotated[bool, Field(..., json_schema_extra={'example': True})]
+    tag_ids: Annotated[
+        list[int],
+        Field(..., min_length=1, json_schema_extra={'example': [1, 4]})
+    ]
+    menu_category_ids: Annotated[
+        list[int],
+        Field(..., min_length=1, json_schema_extra={'example': [1]})
+    ]
+    image: Annotated[
+        Optional[str],
+        Field(default=None, json_schema_extra={'example': 'chicken-sandwich.png'})
+    ]
+
+    @field_validator('tag_ids', 'menu_category_ids', mode='before')
+    def split_id_list(cls, ids):
+        # CSV cells hold the ids separated by semicolons, e.g. "1;4"
+        if isinstance(ids, str):
+            return [id.strip() for id in ids.split(';') if id.strip()]
+        return ids
+
+
+class ProductImportResult(CoreModel):
+    row: Annotated[int, Field(..., json_schema_extra={'example': 1})]
+    name: Annotated[
+        Optional[str],
+        Field(default=None, json_schema_extra={'example': 'Chicken Sandwich'})
+    ]
+    status: Annotated[ImportRowStatus, Field(..., json_schema_extra={
+        'example': 'created'
+    })]
+    id: Annotated[
+        Optional[int], Field(default=None, json_schema_extra={'example': 1})
+    ]
+    errors: Annotated[
+        list[str],
+        Field(default=[], json_schema_extra={'example': []})
+    ]
+
+
+class ProductImportOut(CoreModel):
+    created: Annotated[int, Field(..., json_schema_extra={'example': 1})]
+    failed: Annotated[int, Field(..., json_schema_extra={'example': 0})]
+    results: list[ProductImportResult]
+
+
+class ProductBulkDeleteOut(CoreModel):
+    deleted_ids: Annotated[
+        list[int], Field(..., json_schema_extra={'example': [1, 2]})
+    ]
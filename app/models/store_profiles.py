@@ -39,7 +39,18 @@ class StoreProfileCreate(StoreProfileBase):
 
 
 class StoreProfileInDB(IDModelMixin, StoreProfileBase):
-    pass
+    logo_thumbnail_url: Annotated[
+        Optional[str],
+        Field(default=None, json_schema_extra={
+            'example': 'https://domain.com/path/logo_128px'
+        })
+    ]
+    logo_preview_url: Annotated[
+        Optional[str],
+        Field(default=None, json_schema_extra={
+            'example': 'https://domain.com/path/logo_512px'
+        })
+    ]
 
 
 class StoreProfileOut(IDModelMixin, StoreProfileBase):
@@ -78,6 +89,12 @@ class StoreProfileOutFilter(IDModelMixin):
             'example': 'https://domain.com/path/logo.png'
         })
     ]
+    logo_thumbnail_url: Annotated[
+        Optional[str],
+        Field(default=None, json_schema_extra={
+            'example': 'https://domain.com/path/logo_128px'
+        })
+    ]
     distance_km: Annotated[
         float, Field(..., json_schema_extra={'example': 1.23})
     ]
@@ -98,6 +115,12 @@ class StoreProfileOutWithProducts(IDModelMixin):
             'example': 'https://domain.com/path/logo.png'
         })
     ]
+    logo_preview_url: Annotated[
+        Optional[str],
+        Field(default=None, json_schema_extra={
+            'example': 'https://domain.com/path/logo_512px'
+        })
+    ]
     lat: Annotated[float, Field(..., json_schema_extra={'example': 38.011726})]
     lng: Annotated[float, Field(..., json_schema_extra={'example': 23.822457})]
     products_by_menu_categories: list[ProductsByMenuCategoryStore]
@@ -1,4 +1,4 @@
-from typing import Annotated
+from typing import Annotated, Optional
 from datetime import datetime
 from pydantic import Field, EmailStr, field_validator
 from email_validator import validate_email
@@ -52,3 +52,36 @@ class StoreInDB(IDModelMixin, StoreBase):
 
 class StoreOut(IDModelMixin, StoreBase):
     pass
+
+
+class StoreRegistrationForm(CoreModel):
+    email: Annotated[
+        str, Field(..., json_schema_extra={'example': 'admin@mystore.com'})
+    ]
+    password: Annotated[
+        str, Field(..., json_schema_extra={'example': 'mysecretpassword'})
+    ]
+    conf_password: Annotated[
+        str, Field(..., json_schema_extra={'example': 'mysecretpassword'})
+    ]
+    name: Annotated[
+        str, Field(..., json_schema_extra={'example': 'Starbucks'})
+    ]
+    desc: Annotated[
+        Optional[str],
+        Field(default=None, json_schema_extra={
+            'example': 'More than just great coffee.'
+        })
+    ]
+    phone_number: Annotated[
+        Optional[int],
+        Field(default=None, json_schema_extra={'example': 6940946282})
+    ]
+    address: Annotated[
+        str,
+        Field(..., json_schema_extra={
+            'example': 'Agiou Ioannou, Agia Paraskevi 153 42'
+        })
+    ]
+    lat: Annotated[float, Field(..., json_schema_extra={'example': 38.011726})]
+    lng: Annotated[float, Field(..., json_schema_extra={'example': 23.822457})]
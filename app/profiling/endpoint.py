@@ -0,0 +1,30 @@
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from .requests import has_profiling_token, profiles
+
+
+def check_profiling_token(request: Request) -> None:
+    if not has_profiling_token(request.headers):
+        raise HTTPException(status_code=403, detail="Invalid or missing profiling token.")
+
+
+async def list_profiles(request: Request) -> JSONResponse:
+    check_profiling_token(request)
+    return JSONResponse([
+        {key: value for key, value in profile.items() if key != "stacks"}
+        for profile in reversed(await run_in_threadpool(profiles.all))
+    ])
+
+
+async def get_profile(request: Request) -> PlainTextResponse:
+    """
+    The samples of a profile as collapsed stacks, e.g. for flamegraph.pl or
+    speedscope.
+    """
+    check_profiling_token(request)
+    profile = await run_in_threadpool(profiles.get, request.path_params["id"])
+    if profile is None:
+        raise HTTPException(status_code=404, detail="No such profile, or no longer kept.")
+    return PlainTextResponse(profile["stacks"])
@@ -0,0 +1,166 @@
+import hmac
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import (
+    PROFILING_TOKEN,
+    PROFILING_SAMPLE_RATE,
+    PROFILING_INTERVAL,
+    PROFILING_BUFFER_SIZE,
+    PROFILING_PATH,
+    MULTIPROCESS_DIR,
+)
+from app.core.logging import current_log_context
+from app.metrics.requests import route_name
+from .sampler import StackSampler
+
+
+# Header of the requests asking to be profiled, and of the admin endpoint
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+# Header of the profiled responses, with the id their profile is served by
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+def has_profiling_token(headers: Headers) -> bool:
+    token = str(PROFILING_TOKEN)
+    # Without a token, only PROFILING_SAMPLE_RATE decides
+    return bool(token) and hmac.compare_digest(
+        headers.get(PROFILE_TOKEN_HEADER, "").encode(), token.encode()
+    )
+
+
+def saved_profiles_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, "profiles", f"{pid}.json")
+
+
+class ProfileBuffer:
+    """
+    The last profiles taken in this worker process, oldest first. With a
+    directory, they are saved there after every profile, and the profiles of
+    all the workers saving to it are served.
+    """
+
+    def __init__(self, size: int, directory: Optional[str] = None) -> None:
+        self.profiles: deque = deque(maxlen=size)
+        self.directory = directory or None
+        self._ids = itertools.count(1)
+
+
+    def next_id(self) -> str:
+        # Unique across the workers, which all serve the profiles
+        return f"{os.getpid()}-{next(self._ids)}"
+
+
+    def add(self, profile: dict) -> None:
+        self.profiles.append(profile)
+
+
+    def save(self, profiles: list[dict]) -> None:
+        path = saved_profiles_path(self.directory, os.getpid())
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(profiles, file)
+        os.replace(f"{path}.tmp", path)
+
+
+    def all(self) -> list[dict]:
+        """
+        The profiles of every worker, oldest first. Reads the directory,
+        if any, so it is better run in a thread.
+        """
+        if self.directory is None:
+            return list(self.profiles)
+        saved = []
+        directory = os.path.join(self.directory, "profiles")
+        try:
+            filenames = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        for filename in filenames:
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(directory, filename)) as file:
+                    saved.extend(json.load(file))
+            except FileNotFoundError:
+                # The worker exited since listed
+                continue
+        return sorted(saved, key=lambda profile: profile["started_at"])
+
+
+    def get(self, id: str) -> Optional[dict]:
+        return next((profile for profile in self.all() if profile["id"] == id), None)
+
+
+profiles = ProfileBuffer(PROFILING_BUFFER_SIZE, MULTIPROCESS_DIR)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles the requests sent with the profiling token, and
+    PROFILING_SAMPLE_RATE of the others, one at a time: a request arriving
+    while another one is profiled is not.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.profiling = False
+
+
+    def should_profile(self, scope: Scope) -> bool:
+        if self.profiling or scope["path"].startswith(PROFILING_PATH):
+            return False
+        return has_profiling_token(Headers(scope=scope)) or random.random() < PROFILING_SAMPLE_RATE
+
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self.profiling = True
+        profile_id = profiles.next_id()
+        status_code = 500
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)[PROFILE_ID_HEADER] = str(profile_id)
+            await send(message)
+
+        # The frame of this call is on the stack whenever the request runs
+        sampler = StackSampler(sys._getframe(), PROFILING_INTERVAL)
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            self.profiling = False
+            context = current_log_context.get()
+            profiles.add({
+                "id": profile_id,
+                "worker": os.getpid(),
+                "request_id": context.request_id if context else None,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route_name(scope),
+                "status": status_code,
+                "started_at": started_at.isoformat(),
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                "samples": sampler.samples,
+                "stacks": sampler.collapsed(),
+            })
+            if profiles.directory is not None:
+                await run_in_threadpool(profiles.save, list(profiles.profiles))
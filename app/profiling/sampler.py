@@ -0,0 +1,89 @@
+import os
+import sys
+import threading
+from collections import Counter
+from functools import lru_cache
+from types import FrameType
+from typing import Optional
+
+
+# Pseudo frame the samples taken while the request was awaiting something
+# (the database, Redis, or other requests running on the event loop) end in
+WAITING_FRAME = "(waiting)"
+
+
+@lru_cache(maxsize=4096)
+def short_filename(filename: str) -> str:
+    """
+    The path relative to its import root, e.g. fastapi/routing.py rather
+    than the full site-packages one.
+    """
+    # An empty entry stands for the working directory
+    prefixes = [prefix or os.getcwd() for prefix in sys.path]
+    for prefix in sorted(prefixes, key=len, reverse=True):
+        if filename.startswith(prefix + os.sep):
+            return filename[len(prefix) + 1:]
+    return filename
+
+
+def frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({short_filename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Samples, from a background thread, the stack of the thread running the
+    event loop, and counts the samples per stack below the root frame (that
+    of the request being profiled). Samples in which the root frame is not
+    on the stack are counted as waiting.
+
+    The stack of the event loop thread can only be read when it releases the
+    GIL, every sys.getswitchinterval() seconds while it is busy, so sampling
+    more often than that adds overhead but no detail.
+    """
+
+    def __init__(self, root: FrameType, interval: float) -> None:
+        self.root = root
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+
+    def start(self) -> None:
+        self._thread.start()
+
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+
+    def sample(self) -> None:
+        frame: Optional[FrameType] = sys._current_frames().get(self.thread_id)
+        labels = []
+        while frame is not None and frame is not self.root:
+            labels.append(frame_label(frame))
+            frame = frame.f_back
+        self.samples += 1
+        if frame is None:
+            self.stacks[WAITING_FRAME] += 1
+        else:
+            labels.append(frame_label(self.root))
+            self.stacks[";".join(reversed(labels))] += 1
+
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+
+    def collapsed(self) -> str:
+        """
+        The samples in the collapsed stack format ("frame;frame;frame count"
+        per line) read by flamegraph.pl, speedscope and most flame graph tools.
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
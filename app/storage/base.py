@@ -0,0 +1,64 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, NamedTuple, Optional
+
+
+class StoredObject(NamedTuple):
+    key: str
+    # Unix time of the last write
+    modified: float
+
+
+class Storage(ABC):
+    """
+    Object storage for uploaded images. Keys are paths relative to the
+    storage root, e.g. `products/Chicken Sandwich`.
+    """
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes, *, content_type: str) -> None:
+        """
+        Stores `data` publicly under `key`, replacing any existing object.
+        """
+
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """
+        Removes the object stored under `key`, if any.
+        """
+
+
+    async def delete_many(self, keys: list[str]) -> None:
+        """
+        Removes the objects stored under `keys`, if any.
+        """
+        await asyncio.gather(*[self.delete(key) for key in keys])
+
+
+    @abstractmethod
+    def list_objects(
+        self, folder: str, *, page_size: int
+    ) -> AsyncIterator[list[StoredObject]]:
+        """
+        Objects stored in `folder`, in pages of at most `page_size`.
+        """
+
+
+    @abstractmethod
+    def url_for(self, key: str) -> str:
+        """
+        Public URL the object stored under `key` is served from.
+        """
+
+
+    @abstractmethod
+    def key_for(self, url: str) -> Optional[str]:
+        """
+        Key of the object served from `url`, None when it is not served
+        from this storage.
+        """
+
+
+    async def close(self) -> None:
+        pass
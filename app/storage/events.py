@@ -0,0 +1,45 @@
+import boto3
+from botocore.config import Config
+from fastapi import FastAPI
+from app.core.config import (
+    DO_ACCESS_KEY,
+    DO_SECRET_KEY,
+    DO_SPACE_BUCKET_URL,
+    S3_MAX_CONNECTIONS,
+    STORAGE_BACKEND,
+    LOCAL_STORAGE_ROOT,
+    LOCAL_STORAGE_URL,
+)
+from app.core.logging import get_logger
+from .base import Storage
+from .local import LocalStorage
+from .s3 import S3Storage
+
+
+storage_events_logger = get_logger(__name__)
+
+
+def create_storage() -> Storage:
+    if STORAGE_BACKEND == "local":
+        return LocalStorage(LOCAL_STORAGE_ROOT, base_url=LOCAL_STORAGE_URL)
+
+    client = boto3.client(
+        's3',
+        region_name='fra1',
+        endpoint_url=DO_SPACE_BUCKET_URL,
+        aws_access_key_id=DO_ACCESS_KEY,
+        aws_secret_access_key=str(DO_SECRET_KEY),
+        config=Config(max_pool_connections=S3_MAX_CONNECTIONS)
+    )
+    return S3Storage(client, base_url=DO_SPACE_BUCKET_URL)
+
+
+async def establish_storage(app: FastAPI) -> None:
+    app.state._storage = create_storage()
+
+
+async def release_storage(app: FastAPI) -> None:
+    try:
+        await app.state._storage.close()
+    except Exception as exc:
+        storage_events_logger.exception(exc)
@@ -0,0 +1,107 @@
+import os
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+from .base import Storage, StoredObject
+from .sniffing import SNIFF_SIZE, sniff_image_type
+
+
+# Prefix of the files being written, which are not objects yet
+TMP_PREFIX = ".upload-"
+
+
+class LocalStorage(Storage):
+    """
+    Stores objects as files under `root`, for development and tests. The
+    files are served by the app itself under `base_url` (see
+    LocalStorageFiles).
+    """
+
+    def __init__(self, root: str, *, base_url: str) -> None:
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.base_url = base_url
+
+
+    def path_for(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root):
+            raise ValueError(f"The key {key} points outside of the storage root.")
+        return path
+
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written next to the final path and renamed over it, so a file
+        # being served is never seen half written
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=TMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+    async def put(self, key: str, data: bytes, *, content_type: str) -> None:
+        await run_in_threadpool(self._write, key, data)
+
+
+    async def delete(self, key: str) -> None:
+        await run_in_threadpool(self.path_for(key).unlink, missing_ok=True)
+
+
+    def _list(self, folder: str) -> list[StoredObject]:
+        try:
+            entries = list(os.scandir(self.path_for(folder)))
+        except FileNotFoundError:
+            return []
+        return sorted(
+            StoredObject(f"{folder}/{entry.name}", entry.stat().st_mtime)
+            for entry in entries
+            if entry.is_file() and not entry.name.startswith(TMP_PREFIX)
+        )
+
+
+    async def list_objects(
+        self, folder: str, *, page_size: int
+    ) -> AsyncIterator[list[StoredObject]]:
+        objects = await run_in_threadpool(self._list, folder)
+        for i in range(0, len(objects), page_size):
+            yield objects[i:i + page_size]
+
+
+    def url_for(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+    def key_for(self, url: str) -> Optional[str]:
+        key = url.removeprefix(f"{self.base_url}/")
+        return key if key != url else None
+
+
+class LocalStorageFiles(StaticFiles):
+    """
+    Serves the files of a LocalStorage with FileResponse. Keys have no file
+    extension, so the content type is sniffed from the file instead.
+    """
+
+    def file_response(
+        self,
+        full_path: "PathLike",
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        with open(full_path, "rb") as file:
+            content_type = sniff_image_type(file.read(SNIFF_SIZE))
+        if content_type is not None:
+            response.headers["Content-Type"] = content_type
+        return response
@@ -0,0 +1,85 @@
+import io
+from typing import AsyncIterator, Optional
+from mypy_boto3_s3.client import S3Client
+from starlette.concurrency import run_in_threadpool
+from .base import Storage, StoredObject
+
+
+# Most keys a single DeleteObjects request accepts
+DELETE_BATCH_SIZE = 1000
+
+
+class S3Storage(Storage):
+    """
+    S3-compatible storage (DigitalOcean Spaces). The client's endpoint is
+    the space itself, so the first segment of a key is passed as the
+    bucket and addresses a folder of the space.
+    """
+
+    def __init__(self, client: S3Client, *, base_url: str) -> None:
+        self.client = client
+        self.base_url = base_url
+
+
+    async def put(self, key: str, data: bytes, *, content_type: str) -> None:
+        folder, _, name = key.partition("/")
+        await run_in_threadpool(
+            self.client.upload_fileobj,
+            io.BytesIO(data),
+            folder,
+            name,
+            ExtraArgs={"ACL": "public-read", "ContentType": content_type}
+        )
+
+
+    async def delete(self, key: str) -> None:
+        folder, _, name = key.partition("/")
+        await run_in_threadpool(self.client.delete_object, Bucket=folder, Key=name)
+
+
+    async def delete_many(self, keys: list[str]) -> None:
+        names_by_folder: dict[str, list[str]] = {}
+        for key in keys:
+            folder, _, name = key.partition("/")
+            names_by_folder.setdefault(folder, []).append(name)
+
+        for folder, names in names_by_folder.items():
+            for i in range(0, len(names), DELETE_BATCH_SIZE):
+                await run_in_threadpool(
+                    self.client.delete_objects,
+                    Bucket=folder,
+                    Delete={
+                        "Objects": [
+                            {"Key": name} for name in names[i:i + DELETE_BATCH_SIZE]
+                        ],
+                        "Quiet": True,
+                    }
+                )
+
+
+    async def list_objects(
+        self, folder: str, *, page_size: int
+    ) -> AsyncIterator[list[StoredObject]]:
+        params = {"Bucket": folder, "MaxKeys": page_size}
+        while True:
+            page = await run_in_threadpool(self.client.list_objects_v2, **params)
+            yield [
+                StoredObject(f"{folder}/{obj['Key']}", obj["LastModified"].timestamp())
+                for obj in page.get("Contents", [])
+            ]
+            if not page.get("IsTruncated"):
+                return
+            params["ContinuationToken"] = page["NextContinuationToken"]
+
+
+    def url_for(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+    def key_for(self, url: str) -> Optional[str]:
+        key = url.removeprefix(f"{self.base_url}/")
+        return key if key != url else None
+
+
+    async def close(self) -> None:
+        self.client.close()
@@ -0,0 +1,26 @@
+from typing import Optional
+
+
+# Leading bytes of the image formats accepted for upload
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+# Bytes needed to recognise any of the formats above, and WebP
+SNIFF_SIZE = 12
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """
+    Content type of an image from its first SNIFF_SIZE bytes, or None
+    when they match none of the supported formats.
+    """
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, content_type in _SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return None
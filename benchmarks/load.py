@@ -0,0 +1,298 @@
+"""
+Load benchmark of the core read endpoints: nearby product filtering, store
+menus and product details, each driven by concurrent clients through the
+ASGI app (in process, against the configured database and Redis, seeded
+with benchmarks.seed). Reports p50/p95/p99 latency, requests per second and
+database queries per request, and saves them as JSON to compare later runs
+against.
+
+Usage: python -m benchmarks.load [--requests 2000] [--concurrency 32]
+       [--scenarios filter store-menu product-detail] [--seed 42]
+       [--output results.json] [--compare baseline.json] [--tolerance 0.1]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import subprocess
+import sys
+import time
+from functools import partial
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from asgi_lifespan import LifespanManager
+from fastapi import FastAPI
+from httpx import AsyncClient
+from app.api.main import get_application
+from app.api.access_log import access_logger
+from app.api.enums.products import MaxDistanceOption, SortByOption, SortOrderOption
+from app.metrics.requests import REQUEST_QUERIES
+from benchmarks.seed import TAG_WEIGHTS, MENU_CATEGORY_WEIGHTS, KM_PER_DEGREE, weighted_sample
+
+
+# How many stores and products the requests are drawn from
+TARGET_SAMPLE_SIZE = 5000
+
+STORE_TARGETS_QUERY = """
+    SELECT store_id, lat, lng
+    FROM store_profiles
+    ORDER BY random()
+    LIMIT :limit;
+"""
+
+PRODUCT_TARGETS_QUERY = """
+    SELECT id
+    FROM products
+    WHERE is_public = TRUE AND deleted_at IS NULL
+    ORDER BY random()
+    LIMIT :limit;
+"""
+
+DATASET_SIZE_QUERY = """
+    SELECT
+        (SELECT COUNT(*) FROM stores) AS stores,
+        (SELECT COUNT(*) FROM products WHERE deleted_at IS NULL) AS products;
+"""
+
+# Latency and rate metrics compared against a baseline, and whether higher is better
+COMPARED_METRICS = {"p50_ms": False, "p95_ms": False, "p99_ms": False, "rps": True}
+
+Request = tuple[str, str, dict]
+
+
+class Targets:
+    """
+    Stores and products the requests of a run are drawn from.
+    """
+
+    def __init__(self, stores: list, product_ids: list[int], rng: random.Random) -> None:
+        if not stores or not product_ids:
+            sys.exit("The database has no stores or products, seed it with benchmarks.seed first.")
+        self.stores = stores
+        self.product_ids = product_ids
+        self.rng = rng
+
+
+    def filter_request(self, app: FastAPI) -> Request:
+        """
+        A customer a short walk away from one of the stores.
+        """
+        store = self.rng.choice(self.stores)
+        jitter = 1 / KM_PER_DEGREE
+        min_price = self.rng.choice([0, 0, 2, 4])
+        route = "filter-products-from-nearby-stores"
+        return route, app.url_path_for(route), {
+            "lat": store["lat"] + self.rng.uniform(-jitter, jitter),
+            "lng": store["lng"] + self.rng.uniform(-jitter, jitter),
+            "max_dist": self.rng.choice(list(MaxDistanceOption)).value,
+            "min_price": min_price,
+            "max_price": min_price + self.rng.choice([5, 10, 20, 50]),
+            "tag_ids": weighted_sample(self.rng, TAG_WEIGHTS, self.rng.choice([1, 1, 2])),
+            "menu_category_ids": weighted_sample(
+                self.rng, MENU_CATEGORY_WEIGHTS, self.rng.choice([1, 2])
+            ),
+            "sort_by": self.rng.choice(list(SortByOption)).value,
+            "sort_order": self.rng.choice(list(SortOrderOption)).value,
+        }
+
+
+    def store_menu_request(self, app: FastAPI) -> Request:
+        route = "get-store-by-id"
+        store = self.rng.choice(self.stores)
+        return route, app.url_path_for(route, id=store["store_id"]), {}
+
+
+    def product_detail_request(self, app: FastAPI) -> Request:
+        route = "get-product-by-id"
+        return route, app.url_path_for(route, id=self.rng.choice(self.product_ids)), {}
+
+
+SCENARIOS = {
+    "filter": Targets.filter_request,
+    "store-menu": Targets.store_menu_request,
+    "product-detail": Targets.product_detail_request,
+}
+
+
+def percentile(latencies: list[float], percent: int) -> float:
+    # Nothing to rank when (almost) every request failed
+    if len(latencies) < 2:
+        return float("nan")
+    return statistics.quantiles(latencies, n=100, method="inclusive")[percent - 1]
+
+
+def queries_observed(route: str) -> tuple[int, float]:
+    """
+    Requests and queries the metrics recorded for a route so far.
+    """
+    counts, total = REQUEST_QUERIES.values.get((route,), [[0], 0.0])
+    return sum(counts), total
+
+
+async def run_scenario(
+    client: AsyncClient,
+    make_request: Callable[[], Request],
+    count: int,
+    concurrency: int
+) -> dict:
+    route = make_request()[0]
+    latencies, errors = [], 0
+    remaining = iter(range(count))
+    requests_before, queries_before = queries_observed(route)
+
+    async def client_loop() -> None:
+        nonlocal errors
+        for _ in remaining:
+            _, path, params = make_request()
+            start = time.perf_counter()
+            res = await client.get(path, params=params)
+            # Failed requests are often fast ones, they would flatter the latency
+            if res.status_code >= 400:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client_loop() for _ in range(concurrency)])
+    seconds = time.perf_counter() - start
+
+    requests_after, queries_after = queries_observed(route)
+    requests_seen = requests_after - requests_before
+    return {
+        "requests": count,
+        "errors": errors,
+        # Successful requests only
+        "rps": round((count - errors) / seconds, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        # None with the metrics turned off
+        "queries_per_request": round(
+            (queries_after - queries_before) / requests_seen, 2
+        ) if requests_seen else None,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    app = get_application()
+    async with LifespanManager(app):
+        db = app.state._conn_pool
+        rng = random.Random(args.seed)
+        targets = Targets(
+            stores=await db.fetch_all(STORE_TARGETS_QUERY, {"limit": TARGET_SAMPLE_SIZE}),
+            product_ids=[
+                record["id"] for record in
+                await db.fetch_all(PRODUCT_TARGETS_QUERY, {"limit": TARGET_SAMPLE_SIZE})
+            ],
+            rng=rng,
+        )
+        dataset = dict(await db.fetch_one(DATASET_SIZE_QUERY))
+
+        results = {}
+        async with AsyncClient(app=app, base_url="http://load-test") as client:
+            for name in args.scenarios:
+                make_request = partial(SCENARIOS[name], targets, app)
+                # Warms up the connection pools and caches
+                await run_scenario(client, make_request, args.concurrency, args.concurrency)
+                results[name] = await run_scenario(
+                    client, make_request, args.requests, args.concurrency
+                )
+                print_result(name, results[name])
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "dataset": dataset,
+        "concurrency": args.concurrency,
+        "scenarios": results,
+    }
+
+
+def print_result(name: str, result: dict) -> None:
+    queries = result["queries_per_request"]
+    print(
+        f"{name:<16}{result['requests']:>9}{result['errors']:>8}{result['rps']:>10.1f}"
+        f"{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+        f"{'-' if queries is None else f'{queries:.2f}':>10}"
+    )
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """
+    Prints the change of every metric against the baseline. False if any
+    got worse by more than the tolerance, or if more requests failed.
+    """
+    passed = True
+    print(f"\nagainst {baseline.get('commit') or 'baseline'} ({baseline['created_at']})")
+    for name, result in results["scenarios"].items():
+        if name not in baseline["scenarios"]:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            before, after = baseline["scenarios"][name][metric], result[metric]
+            change = (after - before) / before if before else 0
+            regressed = -change > tolerance if higher_is_better else change > tolerance
+            passed = passed and not regressed
+            print(
+                f"{name:<16}{metric:<8}{before:>10.1f}{after:>10.1f}{change:>+9.1%}"
+                f"{'  REGRESSED' if regressed else ''}"
+            )
+        before, after = baseline["scenarios"][name]["errors"], result["errors"]
+        regressed = after > before
+        passed = passed and not regressed
+        print(
+            f"{name:<16}{'errors':<8}{before:>10}{after:>10}"
+            f"{'  REGRESSED' if regressed else ''}"
+        )
+    return passed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="file to save the results to, as JSON")
+    parser.add_argument("--compare", help="results of an earlier run to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.1,
+        help="largest relative regression allowed against --compare"
+    )
+    args = parser.parse_args()
+
+    # One access log line per request would drown the report
+    access_logger.setLevel(logging.WARNING)
+
+    print(
+        f"{'scenario':<16}{'requests':>9}{'errors':>8}{'rps':>10}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>10}"
+    )
+    results = asyncio.run(run(args))
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Cost of recording metrics: nanoseconds per counter increment and histogram
+observation, and the overhead the InstrumentedDatabase adds to a query
+(against a database stub that returns right away).
+
+Usage: python -m benchmarks.metrics [--count 1000000]
+"""
+import argparse
+import asyncio
+import time
+from app.metrics.registry import Registry
+from app.db.instrumentation import InstrumentedDatabase
+
+
+class StubDatabase:
+    async def fetch_all(self, query: str, values: dict = None) -> list:
+        return []
+
+
+def per_call(seconds: float, count: int) -> str:
+    return f"{seconds / count * 1e9:>8.0f}ns"
+
+
+async def time_queries(database: object, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        await database.fetch_all("SELECT 1;")
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    registry = Registry()
+    counter = registry.counter("benchmark_total", "Benchmark.", ("route",))
+    histogram = registry.histogram("benchmark_seconds", "Benchmark.", ("route",))
+
+    start = time.perf_counter()
+    for _ in range(args.count):
+        counter.inc("get-all-tags")
+    print(f"{'Counter.inc':<32}{per_call(time.perf_counter() - start, args.count)}")
+
+    start = time.perf_counter()
+    for i in range(args.count):
+        histogram.observe(i % 1000 / 1000, "get-all-tags")
+    print(f"{'Histogram.observe':<32}{per_call(time.perf_counter() - start, args.count)}")
+
+    queries = args.count // 10
+    plain = asyncio.run(time_queries(StubDatabase(), queries))
+    instrumented = asyncio.run(time_queries(InstrumentedDatabase(StubDatabase()), queries))
+    print(f"{'InstrumentedDatabase overhead':<32}{per_call(instrumented - plain, queries)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Per-row cost of the model conversions done while building API responses.
+
+Compares, per case, the model_dump() round trip the routes used to do,
+CoreModel.from_model (validation straight from the field values), and
+model_construct (no validation), plus deepcopy versus a shallow copy of a
+product dict.
+
+Usage: python -m benchmarks.models [--rows 10000] [--repeat 5]
+"""
+import argparse
+import copy
+import timeit
+from app.models.store_profiles import (
+    StoreProfileInDB, StoreProfileOutFilter, StoreProfileOutProductDetailed
+)
+from app.models.products import ProductInDB, ProductOutFilter
+from app.models.tags import TagInDB, TagOut
+
+
+PRODUCT_ROW = {
+    "id": 1, "name": "Chicken Sandwich",
+    "description": "Bread, cheese, lettuce, tomato, and chicken.",
+    "image_url": "https://domain.com/products/chicken-sandwich",
+    "price": 4.29, "view_count": 10, "has_details": True, "is_public": True,
+    "store_id": 1,
+}
+
+STORE_PROFILE_ROW = {
+    "id": 1, "name": "Starbucks", "description": "More than just great coffee.",
+    "logo_url": "https://domain.com/store_profiles/starbucks",
+    "phone_number": 6940946282, "address": "Agiou Ioannou, Agia Paraskevi 153 42",
+    "lat": 38.011726, "lng": 23.822457, "store_id": 1,
+}
+
+STORE_PROFILE_FILTER_ROW = {
+    "id": 1, "name": "Starbucks",
+    "logo_url": "https://domain.com/store_profiles/starbucks", "distance_km": 1.23,
+}
+
+TAG_ROW = {"id": 1, "label": "High Protein", "description": None}
+
+product = ProductInDB(**PRODUCT_ROW)
+store_profile = StoreProfileInDB(**STORE_PROFILE_ROW)
+store_profile_filter = StoreProfileOutFilter(**STORE_PROFILE_FILTER_ROW)
+tag = TagInDB(**TAG_ROW)
+product_dict = {
+    **product.__dict__,
+    "store": store_profile_filter,
+    "tags": [TagOut.from_model(tag)],
+}
+
+
+def construct(cls, model, **fields):
+    values = model.__dict__
+    return cls.model_construct(**{
+        **{name: values[name] for name in cls.model_fields if name in values},
+        **fields
+    })
+
+
+CASES = {
+    "StoreProfileInDB -> StoreProfileOutProductDetailed": (
+        lambda: StoreProfileOutProductDetailed(**store_profile.model_dump()),
+        lambda: StoreProfileOutProductDetailed.from_model(store_profile),
+        lambda: construct(StoreProfileOutProductDetailed, store_profile),
+    ),
+    "ProductInDB -> ProductOutFilter": (
+        lambda: ProductOutFilter(
+            **product.model_dump(),
+            store=store_profile_filter,
+            tags=[TagOut(**tag.model_dump())],
+        ),
+        lambda: ProductOutFilter.from_model(
+            product,
+            store=store_profile_filter,
+            tags=[TagOut.from_model(tag)],
+        ),
+        lambda: construct(
+            ProductOutFilter,
+            product,
+            store=store_profile_filter,
+            tags=[construct(TagOut, tag)],
+        ),
+    ),
+}
+
+COPY_CASES = {
+    "copy.deepcopy(product)": lambda: copy.deepcopy(product_dict),
+    "{**product, ...}": lambda: {**product_dict, "menu_category": None},
+}
+
+
+def per_row_us(fn, rows: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=rows, repeat=repeat)) / rows * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<52}{'dump':>12}{'from_model':>12}{'construct':>12}")
+    for name, fns in CASES.items():
+        timings = [per_row_us(fn, args.rows, args.repeat) for fn in fns]
+        print(f"{name:<52}" + "".join(f"{t:>10.2f}us" for t in timings))
+
+    print()
+    for name, fn in COPY_CASES.items():
+        print(f"{name:<52}{per_row_us(fn, args.rows, args.repeat):>10.2f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+Query plan regression check: runs EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)
+for every *_QUERY constant of the repositories against a seeded database
+(see benchmarks.seed), fingerprints each plan (node types, relations,
+indexes, estimated versus actual rows) and compares the fingerprints with
+those of an earlier run. A new Seq Scan on one of the big tables, or an
+index no longer used, is a regression.
+
+Statements that write are explained inside a transaction that is rolled
+back. Inserts are only planned, not run, as their sample values could
+clash with existing rows (their plans have no index to pick anyway).
+
+Usage: python -m benchmarks.plans [--output plans.json]
+       [--compare baseline.json] [--queries NAME ...]
+"""
+import argparse
+import asyncio
+import hashlib
+import importlib
+import json
+import pkgutil
+import re
+import sys
+from typing import Iterator, Optional
+from databases import Database
+from databases.core import Connection
+import app.db.repositories as repositories
+from app.core.config import DATABASE_URL
+
+
+# Tables a Seq Scan on is a regression, as they grow with the stores
+WATCHED_TABLES = {
+    "products", "product_tags", "product_menu_categories",
+    "product_details", "store_profiles", "stores",
+}
+# Estimated rows this many times off the actual rows (either way) are flagged
+MISESTIMATE_RATIO = 10
+
+EXPLAIN_ANALYZE = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+EXPLAIN = "EXPLAIN (FORMAT JSON) "
+
+SAMPLE_STORE_QUERY = """
+    SELECT sp.store_id, sp.name, sp.lat, sp.lng, s.email
+    FROM store_profiles AS sp
+        INNER JOIN stores AS s ON s.id = sp.store_id
+    ORDER BY (
+        SELECT COUNT(*) FROM products AS p WHERE p.store_id = sp.store_id
+    ) DESC, sp.store_id
+    LIMIT 1;
+"""
+
+SAMPLE_PRODUCT_QUERY = """
+    SELECT id, name
+    FROM products
+    WHERE store_id = :store_id AND deleted_at IS NULL
+    ORDER BY id
+    LIMIT 1;
+"""
+
+SAMPLE_USER_QUERY = "SELECT id, email FROM users ORDER BY id LIMIT 1;"
+
+# Repository module of the queries whose :id, :name and :email are those of
+# the sample product, store, user, or the first tag and menu category
+SAMPLE_OF_MODULE = {
+    "products": "product",
+    "product_details": "product",
+    "product_tags": "product",
+    "product_menu_categories": "product",
+    "store_profiles": "store",
+    "stores": "store",
+    "users": "user",
+    "tags": "tag",
+    "menu_categories": "menu_category",
+}
+
+# Values of the queries inserting many rows at once, which take arrays where
+# the queries inserting one row take a single value
+QUERY_VALUES = {
+    "CREATE_PRODUCTS_QUERY": {"has_details": [False], "is_public": [True]},
+    "CREATE_MANY_PRODUCT_DETAILS_QUERY": {
+        nutrient: [None] for nutrient in (
+            "calories", "protein", "carbs", "fiber", "sugars", "fat", "saturated_fat"
+        )
+    },
+}
+
+
+def repository_queries() -> dict[str, tuple[str, str]]:
+    """
+    Every *_QUERY constant of the repositories, by name, with the name of
+    its module.
+    """
+    # Imported first, the products models need its models to be defined
+    importlib.import_module("app.db.repositories.store_profiles")
+    queries = {}
+    for module_info in pkgutil.iter_modules(repositories.__path__):
+        module = importlib.import_module(f"{repositories.__name__}.{module_info.name}")
+        for name, value in vars(module).items():
+            if name.endswith("_QUERY") and isinstance(value, str):
+                queries[name] = (module_info.name, value)
+    return queries
+
+
+async def sample_values(db: Database) -> dict:
+    """
+    Bind values for the queries, taken from the store with the most
+    products, so that the plans are those of the worst case.
+    """
+    store = await db.fetch_one(SAMPLE_STORE_QUERY)
+    if store is None:
+        sys.exit("The database has no stores, seed it with benchmarks.seed first.")
+    product = await db.fetch_one(SAMPLE_PRODUCT_QUERY, {"store_id": store["store_id"]})
+    user = await db.fetch_one(SAMPLE_USER_QUERY)
+    nearby_store_ids = [
+        record["store_id"] for record in await db.fetch_all(
+            repository_queries()["GET_NEARBY_STORE_IDS_QUERY"][1],
+            {"lat": store["lat"], "lng": store["lng"], "max_dist": 3}
+        )
+    ]
+
+    return {
+        "samples": {
+            "product": (product["id"], product["name"], None),
+            "store": (store["store_id"], store["name"], store["email"]),
+            "user": (user["id"], None, user["email"]) if user else (1, None, "nobody@gmail.com"),
+            "tag": (1, None, None),
+            "menu_category": (1, None, None),
+        },
+        "product_id": product["id"],
+        "store_id": store["store_id"],
+        "lat": store["lat"],
+        "lng": store["lng"],
+        "max_dist": 3,
+        "store_ids": nearby_store_ids,
+        "tag_id": 4,
+        "tag_ids": [4],
+        "tag_count": 1,
+        "menu_category_id": 1,
+        "menu_category_ids": [1, 2],
+        "min_price": 0,
+        "max_price": 20,
+        "ids": [product["id"]],
+        "names": [product["name"]],
+        "urls": ["https://plans.invalid/products/missing"],
+        "deleted_for": 24 * 60 * 60,
+        "limit": 500,
+        # Only planned, see the module docstring
+        "product_ids": [product["id"]],
+        "descriptions": [None],
+        "image_urls": [None],
+        "prices": [1.0],
+        "has_details": False,
+        "is_public": True,
+        "price": 1.0,
+        "password": "plan check",
+        "address": "plan check",
+        "phone_number": "2100000000",
+    }
+
+
+def query_values(name: str, module: str, sql: str, sample: dict) -> dict:
+    """
+    Values for the parameters of a query, by name.
+    """
+    id, sample_name, email = sample["samples"][SAMPLE_OF_MODULE[module]]
+    values = {}
+    for parameter in set(re.findall(r"(?<!:):(\w+)", sql)):
+        if parameter == "id":
+            values[parameter] = id
+        elif parameter == "name":
+            values[parameter] = sample_name or "plan check"
+        elif parameter == "email":
+            values[parameter] = email
+        else:
+            # Nullable columns the sample has no value for are left NULL
+            values[parameter] = sample.get(parameter)
+    return values | QUERY_VALUES.get(name, {})
+
+
+def plan_nodes(node: dict, depth: int = 0) -> Iterator[tuple[int, dict]]:
+    yield depth, node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child, depth + 1)
+
+
+def fingerprint(explained: dict) -> dict:
+    """
+    What a plan does, without the numbers that change from run to run:
+    its nodes, the tables read with a Seq Scan, the indexes used, and the
+    nodes whose row estimate is far off.
+    """
+    shape, seq_scans, indexes, misestimates = [], set(), set(), []
+    for depth, node in plan_nodes(explained["Plan"]):
+        line = node["Node Type"]
+        if "Relation Name" in node:
+            line += f" on {node['Relation Name']}"
+        if "Index Name" in node:
+            line += f" using {node['Index Name']}"
+            indexes.add(node["Index Name"])
+        if node["Node Type"] == "Seq Scan":
+            seq_scans.add(node["Relation Name"])
+        shape.append("  " * depth + line)
+
+        if "Actual Rows" in node:
+            actual = node["Actual Rows"] * node.get("Actual Loops", 1)
+            estimated = node["Plan Rows"] * node.get("Actual Loops", 1)
+            if max(actual, estimated) >= MISESTIMATE_RATIO * max(min(actual, estimated), 1):
+                misestimates.append(f"{line}: estimated {estimated}, actual {actual}")
+
+    root = explained["Plan"]
+    return {
+        "hash": hashlib.sha1("\n".join(shape).encode()).hexdigest()[:12],
+        "shape": shape,
+        "seq_scans": sorted(seq_scans),
+        "indexes": sorted(indexes),
+        "misestimates": misestimates,
+        "estimated_rows": root["Plan Rows"],
+        "actual_rows": root.get("Actual Rows"),
+        "execution_ms": explained.get("Execution Time"),
+        "shared_blocks_hit": root.get("Shared Hit Blocks"),
+        "shared_blocks_read": root.get("Shared Read Blocks"),
+    }
+
+
+async def explain(connection: Connection, sql: str, values: dict) -> dict:
+    analyze = not sql.lstrip().upper().startswith("INSERT")
+    transaction = connection.transaction()
+    await transaction.start()
+    try:
+        record = await connection.fetch_one(
+            (EXPLAIN_ANALYZE if analyze else EXPLAIN) + sql.strip(), values
+        )
+    finally:
+        # Undoes whatever the statement wrote
+        await transaction.rollback()
+    plan = record[0]
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]
+
+
+def regressions(plan: dict, baseline: Optional[dict]) -> list[str]:
+    if baseline is None:
+        return []
+    found = []
+    for table in sorted(set(plan["seq_scans"]) - set(baseline["seq_scans"])):
+        if table in WATCHED_TABLES:
+            found.append(f"new Seq Scan on {table}")
+    for index in sorted(set(baseline["indexes"]) - set(plan["indexes"])):
+        found.append(f"no longer uses {index}")
+    return found
+
+
+def changes(plan: dict, baseline: Optional[dict]) -> list[str]:
+    """
+    Differences worth a look that are not regressions by themselves.
+    """
+    if baseline is None:
+        return ["new query"]
+    found = []
+    if plan["hash"] != baseline["hash"]:
+        found.append(f"plan changed from {baseline['hash']}")
+    found += [
+        f"misestimate: {misestimate}" for misestimate in plan["misestimates"]
+        if misestimate.split(":")[0] not in
+        {known.split(":")[0] for known in baseline["misestimates"]}
+    ]
+    return found
+
+
+async def run(args: argparse.Namespace) -> dict:
+    queries = repository_queries()
+    if args.queries:
+        queries = {name: queries[name] for name in args.queries}
+
+    plans, errors = {}, {}
+    async with Database(str(DATABASE_URL)) as db:
+        sample = await sample_values(db)
+        async with db.connection() as connection:
+            for name, (module, sql) in sorted(queries.items()):
+                try:
+                    explained = await explain(
+                        connection, sql, query_values(name, module, sql, sample)
+                    )
+                except Exception as exc:
+                    errors[name] = str(exc)
+                    continue
+                plans[name] = fingerprint(explained)
+    return {"plans": plans, "errors": errors}
+
+
+def report(results: dict, baseline: Optional[dict], verbose: bool) -> bool:
+    """
+    Prints every plan and what changed since the baseline. False if any
+    plan regressed, any query could not be explained, or any query of the
+    baseline is gone.
+    """
+    passed = True
+    for name, plan in results["plans"].items():
+        before = baseline["plans"].get(name) if baseline else None
+        found = regressions(plan, before)
+        passed = passed and not found
+        status = "REGRESSED" if found else "ok"
+        execution = "-" if plan["execution_ms"] is None else f"{plan['execution_ms']:.2f}ms"
+        print(f"{name:<52}{plan['hash']:>14}{execution:>12}  {status}")
+        if verbose or found:
+            for line in plan["shape"]:
+                print(f"    {line}")
+        for message in found + (changes(plan, before) if baseline else []):
+            print(f"    - {message}")
+        if not baseline:
+            for table in plan["seq_scans"]:
+                if table in WATCHED_TABLES:
+                    print(f"    - Seq Scan on {table}")
+
+    for name, error in results["errors"].items():
+        passed = False
+        print(f"{name:<52}{'-':>14}{'-':>12}  ERROR {error}")
+
+    for name in sorted(baseline["plans"] if baseline else []):
+        if name not in results["plans"] and name not in results["errors"]:
+            passed = False
+            print(f"{name:<52}{'-':>14}{'-':>12}  REGRESSED")
+            print("    - Query of the baseline no longer found")
+    return passed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", help="file to save the fingerprints to, as JSON")
+    parser.add_argument("--compare", help="fingerprints of an earlier run to compare against")
+    parser.add_argument("--queries", nargs="+", help="names of the query constants to check")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        if args.queries:
+            baseline["plans"] = {
+                name: plan for name, plan in baseline["plans"].items()
+                if name in args.queries
+            }
+
+    passed = report(results, baseline, args.verbose)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+    if not passed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Generates a large synthetic dataset: stores clustered around real city
+centers, a long tail of menu sizes, and tags, menu categories and details
+drawn with uneven popularity. The same seed always generates the same data.
+
+Rows are bulk loaded with COPY (stores, products, details, tags and menu
+category links) with their ids assigned up front, a batch of stores at a
+time. Store profiles are inserted with a single statement per batch, since
+their location is computed by PostGIS.
+
+Usage: python -m benchmarks.seed [--stores 5000] [--products 500000]
+       [--cities athens thessaloniki ...] [--seed 42] [--truncate]
+       [--skip-fk-checks]
+"""
+import argparse
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Iterable, Iterator
+from databases import Database
+from databases.core import Connection
+from app.core.config import DATABASE_URL
+from app.services import auth_service
+
+
+# Center, share of the stores and radius (km) of every city stores can be in
+CITIES = {
+    "athens": (37.9838, 23.7275, 0.55, 12),
+    "thessaloniki": (40.6401, 22.9444, 0.2, 8),
+    "patras": (38.2466, 21.7346, 0.08, 5),
+    "heraklion": (35.3387, 25.1442, 0.07, 5),
+    "larissa": (39.6390, 22.4191, 0.05, 4),
+    "ioannina": (39.6650, 20.8537, 0.05, 4),
+}
+NEIGHBOURHOODS_PER_10_KM = 12
+KM_PER_DEGREE = 111.32
+
+# Popularity of the tags and menu categories created by the migrations
+TAG_WEIGHTS = {1: 8, 2: 14, 3: 4, 4: 20, 5: 12, 6: 5, 7: 9, 8: 6}
+MENU_CATEGORY_WEIGHTS = {1: 3, 2: 2}
+
+PUBLIC_SHARE = 0.95
+DETAILS_SHARE = 0.6
+STORES_PER_BATCH = 500
+
+# Every generated store can log in with this password
+SEED_PASSWORD = "mysecretpassword"
+
+# Tables whose ids are assigned by the generator, and whose sequences are
+# moved past them once loaded
+ID_TABLES = ("stores", "store_profiles", "products", "product_details")
+
+NEXT_ID_QUERY = "SELECT COALESCE(MAX(id), 0) + 1 AS next_id FROM {table};"
+
+RESET_SEQUENCE_QUERY = """
+    SELECT setval(
+        pg_get_serial_sequence('{table}', 'id'),
+        (SELECT COALESCE(MAX(id), 1) FROM {table})
+    );
+"""
+
+SEED_STORE_PROFILES_QUERY = """
+    INSERT INTO store_profiles (
+        id, name, description, phone_number, address, lat, lng, location, store_id
+    )
+    SELECT
+        id, name, 'Generated for the benchmarks.', 2100000000 + store_id,
+        'Generated address', lat, lng, ST_MakePoint(lng, lat)::geography, store_id
+    FROM unnest(
+        CAST(:ids AS integer[]),
+        CAST(:names AS text[]),
+        CAST(:lats AS float8[]),
+        CAST(:lngs AS float8[]),
+        CAST(:store_ids AS integer[])
+    ) AS sp(id, name, lat, lng, store_id);
+"""
+
+STORE_COLUMNS = ("id", "email", "password", "is_verified")
+PRODUCT_COLUMNS = (
+    "id", "name", "description", "price", "view_count", "has_details",
+    "is_public", "store_id"
+)
+PRODUCT_DETAILS_COLUMNS = (
+    "id", "calories", "protein", "carbs", "fiber", "sugars", "fat",
+    "saturated_fat", "product_id"
+)
+
+
+@dataclass
+class Dataset:
+    stores: int
+    products: int
+    seed: int
+    cities: list[str] = field(default_factory=lambda: list(CITIES))
+
+
+@dataclass
+class Batch:
+    """
+    Rows generated for a batch of stores, per table.
+    """
+    stores: list = field(default_factory=list)
+    store_profiles: list = field(default_factory=list)
+    products: list = field(default_factory=list)
+    product_details: list = field(default_factory=list)
+    product_tags: list = field(default_factory=list)
+    product_menu_categories: list = field(default_factory=list)
+
+
+def weighted_sample(rng: random.Random, weights: dict[int, int], k: int) -> list[int]:
+    """
+    k distinct ids, more popular ones more likely.
+    """
+    choices = dict(weights)
+    picked = []
+    for _ in range(min(k, len(choices))):
+        id = rng.choices(list(choices), weights=list(choices.values()))[0]
+        picked.append(id)
+        del choices[id]
+    return picked
+
+
+def cumulative(weights: Iterable[int]) -> list[int]:
+    total, cumulative_weights = 0, []
+    for weight in weights:
+        total += weight
+        cumulative_weights.append(total)
+    return cumulative_weights
+
+
+def store_locations(
+    rng: random.Random, count: int, cities: list[str]
+) -> list[tuple[float, float]]:
+    """
+    Points scattered around neighbourhood centers spread over each city,
+    with every city getting its share of the stores.
+    """
+    neighbourhoods, weights = [], []
+    for name in cities:
+        lat, lng, share, radius_km = CITIES[name]
+        in_city = max(1, round(radius_km / 10 * NEIGHBOURHOODS_PER_10_KM))
+        for _ in range(in_city):
+            distance = radius_km * math.sqrt(rng.random())
+            angle = rng.uniform(0, 2 * math.pi)
+            neighbourhoods.append((
+                lat + distance * math.sin(angle) / KM_PER_DEGREE,
+                lng + distance * math.cos(angle) / (KM_PER_DEGREE * math.cos(math.radians(lat))),
+            ))
+            weights.append(share / in_city)
+
+    locations = []
+    for lat, lng in rng.choices(neighbourhoods, weights=weights, k=count):
+        lat += rng.gauss(0, 0.8) / KM_PER_DEGREE
+        lng += rng.gauss(0, 0.8) / (KM_PER_DEGREE * math.cos(math.radians(lat)))
+        locations.append((round(lat, 6), round(lng, 6)))
+    return locations
+
+
+def menu_sizes(rng: random.Random, stores: int, products: int) -> list[int]:
+    """
+    Products per store: a few big menus and many small ones, adding up to
+    the requested total.
+    """
+    weights = [rng.paretovariate(1.5) for _ in range(stores)]
+    scale = products / sum(weights)
+    sizes = [max(1, int(weight * scale)) for weight in weights]
+    sizes[sizes.index(max(sizes))] += products - sum(sizes)
+    return sizes
+
+
+class Generator:
+    """
+    Generates the rows of a dataset a batch of stores at a time, with ids
+    counting up from the next free id of each table.
+    """
+
+    def __init__(self, dataset: Dataset, next_ids: dict[str, int]) -> None:
+        self.dataset = dataset
+        self.next_ids = dict(next_ids)
+        self.rng = random.Random(dataset.seed)
+        self.locations = store_locations(self.rng, dataset.stores, dataset.cities)
+        self.sizes = menu_sizes(self.rng, dataset.stores, dataset.products)
+        self.password = auth_service.hash_password(password=SEED_PASSWORD)
+        self.tag_ids = list(TAG_WEIGHTS)
+        self.tag_weights = cumulative(TAG_WEIGHTS.values())
+        self.menu_category_ids = list(MENU_CATEGORY_WEIGHTS)
+        self.menu_category_weights = cumulative(MENU_CATEGORY_WEIGHTS.values())
+
+
+    def take_id(self, table: str) -> int:
+        id = self.next_ids[table]
+        self.next_ids[table] += 1
+        return id
+
+
+    def batches(self) -> Iterator[Batch]:
+        for start in range(0, self.dataset.stores, STORES_PER_BATCH):
+            yield self.batch(range(start, min(start + STORES_PER_BATCH, self.dataset.stores)))
+
+
+    def batch(self, store_indexes: range) -> Batch:
+        batch = Batch()
+        seed = self.dataset.seed
+        for i in store_indexes:
+            store_id = self.take_id("stores")
+            lat, lng = self.locations[i]
+            batch.stores.append((store_id, f"store_{seed}_{i}@mystore.com", self.password, True))
+            batch.store_profiles.append(
+                (self.take_id("store_profiles"), f"Store {seed}-{i}", lat, lng, store_id)
+            )
+            for j in range(self.sizes[i]):
+                self.add_product(batch, store_id, f"Product {seed}-{i}-{j}")
+        return batch
+
+
+    def add_product(self, batch: Batch, store_id: int, name: str) -> None:
+        rng = self.rng
+        product_id = self.take_id("products")
+        has_details = rng.random() < DETAILS_SHARE
+        # Log-normal prices around 6.00, in cents
+        cents = min(max(int(rng.lognormvariate(6.4, 0.5)), 50), 8000)
+        batch.products.append((
+            product_id, name, "Generated for the benchmarks.",
+            Decimal(cents).scaleb(-2), int(rng.paretovariate(1.2)) - 1,
+            has_details, rng.random() < PUBLIC_SHARE, store_id,
+        ))
+
+        if has_details:
+            carbs, fat = round(rng.uniform(1, 90), 1), round(rng.uniform(1, 40), 1)
+            batch.product_details.append((
+                self.take_id("product_details"), rng.randint(80, 900),
+                round(rng.uniform(1, 45), 1), carbs,
+                round(carbs * rng.uniform(0, 0.2), 1), round(carbs * rng.uniform(0, 0.5), 1),
+                fat, round(fat * rng.uniform(0.1, 0.6), 1), product_id,
+            ))
+
+        # Drawn with replacement, so some products get fewer tags
+        for tag_id in set(rng.choices(
+            self.tag_ids, cum_weights=self.tag_weights, k=rng.randint(1, 3)
+        )):
+            batch.product_tags.append((product_id, tag_id))
+        for menu_category_id in set(rng.choices(
+            self.menu_category_ids, cum_weights=self.menu_category_weights,
+            k=1 if rng.random() < 0.8 else 2
+        )):
+            batch.product_menu_categories.append((product_id, menu_category_id))
+
+
+async def load_batch(connection: Connection, batch: Batch) -> None:
+    raw_connection = connection.raw_connection
+    await raw_connection.copy_records_to_table(
+        "stores", records=batch.stores, columns=STORE_COLUMNS
+    )
+    await connection.execute(
+        query=SEED_STORE_PROFILES_QUERY,
+        values={
+            "ids": [profile[0] for profile in batch.store_profiles],
+            "names": [profile[1] for profile in batch.store_profiles],
+            "lats": [profile[2] for profile in batch.store_profiles],
+            "lngs": [profile[3] for profile in batch.store_profiles],
+            "store_ids": [profile[4] for profile in batch.store_profiles],
+        }
+    )
+    await raw_connection.copy_records_to_table(
+        "products", records=batch.products, columns=PRODUCT_COLUMNS
+    )
+    await raw_connection.copy_records_to_table(
+        "product_details", records=batch.product_details, columns=PRODUCT_DETAILS_COLUMNS
+    )
+    await raw_connection.copy_records_to_table(
+        "product_tags", records=batch.product_tags, columns=("product_id", "tag_id")
+    )
+    await raw_connection.copy_records_to_table(
+        "product_menu_categories", records=batch.product_menu_categories,
+        columns=("product_id", "menu_category_id")
+    )
+
+
+async def seed(dataset: Dataset, truncate: bool, skip_fk_checks: bool) -> None:
+    async with Database(str(DATABASE_URL)) as db:
+        if truncate:
+            await db.execute("SELECT truncate_tables();")
+
+        start = time.perf_counter()
+        async with db.connection() as connection:
+            async with connection.transaction():
+                if skip_fk_checks:
+                    # Superusers only. The generated rows reference each other correctly.
+                    await connection.execute("SET LOCAL session_replication_role = replica;")
+                # Keeps the ids taken below free until the rows are in
+                for table in ID_TABLES:
+                    await connection.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE;")
+
+                next_ids = {}
+                for table in ID_TABLES:
+                    next_id_record = await connection.fetch_one(NEXT_ID_QUERY.format(table=table))
+                    next_ids[table] = next_id_record["next_id"]
+
+                generator = Generator(dataset, next_ids)
+                batches = generator.batches()
+                # The next batch is generated in a thread while this one loads
+                loop = asyncio.get_running_loop()
+                next_batch = loop.run_in_executor(None, next, batches, None)
+                while (batch := await next_batch) is not None:
+                    next_batch = loop.run_in_executor(None, next, batches, None)
+                    await load_batch(connection, batch)
+                    loaded = generator.next_ids["stores"] - next_ids["stores"]
+                    print(f"loaded {loaded}/{dataset.stores} stores")
+
+                for table in ID_TABLES:
+                    await connection.execute(RESET_SEQUENCE_QUERY.format(table=table))
+
+        print(
+            f"loaded {dataset.stores} stores and {dataset.products} products "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+        # Fresh statistics, so the plans match those of a settled database
+        await db.execute("ANALYZE;")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stores", type=int, default=5_000)
+    parser.add_argument("--products", type=int, default=500_000)
+    parser.add_argument("--cities", nargs="+", choices=list(CITIES), default=list(CITIES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--truncate", action="store_true",
+        help="empty every table first (never against a real database)"
+    )
+    parser.add_argument(
+        "--skip-fk-checks", action="store_true",
+        help="skip the foreign key triggers while loading (needs a superuser)"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(seed(
+        Dataset(args.stores, args.products, args.seed, args.cities),
+        truncate=args.truncate,
+        skip_fk_checks=args.skip_fk_checks,
+    ))
+
+
+if __name__ == "__main__":
+    main()
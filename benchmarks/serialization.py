@@ -0,0 +1,119 @@
+"""
+Time and peak allocations of serializing a FilterOut response with 1k and
+10k products through FastAPI's response_model path (JSONResponse and
+ORJSONResponse) versus returning a PydanticJSONResponse.
+
+Usage: python -m benchmarks.serialization [--sizes 1000 10000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import Callable
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.models.store_profiles import StoreProfileOutFilter
+from app.models.products import FilterOut
+from app.models.tags import TagOut
+from app.models.menu_categories import MenuCategoryOut
+from app.api.responses import PydanticJSONResponse
+
+
+MENU_CATEGORIES = [
+    MenuCategoryOut(id=id, label=f"Menu category {id}", desc=None)
+    for id in range(1, 11)
+]
+
+TAGS = [TagOut(id=id, label=f"Tag {id}", desc=None) for id in range(1, 4)]
+
+response_field = create_response_field(name="Response_filter", type_=FilterOut)
+
+
+def build_response_content(size: int) -> dict:
+    """
+    Route output shaped like filter_products_from_nearby_stores builds it.
+    """
+    per_category = size // len(MENU_CATEGORIES)
+    return {
+        "products_by_menu_categories": [
+            {
+                "menu_category": menu_category,
+                "products": [
+                    {
+                        "id": id, "name": f"Product {id}",
+                        "description": "Bread, cheese, lettuce, tomato, and chicken.",
+                        "image_url": f"https://domain.com/products/{id}",
+                        "price": 4.29, "view_count": 10, "has_details": True,
+                        "is_public": True, "store_id": id % 50 + 1,
+                        "store": StoreProfileOutFilter(
+                            id=id % 50 + 1, name="Starbucks",
+                            logo_url="https://domain.com/store_profiles/starbucks",
+                            distance_km=1.23,
+                        ),
+                        "tags": TAGS,
+                        "menu_category": menu_category,
+                    }
+                    for id in range(per_category)
+                ],
+            }
+            for menu_category in MENU_CATEGORIES
+        ]
+    }
+
+
+def response_model_path(response_class: type) -> Callable:
+    loop = asyncio.new_event_loop()
+
+    def serialize(content: dict) -> bytes:
+        serialized = loop.run_until_complete(
+            serialize_response(field=response_field, response_content=content)
+        )
+        return response_class(serialized).body
+    return serialize
+
+
+def pydantic_json_response(content: dict) -> bytes:
+    return PydanticJSONResponse(FilterOut(**content)).body
+
+
+CASES = {
+    "response_model + JSONResponse": response_model_path(JSONResponse),
+    "response_model + ORJSONResponse": response_model_path(ORJSONResponse),
+    "PydanticJSONResponse": pydantic_json_response,
+}
+
+
+def measure(serialize: Callable, content: dict, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        serialize(content)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    serialize(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<36}{'products':>10}{'time':>12}{'peak alloc':>14}")
+    for size in args.sizes:
+        content = build_response_content(size)
+        for name, serialize in CASES.items():
+            seconds, peak = measure(serialize, content, args.repeat)
+            print(
+                f"{name:<36}{size:>10}{seconds * 1000:>10.1f}ms"
+                f"{peak / 2**20:>12.1f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Upload throughput of a storage backend: stores --count objects of --size
+bytes each, at most --concurrency at a time, and reports objects/s and MB/s.
+The local backend writes to a temporary directory, so it runs offline.
+
+Usage: python -m benchmarks.storage [--backend local] [--count 200]
+       [--size 262144] [--concurrency 8]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from app.storage.base import Storage
+from app.storage.local import LocalStorage
+
+
+async def upload(storage: Storage, count: int, size: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    data = os.urandom(size)
+
+    async def put(i: int) -> None:
+        async with semaphore:
+            await storage.put(f"benchmarks/{i}", data, content_type="image/webp")
+
+    start = time.perf_counter()
+    await asyncio.gather(*[put(i) for i in range(count)])
+    elapsed = time.perf_counter() - start
+
+    await asyncio.gather(*[storage.delete(f"benchmarks/{i}") for i in range(count)])
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=["local", "s3"], default="local")
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--size", type=int, default=256 * 1024)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        if args.backend == "local":
+            storage = LocalStorage(root, base_url="http://localhost/media")
+        else:
+            from app.storage.events import create_storage
+            storage = create_storage()
+
+        elapsed = asyncio.run(
+            upload(storage, args.count, args.size, args.concurrency)
+        )
+        asyncio.run(storage.close())
+
+    print(
+        f"{args.backend}: {args.count} x {args.size} bytes in {elapsed:.2f}s, "
+        f"{args.count / elapsed:.1f} objects/s, "
+        f"{args.count * args.size / elapsed / 2**20:.1f} MB/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
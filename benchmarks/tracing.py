@@ -0,0 +1,100 @@
+"""
+Request overhead of Sentry tracing: microseconds per request to a small
+endpoint without Sentry, with up front sampling at several rates, and with
+every request recorded and only the slow and failed ones (plus the route's
+rate) sent. Events go to a transport that drops them.
+
+Usage: python -m benchmarks.tracing [--requests 5000] [--rates 0 0.1 1]
+"""
+import argparse
+import asyncio
+import time
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from httpx import AsyncClient
+from sentry_sdk.transport import Transport
+from app.core.tracing import TracingMiddleware, init_sentry
+import app.core.tracing as tracing
+
+
+class DroppingTransport(Transport):
+    def __init__(self, options: dict = None) -> None:
+        super().__init__(options)
+        self.sent = 0
+
+    def capture_event(self, event: dict) -> None:
+        self.sent += 1
+
+    def capture_envelope(self, envelope: object) -> None:
+        self.sent += 1
+
+
+def benchmark_app(traced: bool) -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+    if traced:
+        app.add_middleware(TracingMiddleware)
+
+    @app.get("/tags/", name="benchmark-get-tags")
+    async def get_tags() -> list[dict]:
+        return [{"id": id, "label": f"Tag {id}"} for id in range(1, 11)]
+
+    return app
+
+
+async def time_requests(app: FastAPI, count: int) -> float:
+    async with AsyncClient(app=app, base_url="http://testserver") as client:
+        await client.get("/tags/")
+        start = time.perf_counter()
+        for _ in range(count):
+            await client.get("/tags/")
+        return time.perf_counter() - start
+
+
+def run_case(
+    name: str,
+    count: int,
+    rate: float = None,
+    keep_slow_and_failed: bool = False,
+    baseline: float = None
+) -> float:
+    transport = None
+    app = benchmark_app(traced=keep_slow_and_failed)
+    if rate is not None:
+        tracing.SAMPLE_RATES = {"benchmark-get-tags": rate}
+        transport = DroppingTransport()
+        init_sentry(
+            app,
+            keep_slow_and_failed=keep_slow_and_failed,
+            dsn="https://key@sentry.invalid/1",
+            transport=transport
+        )
+
+    seconds = asyncio.run(time_requests(app, count))
+    per_request = seconds / count * 1e6
+    overhead = "" if baseline is None else f"{per_request - baseline:>+10.1f}us"
+    sent = "" if transport is None else f"{transport.sent:>8}"
+    print(f"{name:<32}{per_request:>10.1f}us{overhead:>12}{sent:>8}")
+    return per_request
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--rates", type=float, nargs="+", default=[0, 0.1, 1])
+    args = parser.parse_args()
+
+    print(f"{'case':<32}{'per request':>12}{'overhead':>12}{'sent':>8}")
+    # Without Sentry first, the Starlette integration patches the app class
+    baseline = run_case("no sentry", args.requests)
+    for rate in args.rates:
+        run_case(f"up front, rate {rate}", args.requests, rate, baseline=baseline)
+    # Last, the event processor it adds stays registered
+    for rate in args.rates:
+        run_case(
+            f"keep slow and failed, rate {rate}", args.requests, rate,
+            keep_slow_and_failed=True, baseline=baseline
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Production server: gunicorn managing WEB_CONCURRENCY uvicorn workers (one
+per available CPU by default), with the app imported once by the master
+before the workers are forked, so they share its memory.
+
+Every worker opens its own database, Redis and S3 pools on startup, sized
+from WEB_CONCURRENCY to stay within the connection budgets (see
+app.core.config). On SIGTERM the workers stop accepting connections, finish
+the requests in flight for up to GRACEFUL_TIMEOUT seconds, then close their
+pools.
+
+The metrics and profiles are kept per worker, in MULTIPROCESS_DIR, so that
+whichever worker answers /metrics or the profiling endpoints serves those of
+all of them.
+
+The client address and scheme are only read from the X-Forwarded-For and
+X-Forwarded-Proto headers of the connections coming from FORWARDED_ALLOW_IPS:
+the comma-separated addresses of the load balancer in front of the
+containers (uvicorn matches exact addresses, not ranges), 127.0.0.1 by
+default. Anyone else reaching a container directly could otherwise pick
+the address the logs and traces record.
+
+Usage: gunicorn app.api.main:app (run from this directory)
+"""
+import os
+import shutil
+
+
+# Read by app.core.config when the app is preloaded below, to size the pools
+workers = int(os.environ.setdefault(
+    "WEB_CONCURRENCY", str(len(os.sched_getaffinity(0)))
+))
+# Read by app.core.config as well, emptied whenever the server starts
+multiprocess_dir = os.environ.setdefault("MULTIPROCESS_DIR", "/dev/shm/nutrifolio")
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+
+preload_app = True
+
+# Seconds the workers get to finish the requests in flight on shutdown (the
+# container's stop timeout must be longer), and seconds a worker may go
+# without notifying the master before it is restarted
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", 25))
+timeout = int(os.environ.get("WORKER_TIMEOUT", 30))
+keepalive = int(os.environ.get("KEEPALIVE", 5))
+
+# Proxies trusted for the X-Forwarded-* headers (see above)
+forwarded_allow_ips = os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+# The heartbeat files of the workers, in memory rather than on the overlay
+# filesystem of the container
+worker_tmp_dir = "/dev/shm"
+
+
+def on_starting(server) -> None:
+    # Left over by the workers of a previous run
+    shutil.rmtree(multiprocess_dir, ignore_errors=True)
+
+
+def child_exit(server, worker) -> None:
+    # Imported by the master already, as the app is preloaded
+    from app.metrics.multiprocess import retire_worker
+    from app.metrics.registry import registry
+    from app.profiling.requests import saved_profiles_path
+
+    retire_worker(registry, multiprocess_dir, worker.pid)
+    try:
+        os.remove(saved_profiles_path(multiprocess_dir, worker.pid))
+    except FileNotFoundError:
+        pass
@@ -2,13 +2,15 @@ import warnings
 import os
 import pytest
 import pytest_asyncio
-from typing import BinaryIO, Generator, AsyncGenerator
+from pathlib import Path
+from typing import Generator, AsyncGenerator
 from fastapi import FastAPI
 from databases import Database
 from httpx import AsyncClient
 from asgi_lifespan import LifespanManager
 from app.api.main import get_application
-from app.api.dependencies.space_bucket import get_sb_client
+from app.api.dependencies.storage import get_storage
+from app.storage.local import LocalStorage
 
 from app.db.repositories.users import UsersRepository
 from app.db.repositories.stores import StoresRepository
@@ -22,12 +24,21 @@ from app.models.users import UserCreate, UserInDB
 from app.models.stores import StoreCreate, StoreInDB
 from app.models.store_profiles import StoreProfileCreate, StoreProfileInDB
 
+from app.jobs.queue import JobContext, QUEUE_KEY, DELAYED_KEY, DEAD_LETTER_KEY
+
 from app.services import auth_service
 from app.core.config import SECRET_KEY
 
 import alembic
 from alembic.config import Config
 
+from tests.plugins import query_budget
+
+
+# Registered from here since pytest only reads pytest_plugins from the rootdir
+def pytest_configure(config: pytest.Config) -> None:
+    config.pluginmanager.register(query_budget, "query_budget")
+
 
 # Apply migrations at beginning of the testing session and roll them back at the end
 @pytest.fixture(scope="session")
@@ -62,6 +73,12 @@ def db(app: FastAPI) -> Database:
     return app.state._conn_pool
 
 
+# Grab a reference to our cache connection pool when needed
+@pytest.fixture
+def cache(app: FastAPI) -> "Redis":
+    return app.state._cache_conn_pool
+
+
 #################### Create repositories ####################
 @pytest.fixture
 def user_repo(db: Database) -> UsersRepository:
@@ -223,16 +240,19 @@ def authorized_client_for_verified_test_store(
     return client
 
 
+# Stores uploads as files in a temporary directory instead of the space bucket
 @pytest.fixture
-def mock_sb_client(app: FastAPI):
-    def sb_client():
-        class S3Client:
-            def upload_fileobj(
-                self, Fileobj: BinaryIO, Bucket: str, Key: str, ExtraArgs: dict
-            ) -> bool:
-                return True
-        return S3Client()
-
-    app.dependency_overrides[get_sb_client] = sb_client
-    yield
-    del app.dependency_overrides[get_sb_client]
+def local_storage(app: FastAPI, tmp_path: Path) -> Generator[LocalStorage, None, None]:
+    storage = LocalStorage(str(tmp_path), base_url="http://test/media")
+    app.dependency_overrides[get_storage] = lambda: storage
+    yield storage
+    del app.dependency_overrides[get_storage]
+
+
+# Runs queued jobs against the local storage, starting from an empty queue
+@pytest_asyncio.fixture
+async def job_context(
+    db: Database, cache: "Redis", local_storage: LocalStorage
+) -> JobContext:
+    await cache.delete(QUEUE_KEY, DELAYED_KEY, DEAD_LETTER_KEY)
+    return JobContext(db=db, cache=cache, storage=local_storage)
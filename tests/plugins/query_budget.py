@@ -0,0 +1,36 @@
+"""
+Fails a test as soon as it sends a request that runs more queries than the
+budget its route declares with app.metrics.requests.query_budget. Tests that
+go over on purpose are marked with @pytest.mark.ignore_query_budget.
+"""
+import pytest
+from typing import Generator
+from app.metrics.requests import RequestStats, budget_listeners
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "ignore_query_budget: do not fail the test when a route runs more queries than its budget"
+    )
+
+
+def fail_over_budget(route: str, stats: RequestStats, budget: int) -> None:
+    statements = ", ".join(
+        f"{name} x{count}" for name, count in stats.statements.most_common()
+    )
+    pytest.fail(
+        f"{route} ran {stats.queries} queries, over its budget of {budget}: {statements}",
+        pytrace=False
+    )
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(request: pytest.FixtureRequest) -> Generator[None, None, None]:
+    if request.node.get_closest_marker("ignore_query_budget"):
+        yield
+        return
+
+    budget_listeners.append(fail_over_budget)
+    yield
+    budget_listeners.remove(fail_over_budget)
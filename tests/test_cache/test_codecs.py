@@ -0,0 +1,21 @@
+import pytest
+from app.cache.codecs import EMPTY_ID_LIST, encode_ids, decode_ids
+
+
+class TestIdListCodec:
+    def test_ids_round_trip(self) -> None:
+        ids = [1, 2, 300, 2**32 - 1]
+        encoded = encode_ids(ids)
+
+        assert len(encoded) == 4 * len(ids)
+        assert decode_ids(encoded) == ids
+
+
+    def test_empty_list_uses_explicit_marker(self) -> None:
+        assert encode_ids([]) == EMPTY_ID_LIST
+        assert decode_ids(EMPTY_ID_LIST) == []
+
+
+    def test_ids_out_of_range_are_rejected(self) -> None:
+        with pytest.raises(OverflowError):
+            encode_ids([-1])
@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from app.cache.single_flight import SingleFlight, rebuild_with_lock
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+class TestSingleFlight:
+    async def test_concurrent_calls_share_one_execution(self) -> None:
+        single_flight = SingleFlight()
+        calls = 0
+
+        async def load() -> list[int]:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return [1, 2]
+
+        results = await asyncio.gather(
+            *[single_flight.do("key", load) for _ in range(10)]
+        )
+        assert calls == 1
+        assert all(result == [1, 2] for result in results)
+
+        await single_flight.do("key", load)
+        assert calls == 2
+
+
+    async def test_lock_holder_rebuilds_while_others_wait(
+        self, cache: "Redis"
+    ) -> None:
+        key = "test_single_flight"
+        await cache.delete(key)
+        calls = 0
+
+        async def read() -> bytes:
+            return await cache.get(key)
+
+        async def rebuild() -> bytes:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.1)
+            await cache.set(key, b"value")
+            return b"value"
+
+        results = await asyncio.gather(
+            *[
+                rebuild_with_lock(
+                    cache=cache, key=key, read=read, rebuild=rebuild
+                )
+                for _ in range(5)
+            ]
+        )
+        assert calls == 1
+        assert results == [b"value"] * 5
@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from app.cache.swr import read_with_swr
+from app.cache.stats import cache_lookups
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+class TestStaleWhileRevalidate:
+    async def test_stale_value_is_served_and_refreshed_in_background(
+        self, cache: "Redis"
+    ) -> None:
+        key = "test_swr"
+        await cache.set(key, b"stale_value")
+        await cache.delete(f"{key}:fresh")
+        stale_count = cache_lookups[("test_swr", "stale")]
+
+        async def read() -> tuple[bytes, bool]:
+            return await cache.get(key), bool(await cache.exists(f"{key}:fresh"))
+
+        async def rebuild() -> bytes:
+            await cache.set(key, b"new_value")
+            await cache.set(f"{key}:fresh", 1, ex=60)
+            return b"new_value"
+
+        value = await read_with_swr(
+            cache=cache, key=key, cache_name="test_swr", read=read, rebuild=rebuild
+        )
+        assert value == b"stale_value"
+        assert cache_lookups[("test_swr", "stale")] == stale_count + 1
+
+        await asyncio.sleep(0.1)
+        value = await read_with_swr(
+            cache=cache, key=key, cache_name="test_swr", read=read, rebuild=rebuild
+        )
+        assert value == b"new_value"
+
+
+    async def test_missing_value_is_rebuilt_inline(self, cache: "Redis") -> None:
+        key = "test_swr_miss"
+        await cache.delete(key, f"{key}:fresh")
+
+        async def read() -> tuple[bytes, bool]:
+            return await cache.get(key), bool(await cache.exists(f"{key}:fresh"))
+
+        async def rebuild() -> bytes:
+            await cache.set(key, b"value")
+            await cache.set(f"{key}:fresh", 1, ex=60)
+            return b"value"
+
+        value = await read_with_swr(
+            cache=cache, key=key, cache_name="test_swr", read=read, rebuild=rebuild
+        )
+        assert value == b"value"
+        assert await cache.get(key) == b"value"
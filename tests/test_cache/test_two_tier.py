@@ -0,0 +1,58 @@
+import asyncio
+import pytest
+from app.cache.two_tier import LocalCache, TwoTierCache, listen_for_invalidations
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+class TestLocalCache:
+    async def test_least_recently_used_entry_is_evicted(self) -> None:
+        local_cache = LocalCache(max_size=2, ttl=60)
+        local_cache.set("a", 1)
+        local_cache.set("b", 2)
+        local_cache.get("a")
+        local_cache.set("c", 3)
+
+        assert local_cache.get("a") == 1
+        assert local_cache.get("c") == 3
+        assert local_cache.get("b") != 2
+
+
+    async def test_expired_entry_is_not_returned(self) -> None:
+        local_cache = LocalCache(max_size=2, ttl=0)
+        local_cache.set("a", 1)
+
+        assert local_cache.get("a") != 1
+
+
+class TestTwoTierCache:
+    async def test_local_tier_is_used_until_invalidated(
+        self, cache: "Redis"
+    ) -> None:
+        two_tier_cache = TwoTierCache("test_two_tier", ttl=60)
+        loads = 0
+
+        async def load() -> list[int]:
+            nonlocal loads
+            loads += 1
+            return [1, 2]
+
+        assert await two_tier_cache.get("key", load) == [1, 2]
+        assert await two_tier_cache.get("key", load) == [1, 2]
+        assert loads == 1
+
+        listener = asyncio.create_task(listen_for_invalidations(cache))
+        await asyncio.sleep(0.1)
+        two_tier_cache.local.set("other_key", [3])
+        await cache.publish(
+            "cache:invalidate", '{"cache": "test_two_tier", "key": "other_key"}'
+        )
+        await asyncio.sleep(0.1)
+        listener.cancel()
+
+        assert two_tier_cache.local.get("other_key") != [3]
+        await two_tier_cache.invalidate(cache, "key")
+        assert await two_tier_cache.get("key", load) == [1, 2]
+        assert loads == 2
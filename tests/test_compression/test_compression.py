@@ -0,0 +1,66 @@
+import pytest
+from httpx import AsyncClient
+from starlette.types import Receive, Scope, Send
+from app.api.compression import CompressionMiddleware, choose_encoding, compress
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+def json_app(body: bytes, headers: list[tuple[bytes, bytes]] = []):
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                *headers
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+
+class TestChooseEncoding:
+    async def test_brotli_is_preferred_over_gzip(self) -> None:
+        assert choose_encoding("gzip, deflate, br") == "br"
+        assert choose_encoding("gzip, br;q=0") == "gzip"
+        assert choose_encoding("deflate") is None
+        assert choose_encoding("br;q=0, *") == "gzip"
+        assert choose_encoding("gzip;q=1.0, br;q=0.1") == "gzip"
+        assert choose_encoding(None) is None
+
+
+class TestCompressionMiddleware:
+    async def test_large_responses_are_compressed(self) -> None:
+        body = b'{"name": "test"}' * 100
+        app = CompressionMiddleware(json_app(body), minimum_size=500)
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            res = await client.get("/", headers={"Accept-Encoding": "br"})
+
+        assert res.headers["Content-Encoding"] == "br"
+        assert int(res.headers["Content-Length"]) < len(body)
+        assert res.content == body
+
+
+    async def test_small_responses_are_not_compressed(self) -> None:
+        app = CompressionMiddleware(json_app(b'{"name": "test"}'), minimum_size=500)
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            res = await client.get("/", headers={"Accept-Encoding": "gzip"})
+
+        assert "Content-Encoding" not in res.headers
+
+
+    async def test_precompressed_responses_are_not_compressed_again(self) -> None:
+        body = b'{"name": "test"}' * 100
+        app = CompressionMiddleware(
+            json_app(compress(body, "gzip"), [(b"content-encoding", b"gzip")]),
+            minimum_size=10
+        )
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            res = await client.get("/", headers={"Accept-Encoding": "br"})
+
+        assert res.headers["Content-Encoding"] == "gzip"
+        assert res.content == body
@@ -0,0 +1,169 @@
+import io
+import json
+import pytest
+from PIL import Image
+from app.api.exceptions.jobs import PermanentJobFailure
+from app.jobs.images import resize_to_webp
+from app.jobs.queue import (
+    JobContext,
+    QUEUE_KEY,
+    DELAYED_KEY,
+    DEAD_LETTER_KEY,
+    job_handler,
+    enqueue,
+    process_next_job,
+    retry_or_bury,
+    requeue_unfinished_jobs,
+    requeue_jobs_of_dead_workers,
+    send_heartbeat,
+    processing_key,
+    heartbeat_key,
+    blob_key,
+)
+from app.core.config import JOB_MAX_ATTEMPTS
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+processed_jobs = []
+
+
+@job_handler("test_succeeds")
+async def succeeds(context: JobContext, job: dict) -> None:
+    processed_jobs.append(job)
+
+
+@job_handler("test_fails")
+async def fails(context: JobContext, job: dict) -> None:
+    raise RuntimeError("storage unavailable")
+
+
+@job_handler("test_fails_permanently")
+async def fails_permanently(context: JobContext, job: dict) -> None:
+    raise PermanentJobFailure("not an image")
+
+
+class TestJobQueue:
+    async def test_queued_job_runs_once_and_drops_its_blob(
+        self, job_context: JobContext
+    ) -> None:
+        cache = job_context.cache
+        processed_jobs.clear()
+        job_id = await enqueue(cache, "test_succeeds", {"id": 1}, blob=b"image")
+        assert await cache.get(blob_key(job_id)) == b"image"
+
+        assert await process_next_job(job_context, worker_id="test", timeout=1)
+        assert [job["payload"] for job in processed_jobs] == [{"id": 1}]
+        assert await cache.get(blob_key(job_id)) is None
+        assert await cache.llen(processing_key("test")) == 0
+
+        assert not await process_next_job(job_context, worker_id="test", timeout=0.1)
+
+
+    async def test_failed_job_is_scheduled_for_a_retry(
+        self, job_context: JobContext
+    ) -> None:
+        cache = job_context.cache
+        job_id = await enqueue(cache, "test_fails", {}, blob=b"image")
+
+        assert await process_next_job(job_context, worker_id="test", timeout=1)
+        assert await cache.llen(QUEUE_KEY) == 0
+        assert await cache.llen(processing_key("test")) == 0
+        [retry] = await cache.zrange(DELAYED_KEY, 0, -1)
+        assert json.loads(retry)["attempts"] == 1
+        # Kept for the retry
+        assert await cache.get(blob_key(job_id)) == b"image"
+
+        # Not due yet
+        await process_next_job(job_context, worker_id="test", timeout=0.1)
+        assert await cache.zcard(DELAYED_KEY) == 1
+
+
+    async def test_job_is_dead_lettered_after_max_attempts(
+        self, job_context: JobContext
+    ) -> None:
+        cache = job_context.cache
+        job = {
+            "id": "1", "name": "test_fails", "payload": {},
+            "attempts": JOB_MAX_ATTEMPTS - 1
+        }
+        await retry_or_bury(cache, job, "RuntimeError('storage unavailable')")
+
+        assert await cache.zcard(DELAYED_KEY) == 0
+        [dead] = await cache.lrange(DEAD_LETTER_KEY, 0, -1)
+        assert json.loads(dead)["attempts"] == JOB_MAX_ATTEMPTS
+        assert "storage unavailable" in json.loads(dead)["error"]
+
+
+    async def test_permanent_failure_is_dead_lettered_right_away(
+        self, job_context: JobContext
+    ) -> None:
+        cache = job_context.cache
+        await enqueue(cache, "test_fails_permanently", {})
+
+        assert await process_next_job(job_context, worker_id="test", timeout=1)
+        assert await cache.zcard(DELAYED_KEY) == 0
+        assert await cache.llen(DEAD_LETTER_KEY) == 1
+
+
+    async def test_due_retries_are_run_again(
+        self, job_context: JobContext
+    ) -> None:
+        cache = job_context.cache
+        processed_jobs.clear()
+        job = {"id": "1", "name": "test_succeeds", "payload": {}, "attempts": 1}
+        await cache.zadd(DELAYED_KEY, {json.dumps(job): 0})
+
+        assert await process_next_job(job_context, worker_id="test", timeout=1)
+        assert [job["attempts"] for job in processed_jobs] == [1]
+        assert await cache.zcard(DELAYED_KEY) == 0
+
+
+    async def test_unfinished_jobs_are_requeued_on_restart(
+        self, job_context: JobContext
+    ) -> None:
+        cache = job_context.cache
+        await cache.delete(processing_key("test"))
+        await cache.lpush(processing_key("test"), json.dumps({"id": "1"}))
+
+        await requeue_unfinished_jobs(cache, worker_id="test")
+        assert await cache.llen(processing_key("test")) == 0
+        assert await cache.llen(QUEUE_KEY) == 1
+
+
+
+    async def test_jobs_of_dead_workers_are_requeued(
+        self, job_context: JobContext
+    ) -> None:
+        cache = job_context.cache
+        for worker_id in ("alive", "dead"):
+            await cache.delete(processing_key(worker_id))
+            await send_heartbeat(cache, worker_id=worker_id)
+            await cache.lpush(processing_key(worker_id), json.dumps({"id": worker_id}))
+        await cache.delete(heartbeat_key("dead"))
+
+        await requeue_jobs_of_dead_workers(cache)
+        assert await cache.llen(processing_key("alive")) == 1
+        assert await cache.llen(processing_key("dead")) == 0
+        assert [json.loads(job) for job in await cache.lrange(QUEUE_KEY, 0, -1)] == [
+            {"id": "dead"}
+        ]
+        await cache.delete(processing_key("alive"))
+
+class TestImageProcessing:
+    async def test_images_are_scaled_down_to_each_size_in_webp(self) -> None:
+        with open("./tests/assets/Nutrifolio-logo.png", "rb") as image:
+            variants = resize_to_webp(image.read(), (64, 16))
+
+        assert len(variants) == 2
+        for variant, size in zip(variants, (64, 16)):
+            with Image.open(io.BytesIO(variant)) as img:
+                assert img.format == "WEBP"
+                assert max(img.size) == size
+
+
+    async def test_invalid_images_fail_permanently(self) -> None:
+        with pytest.raises(PermanentJobFailure):
+            resize_to_webp(b"not an image", (64,))
@@ -0,0 +1,86 @@
+import os
+import pytest
+from fastapi import FastAPI, status
+from httpx import AsyncClient
+from app.models.products import ProductCreate, ProductInDB
+from app.models.stores import StoreInDB
+from app.db.repositories.products import ProductsRepository
+from app.jobs.queue import JobContext, QUEUE_KEY, enqueue, process_next_job
+from app.jobs.storage_cleanup import CLEANUP_STORAGE
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+async def create_product_with_image(
+    product_repo: ProductsRepository,
+    job_context: JobContext,
+    *,
+    name: str,
+    store_id: int
+) -> ProductInDB:
+    storage = job_context.storage
+    for key in (f"products/{name}", f"products/{name}_512px", f"products/{name}_128px"):
+        await storage.put(key, b"image", content_type="image/webp")
+
+    product = await product_repo.create_product(new_product=ProductCreate(
+        name=name, price=1.00, has_details=False, is_public=True, store_id=store_id
+    ))
+    await product_repo.update_product_image_urls_by_id(
+        id=product.id,
+        image_url=storage.url_for(f"products/{name}"),
+        thumbnail_url=storage.url_for(f"products/{name}_128px"),
+        preview_url=storage.url_for(f"products/{name}_512px"),
+    )
+    return product
+
+
+class TestStorageCleanup:
+    async def test_deleting_a_product_deletes_its_images(
+        self,
+        app: FastAPI,
+        authorized_client_for_verified_test_store: AsyncClient,
+        verified_test_store: StoreInDB,
+        product_repo: ProductsRepository,
+        job_context: JobContext
+    ) -> None:
+        product = await create_product_with_image(
+            product_repo, job_context, name="test product", store_id=verified_test_store.id
+        )
+
+        res = await authorized_client_for_verified_test_store.delete(
+            app.url_path_for("delete-product-by-id", id=product.id)
+        )
+        assert res.status_code == status.HTTP_204_NO_CONTENT
+        assert await job_context.cache.llen(QUEUE_KEY) == 1
+
+        assert await process_next_job(job_context, worker_id="test", timeout=1)
+        assert not list(job_context.storage.path_for("products").iterdir())
+
+
+    async def test_orphaned_images_older_than_the_minimum_age_are_deleted(
+        self,
+        verified_test_store: StoreInDB,
+        product_repo: ProductsRepository,
+        job_context: JobContext
+    ) -> None:
+        storage = job_context.storage
+        await create_product_with_image(
+            product_repo, job_context, name="test product", store_id=verified_test_store.id
+        )
+        await storage.put("products/orphan", b"image", content_type="image/webp")
+        await storage.put("products/recent orphan", b"image", content_type="image/webp")
+        await storage.put("store_profiles/orphan", b"image", content_type="image/webp")
+        for key in (
+            "products/test product", "products/orphan", "store_profiles/orphan"
+        ):
+            os.utime(storage.path_for(key), (0, 0))
+
+        await enqueue(job_context.cache, CLEANUP_STORAGE, {})
+        assert await process_next_job(job_context, worker_id="test", timeout=1)
+
+        assert sorted(path.name for path in storage.path_for("products").iterdir()) == [
+            "recent orphan", "test product", "test product_128px", "test product_512px"
+        ]
+        assert not list(storage.path_for("store_profiles").iterdir())
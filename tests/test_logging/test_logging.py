@@ -0,0 +1,118 @@
+import json
+import logging
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from app.api.access_log import AccessLogMiddleware, REQUEST_ID_HEADER
+from app.core.logging import (
+    APP_LOGGER,
+    ContextQueueHandler,
+    InfoSamplingFilter,
+    JSONFormatter,
+    LogContext,
+    configure_logging,
+    current_log_context,
+    get_logger,
+)
+import app.core.logging as app_logging
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+class ListQueue:
+    def __init__(self) -> None:
+        self.records = []
+
+    def put_nowait(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def log_record(level: int, message: str, **extra) -> logging.LogRecord:
+    record = logging.makeLogRecord({"levelno": level, "msg": message, **extra})
+    record.levelname = logging.getLevelName(level)
+    return record
+
+
+def log_app(records: list[logging.LogRecord]) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(AccessLogMiddleware)
+
+    @app.get("/", name="test-access-log")
+    async def log_something() -> None:
+        records.append(current_log_context.get().request_id)
+
+    return app
+
+
+class TestLogging:
+    async def test_app_loggers_share_a_single_queue_handler(self) -> None:
+        get_logger("app.test_logging")
+        get_logger("app.test_logging")
+        configure_logging()
+
+        handlers = logging.getLogger(APP_LOGGER).handlers
+        assert len(handlers) == 1
+        assert isinstance(handlers[0], ContextQueueHandler)
+
+
+    async def test_records_are_queued_with_their_request_context(self) -> None:
+        log_queue = ListQueue()
+        handler = ContextQueueHandler(log_queue)
+        scope = {"type": "http"}
+        token = current_log_context.set(LogContext("abc", scope, sampled=True))
+        try:
+            handler.emit(log_record(logging.INFO, "Deleted %d images.", args=(3,)))
+        finally:
+            current_log_context.reset(token)
+
+        entry = json.loads(JSONFormatter().format(log_queue.records[0]))
+        assert entry["message"] == "Deleted 3 images."
+        assert entry["level"] == "INFO"
+        assert entry["request_id"] == "abc"
+        assert entry["route"] is None
+
+
+    async def test_exceptions_are_rendered_before_being_queued(self) -> None:
+        log_queue = ListQueue()
+        handler = ContextQueueHandler(log_queue)
+        try:
+            raise RuntimeError("Failed to get the tags.")
+        except RuntimeError as exc:
+            record = log_record(logging.ERROR, exc, exc_info=(type(exc), exc, exc.__traceback__))
+            handler.emit(record)
+
+        assert record.exc_info is not None
+        assert log_queue.records[0].exc_info is None
+        entry = json.loads(JSONFormatter().format(log_queue.records[0]))
+        assert "RuntimeError: Failed to get the tags." in entry["exception"]
+
+
+    async def test_info_records_are_sampled_per_request(
+        self,
+        monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(app_logging, "LOG_INFO_SAMPLE_RATE", 0.5)
+        sampling = InfoSamplingFilter()
+        info = log_record(logging.INFO, "Deleted 3 images.")
+        warning = log_record(logging.WARNING, "get-all-tags ran 30 queries.")
+
+        for sampled in (True, False):
+            token = current_log_context.set(LogContext("abc", {}, sampled=sampled))
+            try:
+                assert sampling.filter(info) is sampled
+                assert sampling.filter(warning) is True
+            finally:
+                current_log_context.reset(token)
+
+
+    async def test_requests_get_an_id_sent_back_in_the_response(self) -> None:
+        request_ids = []
+        async with AsyncClient(app=log_app(request_ids), base_url="http://test") as client:
+            res = await client.get("/")
+            assert res.headers[REQUEST_ID_HEADER] == request_ids[0]
+
+            res = await client.get("/", headers={REQUEST_ID_HEADER: "abc"})
+            assert res.headers[REQUEST_ID_HEADER] == "abc"
+            assert request_ids[1] == "abc"
@@ -15,3 +15,19 @@ class TestGetAllMenuCategories:
     ) -> None:
         res = await client.get(app.url_path_for("get-all-menu-categories"))
         assert res.status_code == status.HTTP_200_OK
+
+
+    async def test_get_all_menu_categories_with_matching_etag_is_not_modified(
+        self,
+        app: FastAPI,
+        client: AsyncClient
+    ) -> None:
+        res = await client.get(app.url_path_for("get-all-menu-categories"))
+        etag = res.headers["ETag"]
+
+        res = await client.get(
+            app.url_path_for("get-all-menu-categories"),
+            headers={"If-None-Match": etag}
+        )
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+        assert res.headers["ETag"] == etag
@@ -0,0 +1,58 @@
+import asyncio
+import logging
+import time
+import pytest
+from app.metrics.event_loop import (
+    EVENT_LOOP_BLOCKED,
+    EVENT_LOOP_LAG,
+    EventLoopMonitor,
+    event_loop_logger,
+)
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+class ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def hash_password_synchronously() -> None:
+    time.sleep(0.3)
+
+
+class TestEventLoopMonitor:
+    async def test_blocking_calls_are_logged_with_their_stack(self) -> None:
+        handler = ListHandler()
+        event_loop_logger.addHandler(handler)
+        blocked_before = EVENT_LOOP_BLOCKED.values[()]
+        monitor = EventLoopMonitor(interval=0.01, blocked_threshold=0.1)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.05)
+            hash_password_synchronously()
+            await asyncio.sleep(0.05)
+        finally:
+            await monitor.stop()
+            event_loop_logger.removeHandler(handler)
+
+        assert EVENT_LOOP_BLOCKED.values[()] == blocked_before + 1
+        assert len(handler.records) == 1
+        assert "hash_password_synchronously" in handler.records[0].stack
+        assert handler.records[0].blocked_seconds >= 0.1
+
+
+    async def test_lag_is_recorded_without_blocking(self) -> None:
+        observed_before = sum(EVENT_LOOP_LAG.values.get((), [[0], 0.0])[0])
+        monitor = EventLoopMonitor(interval=0.01, blocked_threshold=0.1)
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+        assert sum(EVENT_LOOP_LAG.values[()][0]) > observed_before
@@ -0,0 +1,56 @@
+import pytest
+from fastapi import FastAPI, status
+from httpx import AsyncClient
+from starlette.datastructures import Secret
+from app.db.repositories.products import GET_PRODUCT_BY_ID_QUERY
+from app.db.instrumentation import query_name
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def metrics_token(monkeypatch: pytest.MonkeyPatch) -> str:
+    monkeypatch.setattr("app.metrics.endpoint.METRICS_TOKEN", Secret("abc"))
+    return "abc"
+
+
+class TestMetricsEndpoint:
+    async def test_requests_and_their_queries_are_measured_per_route(
+        self, app: FastAPI, client: AsyncClient, metrics_token: str
+    ) -> None:
+        res = await client.get(app.url_path_for("get-all-tags"))
+        assert res.status_code == status.HTTP_200_OK
+
+        res = await client.get(
+            "/metrics", headers={"Authorization": f"Bearer {metrics_token}"}
+        )
+        assert res.status_code == status.HTTP_200_OK
+        assert res.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+        lines = res.text.splitlines()
+        assert any(
+            line.startswith('http_requests_total{route="get-all-tags",status="2xx"}')
+            for line in lines
+        )
+        assert any(
+            line.startswith('http_request_duration_seconds_count{route="get-all-tags"}')
+            for line in lines
+        )
+        assert any(line.startswith("db_pool_connections{") for line in lines)
+
+
+    async def test_metrics_are_only_served_with_the_token(
+        self, client: AsyncClient, metrics_token: str
+    ) -> None:
+        res = await client.get("/metrics")
+        assert res.status_code == status.HTTP_403_FORBIDDEN
+
+        res = await client.get("/metrics", headers={"Authorization": "Bearer abd"})
+        assert res.status_code == status.HTTP_403_FORBIDDEN
+
+
+    async def test_queries_are_named_after_their_repository_constant(self) -> None:
+        assert query_name(GET_PRODUCT_BY_ID_QUERY) == "GET_PRODUCT_BY_ID_QUERY"
+        assert query_name("SELECT 1;") == "other"
@@ -0,0 +1,51 @@
+import pytest
+from pathlib import Path
+from app.metrics.multiprocess import (
+    merge_snapshots,
+    read_snapshots,
+    retire_worker,
+    snapshot,
+    write_snapshot,
+)
+from app.metrics.registry import Registry
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+def worker_registry(requests: int, connections: int, latency: float) -> Registry:
+    registry = Registry()
+    registry.counter("requests_total", "Requests.", ("route",)).inc("get-all-tags", amount=requests)
+    registry.gauge("connections", "Connections.").set(connections)
+    registry.histogram("latency_seconds", "Latency.", buckets=(1,)).observe(latency)
+    return registry
+
+
+class TestMultiprocessMetrics:
+    async def test_metrics_of_every_worker_are_merged(self, tmp_path: Path) -> None:
+        registry = worker_registry(0, 0, 0)
+        write_snapshot(tmp_path, "1", snapshot(worker_registry(2, 4, 0.5)))
+        write_snapshot(tmp_path, "2", snapshot(worker_registry(3, 6, 2)))
+
+        rendered = merge_snapshots(registry, read_snapshots(tmp_path)).render()
+        assert 'requests_total{route="get-all-tags"} 5' in rendered
+        assert 'connections{worker="1"} 4' in rendered
+        assert 'connections{worker="2"} 6' in rendered
+        assert 'latency_seconds_bucket{le="1"} 1' in rendered
+        assert 'latency_seconds_bucket{le="+Inf"} 2' in rendered
+        assert "latency_seconds_sum 2.5" in rendered
+
+
+    async def test_counts_of_exited_workers_are_kept(self, tmp_path: Path) -> None:
+        registry = worker_registry(0, 0, 0)
+        write_snapshot(tmp_path, "1", snapshot(worker_registry(2, 4, 0.5)))
+        retire_worker(registry, tmp_path, 1)
+        write_snapshot(tmp_path, "2", snapshot(worker_registry(3, 6, 2)))
+        retire_worker(registry, tmp_path, 2)
+
+        assert [worker for worker, _ in read_snapshots(tmp_path)] == ["retired"]
+        rendered = merge_snapshots(registry, read_snapshots(tmp_path)).render()
+        assert 'requests_total{route="get-all-tags"} 5' in rendered
+        assert "latency_seconds_count 2" in rendered
+        assert 'connections{' not in rendered
@@ -0,0 +1,70 @@
+import pytest
+from typing import Optional
+from fastapi import FastAPI
+from httpx import AsyncClient
+from app.db.instrumentation import InstrumentedDatabase
+from app.metrics.requests import (
+    MetricsMiddleware,
+    RequestStats,
+    QUERY_BUDGET_OVERRUNS,
+    REPEATED_QUERIES,
+    budget_listeners,
+    query_budget,
+)
+from app.core.config import REPEATED_QUERY_THRESHOLD
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+class StubDatabase:
+    async def fetch_all(self, query: str, values: Optional[dict] = None) -> list:
+        return []
+
+
+def budget_app(queries: int) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    db = InstrumentedDatabase(StubDatabase())
+
+    @app.get("/", name="test-query-budget")
+    @query_budget(2)
+    async def run_queries() -> None:
+        for _ in range(queries):
+            await db.fetch_all("SELECT 1;")
+
+    return app
+
+
+class TestQueryBudget:
+    @pytest.mark.ignore_query_budget
+    async def test_requests_over_their_declared_budget_are_flagged(self) -> None:
+        overruns = []
+
+        def listener(route: str, stats: RequestStats, budget: int) -> None:
+            overruns.append((route, stats.queries, budget))
+
+        budget_listeners.append(listener)
+        before = QUERY_BUDGET_OVERRUNS.values[("test-query-budget",)]
+        try:
+            async with AsyncClient(app=budget_app(2), base_url="http://test") as client:
+                await client.get("/")
+            async with AsyncClient(app=budget_app(3), base_url="http://test") as client:
+                await client.get("/")
+        finally:
+            budget_listeners.remove(listener)
+
+        assert overruns == [("test-query-budget", 3, 2)]
+        assert QUERY_BUDGET_OVERRUNS.values[("test-query-budget",)] == before + 1
+
+
+    @pytest.mark.ignore_query_budget
+    async def test_repeated_queries_are_flagged(self) -> None:
+        before = REPEATED_QUERIES.values[("test-query-budget", "other")]
+
+        app = budget_app(REPEATED_QUERY_THRESHOLD)
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            await client.get("/")
+
+        assert REPEATED_QUERIES.values[("test-query-budget", "other")] == before + 1
@@ -0,0 +1,62 @@
+import pytest
+from app.metrics.registry import Metric, Registry
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+class TestRegistry:
+    async def test_counters_and_gauges_are_rendered_per_label_values(self) -> None:
+        registry = Registry()
+        requests = registry.counter("requests_total", "Requests.", ("route",))
+        connections = registry.gauge("connections", "Connections.")
+
+        requests.inc("get-all-tags")
+        requests.inc("get-all-tags", amount=2)
+        requests.inc('say "hi"\n')
+        connections.set(4)
+
+        assert registry.render() == (
+            "# HELP requests_total Requests.\n"
+            "# TYPE requests_total counter\n"
+            'requests_total{route="get-all-tags"} 3\n'
+            'requests_total{route="say \\"hi\\"\\n"} 1\n'
+            "# HELP connections Connections.\n"
+            "# TYPE connections gauge\n"
+            "connections 4\n"
+        )
+
+
+    async def test_histogram_buckets_are_cumulative(self) -> None:
+        registry = Registry()
+        latency = registry.histogram(
+            "latency_seconds", "Latency.", ("route",), buckets=(0.1, 1)
+        )
+
+        for seconds in (0.05, 0.1, 0.5, 2):
+            latency.observe(seconds, "get-all-tags")
+
+        assert registry.render().splitlines()[2:] == [
+            'latency_seconds_bucket{route="get-all-tags",le="0.1"} 2',
+            'latency_seconds_bucket{route="get-all-tags",le="1"} 3',
+            'latency_seconds_bucket{route="get-all-tags",le="+Inf"} 4',
+            'latency_seconds_sum{route="get-all-tags"} 2.65',
+            'latency_seconds_count{route="get-all-tags"} 4',
+        ]
+
+
+    async def test_metric_names_are_unique(self) -> None:
+        registry = Registry()
+        registry.counter("requests_total", "Requests.")
+
+        with pytest.raises(ValueError):
+            registry.gauge("requests_total", "Requests.")
+
+
+    async def test_metrics_without_samples_cannot_be_created(self) -> None:
+        class Summary(Metric):
+            type = "summary"
+
+        with pytest.raises(TypeError):
+            Summary("latency_seconds", "Latency.")
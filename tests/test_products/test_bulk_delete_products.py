@@ -0,0 +1,109 @@
+import pytest
+from fastapi import FastAPI, status
+from httpx import AsyncClient
+from app.models.products import ProductCreate, ProductInDB
+from app.models.stores import StoreInDB
+from app.models.product_details import ProductDetailsInDB
+from app.db.repositories.products import ProductsRepository
+from app.db.repositories.product_details import ProductDetailsRepository
+from app.api.routes.products import bulk_delete_products
+from fixtures.test_products_fixtures import (
+    test_product,
+    test_product_details,
+    verified_test_store_with_products,
+    verified_test_store_with_products_profile,
+    authorized_client_for_verified_test_store_with_products
+)
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+async def create_product(
+    product_repo: ProductsRepository, *, name: str, store_id: int
+) -> ProductInDB:
+    return await product_repo.create_product(new_product=ProductCreate(
+        name=name, price=1.00, has_details=False, is_public=True, store_id=store_id
+    ))
+
+
+class TestBulkDeleteProducts:
+    async def test_unauthorized_store_cannot_delete_products(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        test_product: ProductInDB
+    ) -> None:
+        res = await client.delete(
+            app.url_path_for("bulk-delete-products"),
+            params={"ids": [test_product.id]}
+        )
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+    async def test_only_products_of_the_store_are_deleted(
+        self,
+        app: FastAPI,
+        authorized_client_for_verified_test_store_with_products: AsyncClient,
+        test_product: ProductInDB,
+        test_product_details: ProductDetailsInDB,
+        verified_test_store: StoreInDB,
+        product_repo: ProductsRepository,
+        product_details_repo: ProductDetailsRepository
+    ) -> None:
+        second_product = await create_product(
+            product_repo, name="second product", store_id=test_product.store_id
+        )
+        other_store_product = await create_product(
+            product_repo, name="other product", store_id=verified_test_store.id
+        )
+
+        res = await authorized_client_for_verified_test_store_with_products.delete(
+            app.url_path_for("bulk-delete-products"),
+            params={"ids": [test_product.id, second_product.id, other_store_product.id, 999999]}
+        )
+        assert res.status_code == status.HTTP_200_OK
+        assert res.json() == {"deleted_ids": sorted([test_product.id, second_product.id])}
+
+        assert await product_repo.get_product_by_id(id=test_product.id) is None
+        assert await product_repo.get_product_by_id(id=second_product.id) is None
+        assert await product_details_repo.get_product_details_by_product_id(
+            product_id=test_product.id
+        ) is None
+        assert await product_repo.get_product_by_id(id=other_store_product.id) is not None
+
+
+    async def test_soft_deleted_products_are_hidden_until_purged(
+        self,
+        app: FastAPI,
+        monkeypatch: pytest.MonkeyPatch,
+        authorized_client_for_verified_test_store_with_products: AsyncClient,
+        test_product: ProductInDB,
+        test_product_details: ProductDetailsInDB,
+        product_repo: ProductsRepository,
+        product_details_repo: ProductDetailsRepository
+    ) -> None:
+        monkeypatch.setattr(bulk_delete_products, "PRODUCT_SOFT_DELETE", True)
+
+        res = await authorized_client_for_verified_test_store_with_products.delete(
+            app.url_path_for("bulk-delete-products"),
+            params={"ids": [test_product.id]}
+        )
+        assert res.json() == {"deleted_ids": [test_product.id]}
+
+        assert await product_repo.get_product_by_id(id=test_product.id) is None
+        # Not cascaded yet
+        assert await product_details_repo.get_product_details_by_product_id(
+            product_id=test_product.id
+        ) is not None
+        # The name can be used again
+        await create_product(
+            product_repo, name=test_product.name, store_id=test_product.store_id
+        )
+
+        purged = await product_repo.purge_deleted_products(deleted_for=0, limit=10)
+        assert [product.id for product in purged] == [test_product.id]
+        assert await product_details_repo.get_product_details_by_product_id(
+            product_id=test_product.id
+        ) is None
@@ -0,0 +1,158 @@
+import io
+import json
+import zipfile
+import pytest
+from fastapi import FastAPI, status
+from httpx import AsyncClient
+from app.models.stores import StoreInDB
+from app.db.repositories.products import ProductsRepository
+from app.db.repositories.product_tags import ProductTagsRepository
+from app.jobs.queue import JobContext, process_next_job
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+MENU_CSV = (
+    "name,description,price,is_public,calories,protein,carbs,fat,tag_ids,menu_category_ids,image\n"
+    "test product 1,test description,1.00,true,100,10,10,10,1;2,1,product.png\n"
+    "test product 2,,2.50,false,,,,,4,2,\n"
+    "test product 1,,3.00,true,,,,,1,1,\n"
+    "test product 3,,not a price,true,,,,,1,1,\n"
+    "test product 4,,1.00,true,,,,,500,1,\n"
+)
+
+
+def images_zip() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.write("./tests/assets/Nutrifolio-logo.png", "product.png")
+    return buffer.getvalue()
+
+
+class TestBulkImportProducts:
+    async def test_unauthorized_store_cannot_import_products(
+        self,
+        app: FastAPI,
+        client: AsyncClient
+    ) -> None:
+        res = await client.post(
+            app.url_path_for("bulk-import-products"),
+            files={"menu": ("menu.csv", MENU_CSV.encode())}
+        )
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+    async def test_authorized_store_can_import_csv_menu_with_images(
+        self,
+        app: FastAPI,
+        authorized_client_for_verified_test_store: AsyncClient,
+        verified_test_store: StoreInDB,
+        product_repo: ProductsRepository,
+        product_tag_repo: ProductTagsRepository,
+        job_context: JobContext
+    ) -> None:
+        res = await authorized_client_for_verified_test_store.post(
+            app.url_path_for("bulk-import-products"),
+            files={
+                "menu": ("menu.csv", MENU_CSV.encode()),
+                "images": ("images.zip", images_zip()),
+            }
+        )
+        assert res.status_code == status.HTTP_200_OK
+        assert res.json()["created"] == 2
+        assert res.json()["failed"] == 3
+
+        results = res.json()["results"]
+        assert [result["status"] for result in results] == [
+            "created", "created", "failed", "failed", "failed"
+        ]
+
+        db_product = await product_repo.get_product_by_name_and_store_id(
+            name="test product 1", store_id=verified_test_store.id
+        )
+        assert db_product.id == results[0]["id"]
+        assert db_product.has_details
+        assert db_product.image_url is None
+
+        assert await process_next_job(job_context, worker_id="test", timeout=1)
+        db_product = await product_repo.get_product_by_name_and_store_id(
+            name="test product 1", store_id=verified_test_store.id
+        )
+        assert db_product.image_url.endswith("/products/test product 1")
+        assert db_product.thumbnail_url.endswith("/products/test product 1_128px")
+        assert db_product.preview_url.endswith("/products/test product 1_512px")
+        for url in (db_product.image_url, db_product.thumbnail_url, db_product.preview_url):
+            key = url.removeprefix(job_context.storage.base_url + "/")
+            assert job_context.storage.path_for(key).read_bytes()[8:12] == b"WEBP"
+
+        db_product_tags = await product_tag_repo.get_product_tags_by_product_id(
+            product_id=db_product.id
+        )
+        assert {product_tag.tag_id for product_tag in db_product_tags} == {1, 2}
+
+
+    async def test_existing_product_names_are_reported_per_row(
+        self,
+        app: FastAPI,
+        authorized_client_for_verified_test_store: AsyncClient
+    ) -> None:
+        menu = json.dumps({
+            "name": "test product", "price": 1.00, "is_public": True,
+            "tag_ids": [1], "menu_category_ids": [1]
+        }).encode()
+
+        res = await authorized_client_for_verified_test_store.post(
+            app.url_path_for("bulk-import-products"),
+            files={"menu": ("menu.jsonl", menu)}
+        )
+        assert res.json()["created"] == 1
+
+        res = await authorized_client_for_verified_test_store.post(
+            app.url_path_for("bulk-import-products"),
+            files={"menu": ("menu.jsonl", menu)}
+        )
+        assert res.status_code == status.HTTP_200_OK
+        assert res.json()["created"] == 0
+        assert res.json()["results"][0]["status"] == "failed"
+
+
+    async def test_rows_with_unsupported_images_fail(
+        self,
+        app: FastAPI,
+        authorized_client_for_verified_test_store: AsyncClient
+    ) -> None:
+        menu = json.dumps({
+            "name": "test product", "price": 1.00, "is_public": True,
+            "tag_ids": [1], "menu_category_ids": [1], "image": "product.png"
+        }).encode()
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("product.png", b"not an image")
+
+        res = await authorized_client_for_verified_test_store.post(
+            app.url_path_for("bulk-import-products"),
+            files={
+                "menu": ("menu.jsonl", menu),
+                "images": ("images.zip", buffer.getvalue()),
+            }
+        )
+        assert res.status_code == status.HTTP_200_OK
+        assert res.json()["created"] == 0
+        assert res.json()["results"][0]["status"] == "failed"
+        assert res.json()["results"][0]["errors"] == [
+            "The image product.png is not a PNG, JPEG, GIF or WebP image."
+        ]
+
+
+    async def test_unsupported_menu_file_fails(
+        self,
+        app: FastAPI,
+        authorized_client_for_verified_test_store: AsyncClient
+    ) -> None:
+        res = await authorized_client_for_verified_test_store.post(
+            app.url_path_for("bulk-import-products"),
+            files={"menu": ("menu.xlsx", b"not a menu")}
+        )
+        assert res.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
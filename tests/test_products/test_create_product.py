@@ -8,6 +8,8 @@ from app.db.repositories.products import ProductsRepository
 from app.db.repositories.product_details import ProductDetailsRepository
 from app.db.repositories.product_tags import ProductTagsRepository
 from app.db.repositories.product_menu_categories import ProductMenuCategoriesRepository
+from app.jobs.queue import JobContext, process_next_job
+from app.core.config import IMAGE_UPLOAD_MAX_SIZE
 
 
 #  Decorates all tests with @pytest.mark.asyncio
@@ -118,7 +120,7 @@ class TestCreateProduct:
         product_details_repo: ProductDetailsRepository,
         product_tag_repo: ProductTagsRepository,
         product_menu_category_repo: ProductMenuCategoriesRepository,
-        mock_sb_client
+        job_context: JobContext
     ) -> None:
         data = {
             "name": "test product",
@@ -141,6 +143,10 @@ class TestCreateProduct:
             files=files
         )
         assert res.status_code == status.HTTP_201_CREATED
+        assert res.json()["image_url"] is None
+
+        # The image is uploaded by a worker once the product is created
+        assert await process_next_job(job_context, worker_id="test", timeout=1)
 
         db_product = await product_repo.get_product_by_name_and_store_id(
             name=data["name"], store_id=verified_test_store.id
@@ -149,6 +155,11 @@ class TestCreateProduct:
         assert db_product.name == data["name"]
         assert db_product.description == data["description"]
         assert data["name"] in db_product.image_url
+        assert db_product.thumbnail_url.endswith(f"{data['name']}_128px")
+        assert db_product.preview_url.endswith(f"{data['name']}_512px")
+        for url in (db_product.image_url, db_product.thumbnail_url, db_product.preview_url):
+            key = url.removeprefix(job_context.storage.base_url + "/")
+            assert job_context.storage.path_for(key).read_bytes()[8:12] == b"WEBP"
         assert db_product.price == data["price"]
         assert db_product.is_public == data["is_public"]
         assert db_product.has_details == False
@@ -224,3 +235,43 @@ class TestCreateProduct:
             data=data
         )
         assert res.status_code == status.HTTP_409_CONFLICT
+
+
+    @pytest.mark.parametrize(
+        "image, status_code",
+        (
+            (b"<html></html>" * 10, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE),
+            (b"\x89PNG\r\n\x1a\n" + b"0" * IMAGE_UPLOAD_MAX_SIZE, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE),
+        ),
+        ids=["not an image", "too large"]
+    )
+    async def test_invalid_product_images_are_rejected(
+        self,
+        app: FastAPI,
+        authorized_client_for_verified_test_store: AsyncClient,
+        verified_test_store: StoreInDB,
+        product_repo: ProductsRepository,
+        job_context: JobContext,
+        image: bytes,
+        status_code: int
+    ) -> None:
+        data = {
+            "name": "test product",
+            "price": 1.00,
+            "is_public": True,
+            "tag_ids": [1],
+            "menu_category_ids": [1]
+        }
+
+        res = await authorized_client_for_verified_test_store.post(
+            app.url_path_for("create-product"),
+            data=data,
+            files={"product_image": ("image.png", image)}
+        )
+        assert res.status_code == status_code
+
+        db_product = await product_repo.get_product_by_name_and_store_id(
+            name=data["name"], store_id=verified_test_store.id
+        )
+        assert db_product is None
+        assert not await job_context.cache.keys("jobs:blobs:*")
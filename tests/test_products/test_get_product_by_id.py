@@ -74,6 +74,22 @@ class TestGetProductById:
             ]
 
 
+    async def test_get_product_by_id_with_matching_etag_is_not_modified(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        test_product: ProductInDB,
+        test_product_details: ProductDetailsInDB
+    ) -> None:
+        url = app.url_path_for("get-product-by-id", id=test_product.id)
+        res = await client.get(url)
+        etag = res.headers["ETag"]
+
+        res = await client.get(url, headers={"If-None-Match": etag})
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+        assert res.headers["ETag"] == etag
+
+
     async def test_get_product_by_id_that_does_not_exist_fails(
         self,
         app: FastAPI,
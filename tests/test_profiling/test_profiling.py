@@ -0,0 +1,130 @@
+import json
+import os
+import time
+import pytest
+from pathlib import Path
+from fastapi import FastAPI, status
+from httpx import AsyncClient
+from starlette.datastructures import Secret
+from app.profiling.endpoint import list_profiles, get_profile
+from app.profiling.requests import (
+    PROFILE_ID_HEADER,
+    PROFILE_TOKEN_HEADER,
+    ProfileBuffer,
+    ProfilingMiddleware,
+    saved_profiles_path,
+)
+from app.profiling.sampler import WAITING_FRAME
+import app.profiling.requests as profiling_requests
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+def busy_for(seconds: float) -> None:
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        sum(range(100))
+
+
+def profiled_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+    app.add_route("/admin/profiles", list_profiles)
+    app.add_route("/admin/profiles/{id}", get_profile)
+
+    @app.get("/", name="test-profiling")
+    async def group_products() -> None:
+        busy_for(0.1)
+
+    return app
+
+
+@pytest.fixture
+def profiles(monkeypatch: pytest.MonkeyPatch) -> ProfileBuffer:
+    profiles = ProfileBuffer(size=2)
+    monkeypatch.setattr(profiling_requests, "profiles", profiles)
+    monkeypatch.setattr("app.profiling.endpoint.profiles", profiles)
+    monkeypatch.setattr(profiling_requests, "PROFILING_TOKEN", Secret("abc"))
+    monkeypatch.setattr(profiling_requests, "PROFILING_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(profiling_requests, "PROFILING_INTERVAL", 0.001)
+    return profiles
+
+
+class TestProfiling:
+    async def test_requests_with_the_token_are_profiled(self, profiles: ProfileBuffer) -> None:
+        async with AsyncClient(app=profiled_app(), base_url="http://test") as client:
+            res = await client.get("/")
+            assert PROFILE_ID_HEADER not in res.headers
+            assert not profiles.profiles
+
+            res = await client.get("/", headers={PROFILE_TOKEN_HEADER: "abc"})
+            assert res.status_code == status.HTTP_200_OK
+            profile = profiles.get(res.headers[PROFILE_ID_HEADER])
+
+        assert profile["route"] == "test-profiling"
+        assert profile["status"] == status.HTTP_200_OK
+        assert profile["samples"] > 0
+        busy_samples = sum(
+            int(line.rsplit(" ", 1)[1]) for line in profile["stacks"].splitlines()
+            if "group_products" in line and "busy_for" in line
+        )
+        assert busy_samples > 0
+        assert all(
+            line.startswith("__call__ (app/profiling/requests.py")
+            or line.startswith(WAITING_FRAME)
+            for line in profile["stacks"].splitlines()
+        )
+
+
+    async def test_only_the_last_profiles_are_kept(self, profiles: ProfileBuffer) -> None:
+        async with AsyncClient(app=profiled_app(), base_url="http://test") as client:
+            ids = []
+            for _ in range(3):
+                res = await client.get("/", headers={PROFILE_TOKEN_HEADER: "abc"})
+                ids.append(res.headers[PROFILE_ID_HEADER])
+
+            res = await client.get("/admin/profiles", headers={PROFILE_TOKEN_HEADER: "abc"})
+            assert res.status_code == status.HTTP_200_OK
+            assert [profile["id"] for profile in res.json()] == [ids[2], ids[1]]
+
+            res = await client.get(
+                f"/admin/profiles/{ids[0]}", headers={PROFILE_TOKEN_HEADER: "abc"}
+            )
+            assert res.status_code == status.HTTP_404_NOT_FOUND
+
+            res = await client.get(
+                f"/admin/profiles/{ids[2]}", headers={PROFILE_TOKEN_HEADER: "abc"}
+            )
+            assert res.status_code == status.HTTP_200_OK
+            assert res.text == profiles.get(ids[2])["stacks"]
+
+
+    async def test_profiles_are_only_served_with_the_token(self, profiles: ProfileBuffer) -> None:
+        async with AsyncClient(app=profiled_app(), base_url="http://test") as client:
+            res = await client.get("/admin/profiles")
+            assert res.status_code == status.HTTP_403_FORBIDDEN
+
+            res = await client.get("/admin/profiles", headers={PROFILE_TOKEN_HEADER: "abd"})
+            assert res.status_code == status.HTTP_403_FORBIDDEN
+
+
+    async def test_profiles_of_every_worker_are_served(
+        self, profiles: ProfileBuffer, tmp_path: Path
+    ) -> None:
+        profiles.directory = str(tmp_path)
+        other_worker = saved_profiles_path(profiles.directory, os.getpid() + 1)
+        os.makedirs(os.path.dirname(other_worker))
+        with open(other_worker, "w") as file:
+            json.dump([{"id": "1-1", "started_at": "2000-01-01T00:00:00+00:00", "stacks": ""}], file)
+
+        async with AsyncClient(app=profiled_app(), base_url="http://test") as client:
+            res = await client.get("/", headers={PROFILE_TOKEN_HEADER: "abc"})
+            profile_id = res.headers[PROFILE_ID_HEADER]
+
+            res = await client.get("/admin/profiles", headers={PROFILE_TOKEN_HEADER: "abc"})
+            assert [profile["id"] for profile in res.json()] == [profile_id, "1-1"]
+
+            res = await client.get("/admin/profiles/1-1", headers={PROFILE_TOKEN_HEADER: "abc"})
+            assert res.status_code == status.HTTP_200_OK
@@ -0,0 +1,93 @@
+import os
+import pytest
+from pathlib import Path
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from app.storage.base import Storage
+from app.storage.local import LocalStorage, LocalStorageFiles
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+WEBP_HEAD = b"RIFF\x00\x00\x00\x00WEBPVP8 "
+
+
+class TestLocalStorage:
+    async def test_objects_can_be_stored_and_deleted(self, tmp_path: Path) -> None:
+        storage = LocalStorage(str(tmp_path), base_url="http://test/media")
+
+        await storage.put("products/test product", b"image", content_type="image/png")
+        assert (tmp_path / "products" / "test product").read_bytes() == b"image"
+        assert storage.url_for("products/test product") == "http://test/media/products/test product"
+
+        await storage.put("products/test product", b"new image", content_type="image/png")
+        assert (tmp_path / "products" / "test product").read_bytes() == b"new image"
+        assert [path.name for path in (tmp_path / "products").iterdir()] == ["test product"]
+
+        await storage.delete("products/test product")
+        assert not (tmp_path / "products" / "test product").exists()
+        # Deleting a missing object is not an error
+        await storage.delete("products/test product")
+
+
+    async def test_objects_are_listed_in_pages(self, tmp_path: Path) -> None:
+        storage = LocalStorage(str(tmp_path), base_url="http://test/media")
+        for name in ("a", "b", "c"):
+            await storage.put(f"products/{name}", b"image", content_type="image/png")
+        os.utime(tmp_path / "products" / "a", (0, 0))
+        # Being written, not an object yet
+        (tmp_path / "products" / ".upload-1").write_bytes(b"ima")
+
+        pages = [page async for page in storage.list_objects("products", page_size=2)]
+        assert [[obj.key for obj in page] for page in pages] == [
+            ["products/a", "products/b"], ["products/c"]
+        ]
+        assert pages[0][0].modified == 0
+
+        assert [page async for page in storage.list_objects("store_profiles", page_size=2)] == []
+
+        await storage.delete_many(["products/a", "products/c"])
+        assert [path.name for path in (tmp_path / "products").iterdir() if path.name != ".upload-1"] == ["b"]
+
+
+    async def test_urls_map_back_to_their_keys(self, tmp_path: Path) -> None:
+        storage = LocalStorage(str(tmp_path), base_url="http://test/media")
+
+        assert storage.key_for(storage.url_for("products/test product")) == "products/test product"
+        assert storage.key_for("https://elsewhere.com/products/test product") is None
+
+
+    async def test_keys_cannot_leave_the_storage_root(self, tmp_path: Path) -> None:
+        storage = LocalStorage(str(tmp_path / "media"), base_url="http://test/media")
+
+        with pytest.raises(ValueError):
+            await storage.put("../outside", b"image", content_type="image/png")
+
+
+    async def test_stored_files_are_served_with_their_image_type(
+        self, tmp_path: Path
+    ) -> None:
+        storage = LocalStorage(str(tmp_path), base_url="http://test/media")
+        await storage.put("products/test product", WEBP_HEAD, content_type="image/webp")
+
+        app = Starlette(routes=[
+            Mount("/media", LocalStorageFiles(directory=str(tmp_path)))
+        ])
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            res = await client.get("/media/products/test product")
+            assert res.status_code == 200
+            assert res.headers["content-type"] == "image/webp"
+            assert res.content == WEBP_HEAD
+
+
+class TestStorageInterface:
+    async def test_incomplete_backends_cannot_be_created(self) -> None:
+        class UploadOnlyStorage(Storage):
+            async def put(self, key: str, data: bytes, *, content_type: str) -> None:
+                pass
+
+        with pytest.raises(TypeError):
+            UploadOnlyStorage()
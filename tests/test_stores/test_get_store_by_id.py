@@ -5,6 +5,8 @@ from app.models.products import ProductInDB
 from app.models.store_profiles import StoreProfileInDB
 from app.models.product_tags import ProductTagInDB
 from app.models.product_menu_categories import ProductMenuCategoryInDB
+from app.db.repositories.products import ProductsRepository
+from app.cache.versions import store_version_key, bump_version
 from fixtures.test_stores_fixtures import (
     verified_test_store,
     verified_test_store_profile,
@@ -50,6 +52,59 @@ class TestGetStoreById:
         assert product_1["name"] == "test_product_1"
 
 
+    async def test_get_store_by_id_serves_image_thumbnails(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        product_repo: ProductsRepository,
+        verified_test_store_profile: StoreProfileInDB,
+        test_products: list[ProductInDB]
+    ) -> None:
+        await product_repo.update_product_image_urls_by_id(
+            id=test_products[0].id,
+            image_url="https://domain.com/products/test_product_1",
+            thumbnail_url="https://domain.com/products/test_product_1_128px",
+            preview_url="https://domain.com/products/test_product_1_512px",
+        )
+
+        res = await client.get(
+            app.url_path_for(
+                "get-store-by-id",
+                id=verified_test_store_profile.store_id
+            )
+        )
+        assert res.status_code == status.HTTP_200_OK
+
+        product = res.json()["products_by_menu_categories"][0]["products"][0]
+        assert product["name"] == "test_product_1"
+        assert product["thumbnail_url"].endswith("test_product_1_128px")
+
+
+    async def test_get_store_by_id_with_matching_etag_is_not_modified(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        cache: "Redis",
+        verified_test_store_profile: StoreProfileInDB,
+        test_products: list[ProductInDB]
+    ) -> None:
+        url = app.url_path_for(
+            "get-store-by-id", id=verified_test_store_profile.store_id
+        )
+        res = await client.get(url)
+        etag = res.headers["ETag"]
+
+        res = await client.get(url, headers={"If-None-Match": etag})
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+
+        await bump_version(
+            cache, store_version_key(verified_test_store_profile.store_id)
+        )
+        res = await client.get(url, headers={"If-None-Match": etag})
+        assert res.status_code == status.HTTP_200_OK
+        assert res.headers["ETag"] != etag
+
+
     async def test_get_product_by_id_that_does_not_exist_fails(
         self,
         app: FastAPI,
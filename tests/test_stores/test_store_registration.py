@@ -5,6 +5,7 @@ from app.models.stores import StoreInDB
 from app.models.store_profiles import StoreProfileCreate, StoreProfileInDB, StoreProfileOut
 from app.db.repositories.stores import StoresRepository
 from app.db.repositories.store_profiles import StoreProfilesRepository
+from app.jobs.queue import JobContext, process_next_job
 from app.services import auth_service
 
 
@@ -71,7 +72,7 @@ class TestStoreRegistration:
         client: AsyncClient,
         store_repo: StoresRepository,
         store_profile_repo: StoreProfilesRepository,
-        mock_sb_client
+        job_context: JobContext
     ) -> None:
         data = {
             "email": "test_email@mystore.com",
@@ -98,6 +99,9 @@ class TestStoreRegistration:
         )
         assert res.status_code == status.HTTP_201_CREATED
 
+        # The logo is uploaded by a worker once the store is registered
+        assert await process_next_job(job_context, worker_id="test", timeout=1)
+
         db_store = await store_repo.get_store_by_email(email=data["email"])
         assert db_store is not None
         assert db_store.email == data["email"]
@@ -111,6 +115,8 @@ class TestStoreRegistration:
         assert db_store_profile is not None
         assert db_store_profile.name == data["name"]
         assert data["name"] in db_store_profile.logo_url
+        assert db_store_profile.logo_thumbnail_url.endswith(f"{data['name']}_128px")
+        assert db_store_profile.logo_preview_url.endswith(f"{data['name']}_512px")
         assert db_store_profile.phone_number == data["phone_number"]
         assert db_store_profile.address == data["address"]
         assert db_store_profile.lat == data["lat"]
@@ -1,6 +1,8 @@
 import pytest
 from fastapi import FastAPI, status
 from httpx import AsyncClient
+from databases import Database
+from app.cache.two_tier import tags_cache
 
 
 #  Decorates all tests with @pytest.mark.asyncio
@@ -15,3 +17,58 @@ class TestGetAllTags:
     ) -> None:
         res = await client.get(app.url_path_for("get-all-tags"))
         assert res.status_code == status.HTTP_200_OK
+
+
+    async def test_get_all_tags_with_matching_etag_is_not_modified(
+        self,
+        app: FastAPI,
+        client: AsyncClient
+    ) -> None:
+        res = await client.get(app.url_path_for("get-all-tags"))
+        etag = res.headers["ETag"]
+
+        res = await client.get(
+            app.url_path_for("get-all-tags"), headers={"If-None-Match": etag}
+        )
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+        assert res.headers["ETag"] == etag
+        assert res.content == b""
+
+
+    async def test_changed_tags_get_a_new_etag_once_rebuilt(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        db: Database,
+        cache: "Redis"
+    ) -> None:
+        url = app.url_path_for("get-all-tags")
+        res = await client.get(url)
+        etag = res.headers["ETag"]
+
+        async def expire_cached_tags() -> None:
+            await cache.delete("tags:all")
+            tags_cache.local.clear()
+
+        # Rebuilt from the same tags
+        await expire_cached_tags()
+        res = await client.get(url, headers={"If-None-Match": etag})
+        assert res.status_code == status.HTTP_304_NOT_MODIFIED
+
+        # Changed by a migration
+        tag = await db.fetch_one("SELECT id, label FROM tags ORDER BY id LIMIT 1;")
+        await db.execute(
+            "UPDATE tags SET label = 'Changed' WHERE id = :id;", {"id": tag["id"]}
+        )
+        try:
+            await expire_cached_tags()
+            res = await client.get(url, headers={"If-None-Match": etag})
+            assert res.status_code == status.HTTP_200_OK
+            assert res.headers["ETag"] != etag
+            assert res.json()["tags"][0]["label"] == "Changed"
+        finally:
+            await db.execute(
+                "UPDATE tags SET label = :label WHERE id = :id;",
+                {"id": tag["id"], "label": tag["label"]}
+            )
+            await expire_cached_tags()
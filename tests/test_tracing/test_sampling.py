@@ -0,0 +1,131 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi import FastAPI
+from app.core.tracing import (
+    ROUTE_TAG,
+    TracesSampler,
+    keep_slow_and_failed_transactions,
+    parse_sample_rates,
+)
+from app.core.config import TRACES_SAMPLE_RATE, TRACES_SLOW_REQUEST_SECONDS
+import app.core.tracing as tracing
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def sample_rates(monkeypatch: pytest.MonkeyPatch) -> dict[str, float]:
+    rates = {"test-frequent-route": 0.0001, "test-ignored-route": 0}
+    monkeypatch.setattr(tracing, "SAMPLE_RATES", rates)
+    return rates
+
+
+def sampled_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/frequent/{id}/", name="test-frequent-route")
+    async def frequent_route(id: int) -> None:
+        pass
+
+    @app.get("/ignored/", name="test-ignored-route")
+    async def ignored_route() -> None:
+        pass
+
+    return app
+
+
+def sampling_context(path: str, parent_sampled: bool = None) -> dict:
+    return {
+        "parent_sampled": parent_sampled,
+        "asgi_scope": {"type": "http", "method": "GET", "path": path},
+    }
+
+
+def transaction_event(
+    seconds: float,
+    status_code: int = 200,
+    route: str = "test-frequent-route"
+) -> dict:
+    start = datetime(2023, 1, 1)
+    return {
+        "type": "transaction",
+        "start_timestamp": start,
+        "timestamp": start + timedelta(seconds=seconds),
+        "contexts": {"trace": {"parent_span_id": None}},
+        "tags": {ROUTE_TAG: route, "http.status_code": str(status_code)},
+    }
+
+
+class TestSampleRates:
+    async def test_sample_rates_are_parsed_per_route_name(self) -> None:
+        assert parse_sample_rates(" get-all-tags=0.01, metrics=0,") == {
+            "get-all-tags": 0.01, "metrics": 0
+        }
+
+
+    async def test_sample_rates_above_one_are_rejected(self) -> None:
+        with pytest.raises(ValueError):
+            parse_sample_rates("get-all-tags=2")
+
+
+class TestTracesSampler:
+    async def test_requests_are_sampled_at_the_rate_of_their_route(
+        self,
+        sample_rates: dict[str, float]
+    ) -> None:
+        sampler = TracesSampler(sampled_app().router.routes, keep_slow_and_failed=False)
+
+        assert sampler(sampling_context("/frequent/1/")) == 0.0001
+        assert sampler(sampling_context("/ignored/")) == 0
+        assert sampler(sampling_context("/unknown/")) == TRACES_SAMPLE_RATE
+
+
+    async def test_the_decision_of_the_caller_is_followed(
+        self,
+        sample_rates: dict[str, float]
+    ) -> None:
+        sampler = TracesSampler(sampled_app().router.routes, keep_slow_and_failed=False)
+
+        assert sampler(sampling_context("/frequent/1/", parent_sampled=True)) == 1
+
+
+    async def test_every_request_is_recorded_to_keep_slow_and_failed_ones(
+        self,
+        sample_rates: dict[str, float]
+    ) -> None:
+        sampler = TracesSampler(sampled_app().router.routes, keep_slow_and_failed=True)
+
+        assert sampler(sampling_context("/frequent/1/")) == 1
+        assert sampler(sampling_context("/ignored/")) == 0
+
+
+class TestKeepSlowAndFailedTransactions:
+    async def test_fast_transactions_are_sent_at_the_rate_of_their_route(
+        self,
+        sample_rates: dict[str, float]
+    ) -> None:
+        event = transaction_event(seconds=0.01)
+        assert keep_slow_and_failed_transactions(event, {}) is None
+
+
+    async def test_slow_transactions_are_always_sent(
+        self,
+        sample_rates: dict[str, float]
+    ) -> None:
+        event = transaction_event(seconds=TRACES_SLOW_REQUEST_SECONDS)
+        assert keep_slow_and_failed_transactions(event, {}) is event
+
+
+    async def test_failed_transactions_are_always_sent(
+        self,
+        sample_rates: dict[str, float]
+    ) -> None:
+        event = transaction_event(seconds=0.01, status_code=500)
+        assert keep_slow_and_failed_transactions(event, {}) is event
+
+
+    async def test_error_events_are_left_alone(self) -> None:
+        event = {"level": "error", "message": "Failed to get the tags."}
+        assert keep_slow_and_failed_transactions(event, {}) is event
@@ -0,0 +1,108 @@
+import pytest
+from httpx import AsyncClient
+from typing import Optional
+from starlette.applications import Starlette
+from starlette.datastructures import FormData
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from app.api.exceptions.uploads import UnsupportedImageType, ImageTooLarge
+from app.api.uploads import read_form_with_image, validate_form
+from app.models.core import CoreModel
+from app.core.config import UPLOAD_CHUNK_SIZE
+
+
+#  Decorates all tests with @pytest.mark.asyncio
+pytestmark = pytest.mark.asyncio
+
+
+PNG_HEAD = b"\x89PNG\r\n\x1a\n"
+
+
+class ProductForm(CoreModel):
+    name: str
+    description: Optional[str] = None
+    price: float
+    tag_ids: list[int]
+
+
+def form_app(chunks: list[bytes], max_image_size: int) -> Starlette:
+    async def upload(request: Request) -> JSONResponse:
+        async def write_image(data: bytes) -> None:
+            chunks.append(data)
+
+        try:
+            form, image_type = await read_form_with_image(
+                request,
+                image_field="image",
+                write_image=write_image,
+                max_image_size=max_image_size
+            )
+        except (UnsupportedImageType, ImageTooLarge) as exc:
+            return JSONResponse({"error": type(exc).__name__})
+        return JSONResponse({"fields": form.multi_items(), "image_type": image_type})
+
+    return Starlette(routes=[Route("/", upload, methods=["POST"])])
+
+
+class TestReadFormWithImage:
+    async def test_image_is_streamed_in_chunks(self) -> None:
+        chunks = []
+        image = PNG_HEAD + b"0" * (3 * UPLOAD_CHUNK_SIZE)
+        app = form_app(chunks, max_image_size=len(image))
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            res = await client.post(
+                "/",
+                data={"name": "test product", "tag_ids": ["1", "2"]},
+                files={"image": ("image.png", image), "other": ("other.png", b"skipped")}
+            )
+
+        assert res.json()["image_type"] == "image/png"
+        assert sorted(res.json()["fields"]) == [
+            ["name", "test product"], ["tag_ids", "1"], ["tag_ids", "2"]
+        ]
+        assert b"".join(chunks) == image
+        assert len(chunks) > 1
+
+
+    async def test_form_without_image(self) -> None:
+        chunks = []
+        async with AsyncClient(app=form_app(chunks, 1024), base_url="http://test") as client:
+            res = await client.post("/", data={"name": "test product"})
+
+        assert res.json() == {"fields": [["name", "test product"]], "image_type": None}
+        assert chunks == []
+
+
+    @pytest.mark.parametrize(
+        "image, error",
+        (
+            (b"<html>" + b"0" * 512, "UnsupportedImageType"),
+            (PNG_HEAD + b"0" * 2048, "ImageTooLarge"),
+        ),
+        ids=["not an image", "too large"]
+    )
+    async def test_invalid_images_are_rejected_before_being_written(
+        self, image: bytes, error: str
+    ) -> None:
+        chunks = []
+        async with AsyncClient(app=form_app(chunks, 1024), base_url="http://test") as client:
+            res = await client.post("/", files={"image": ("image.png", image)})
+
+        assert res.json() == {"error": error}
+        assert chunks == []
+
+
+    async def test_form_fields_are_validated_against_a_model(self) -> None:
+        chunks = []
+        async with AsyncClient(app=form_app(chunks, 1024), base_url="http://test") as client:
+            res = await client.post("/", data={
+                "name": "test product", "description": "", "price": "1.5",
+                "tag_ids": "4"
+            })
+
+        product_form = validate_form(ProductForm, FormData(res.json()["fields"]))
+        assert product_form.description is None
+        assert product_form.price == 1.5
+        assert product_form.tag_ids == [4]